@@ -1,5 +1,7 @@
 from .cylinder import Cylinder
 from .plane import Plane, PlaneForTextureAtlas
+from .terrain import TerrainTile, TerrainTiles
+from .chunked_cubesphere import CubespherePatch, ChunkedCubesphere
 from .box import Box
 from .sphere import Sphere
 from .torus import Torus
@@ -10,5 +12,8 @@ from .capsule import Capsule
 from .rounded_box import CapsulePrism, RoundedCornerBox, RoundedEdgeBox
 from .ellipsoid import Ellipsoid
 from .polyhedron import Icosphere, Cubesphere
-from .polyhedron import RandomPolygonalPrism, RandomConvexPolyhedron, Dodecahedron, ShatteredSphere
+from .polyhedron import RandomPolygonalPrism, RandomPolygonalPrisms
+from .polyhedron import RandomConvexPolyhedron, RandomConvexPolyhedra
+from .polyhedron import Dodecahedron, ShatteredSphere, ShatteredSphereFragments
+from .polyhedron import ConvexHull
 from .particles import Particles
\ No newline at end of file
@@ -1,7 +1,9 @@
 import array
+import functools
 from types import SimpleNamespace
 
-from panda3d.core import Vec3, Point3
+import numpy as np
+from panda3d.core import Vec3, Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 
@@ -10,42 +12,37 @@ class BasicBox:
     """A mixin class that provides functionality for creating the sides of a box"""
 
     def define_vertex_order(self, index_offset, prim_indices, direction, inner_range, outer_range=1):
-        for i in range(outer_range):
-            for j in range(inner_range):
-                vi1 = index_offset + i * (inner_range + 1) + j
-                vi2 = vi1 + 1
-                vi3 = vi2 + inner_range
-                vi4 = vi3 + 1
+        n = inner_range + 1
+        vi1 = (index_offset + n * np.arange(outer_range)[:, None] + np.arange(inner_range)).ravel()
+        vi2 = vi1 + 1
+        vi3 = vi2 + inner_range
+        vi4 = vi3 + 1
 
-                if self.invert:
-                    prim_indices.extend((vi1, vi4, vi2) if direction == 1 else (vi1, vi2, vi4))
-                    prim_indices.extend((vi1, vi3, vi4) if direction == 1 else (vi1, vi4, vi3))
-                else:
-                    prim_indices.extend((vi1, vi2, vi4) if direction == 1 else (vi1, vi4, vi2))
-                    prim_indices.extend((vi1, vi4, vi3) if direction == 1 else (vi1, vi3, vi4))
+        if self.invert == (direction == 1):
+            indices = np.column_stack([vi1, vi4, vi2, vi1, vi3, vi4])
+        else:
+            indices = np.column_stack([vi1, vi2, vi4, vi1, vi4, vi3])
+
+        self.extend_prim(prim_indices, indices.ravel())
 
     def create_side(self, index_offset, vdata_values, prim_indices, direction, is_front,
                     vertex, normal, index, offset, segs):
-        vertex_cnt = 0
-
-        for i in range(segs.axis_2 + 1):
-            b = i / segs.axis_2
-            vertex[index.axis_2] = (-.5 + b) * self.dims[index.axis_2] + offset.axis_2
-
-            for j in range(segs.axis_1 + 1):
-                a = j / segs.axis_1
-                vertex[index.axis_1] = (-.5 + a) * self.dims[index.axis_1] + offset.axis_1
-
-                if is_front:
-                    u = -b * direction + (1 if direction > 0 else 0)
-                    v = a
-                else:
-                    u = a * direction + (1 if direction < 0 else 0)
-                    v = b
-
-                vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                vertex_cnt += 1
-
+        # Each row of the arrays is a line of the side along axis_1.
+        b = (np.arange(segs.axis_2 + 1) / segs.axis_2)[:, None]
+        a = np.arange(segs.axis_1 + 1) / segs.axis_1
+
+        vertices = np.empty((segs.axis_2 + 1, segs.axis_1 + 1, 3))
+        vertices[...] = vertex
+        vertices[..., index.axis_2] = (-.5 + b) * self.dims[index.axis_2] + offset.axis_2
+        vertices[..., index.axis_1] = (-.5 + a) * self.dims[index.axis_1] + offset.axis_1
+
+        if is_front:
+            uvs = np.broadcast_arrays(-b * direction + (1 if direction > 0 else 0), a)
+        else:
+            uvs = np.broadcast_arrays(a * direction + (1 if direction < 0 else 0), b)
+
+        vertex_cnt = self.extend_vdata(
+            vdata_values, vertices.reshape(-1, 3), normal, np.stack(uvs, axis=2).reshape(-1, 2))
         self.define_vertex_order(index_offset, prim_indices, direction, segs.axis_1, segs.axis_2)
 
         return vertex_cnt
@@ -70,8 +67,6 @@ class BasicBox:
                 thicknesses.append([2, ((dim1, 0., 0.), (dim2, c2, c1))])
 
             for primary_idx, t in thicknesses:
-                _index_offset = index_offset + vertex_cnt
-
                 if primary_idx == 1:
                     idx_1, idx_2 = index.axis_1, index.axis_2
                     offs_1, offs_2 = offset.axis_1, offset.axis_2
@@ -81,44 +76,53 @@ class BasicBox:
                     offs_1, offs_2 = offset.axis_2, offset.axis_1
                     segs = segments.axis_1
 
-                for dim, corner_1, corner_2 in t:
-                    if sign == '-':
-                        coord = corner_1 - self.dims[idx_1] * .5
-                    else:
-                        coord = self.dims[idx_1] * .5 - corner_1
+                # The rim is a strip of two lines, the first at corner_1 of t[0], the second at that of t[1].
+                dims, corners_1, corners_2 = (np.array(col)[:, None] for col in zip(*t))
+                j = np.arange(segs + 1) / segs
 
-                    vertex[idx_1] = coord + offs_1
-                    a = coord / self.dims[idx_1] + .5
+                if sign == '-':
+                    coord_1 = corners_1 - self.dims[idx_1] * .5
+                    coord_2 = corners_2 - self.dims[idx_2] * .5 + j * dims
+                else:
+                    coord_1 = self.dims[idx_1] * .5 - corners_1
+                    coord_2 = self.dims[idx_2] * .5 - j * dims - corners_2
 
-                    for i in range(segs + 1):
-                        j = i / segs
-                        if sign == '-':
-                            coord = corner_2 - self.dims[idx_2] * .5 + j * dim
-                        else:
-                            coord = self.dims[idx_2] * .5 - j * dim - corner_2
+                a = coord_1 / self.dims[idx_1] + .5
+                b = coord_2 / self.dims[idx_2] + .5
 
-                        vertex[idx_2] = coord + offs_2
-                        b = coord / self.dims[idx_2] + .5
+                vertices = np.empty((2, segs + 1, 3))
+                vertices[...] = vertex
+                vertices[..., idx_1] = coord_1 + offs_1
+                vertices[..., idx_2] = coord_2 + offs_2
 
-                        if is_front:
-                            u = (-b if primary_idx == 1 else -a) * direction + (1 if direction > 0 else 0)
-                            v = a if primary_idx == 1 else b
-                        else:
-                            u = (a if primary_idx == 1 else b) * direction + (1 if direction < 0 else 0)
-                            v = b if primary_idx == 1 else a
+                if is_front:
+                    u = (-b if primary_idx == 1 else -a) * direction + (1 if direction > 0 else 0)
+                    v = a if primary_idx == 1 else b
+                else:
+                    u = (a if primary_idx == 1 else b) * direction + (1 if direction < 0 else 0)
+                    v = b if primary_idx == 1 else a
 
-                        if self.invert:
-                            u = 1. - u
+                if self.invert:
+                    u = 1. - u
 
-                        vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                        vertex_cnt += 1
+                uvs = np.stack(np.broadcast_arrays(u, v), axis=2).reshape(-1, 2)
+                self.define_vertex_order(index_offset + vertex_cnt, prim_indices, direction, segs)
+                vertex_cnt += self.extend_vdata(vdata_values, vertices.reshape(-1, 3), normal, uvs)
 
-                    self.define_vertex_order(_index_offset, prim_indices, direction, segs)
         return vertex_cnt
 
-    def get_plane_details(self, plane):
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def get_plane_axes(plane):
+        """Return the names of the axes of a plane, like 'xyz', and their indices,
+           which are the same for every box.
+        """
         name = SimpleNamespace(**{f'axis_{i + 1}': s for i, s in enumerate(plane)})
         index = SimpleNamespace(**{k: 'xyz'.index(v) for k, v in name.__dict__.items()})
+        return name, index
+
+    def get_plane_details(self, plane):
+        name, index = self.get_plane_axes(plane)
         offset = SimpleNamespace(**{k: self.center[v] for k, v in index.__dict__.items()})
         segments = SimpleNamespace(**{k: self.segs[v] for k, v in name.__dict__.items()})
 
@@ -244,6 +248,10 @@ class Box(BasicBox, ProceduralGeometry):
             outer_box_details = self.get_outer_details(*self.dims)
             self.define_inner_details(outer_box_details)
 
+    def calc_bounds(self):
+        half = Vec3(self.width, self.depth, self.height) * 0.5
+        return BoundingBox(self.center - half, self.center + half)
+
     def get_geom_node(self):
         self.define_variables()
 
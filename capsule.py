@@ -1,6 +1,6 @@
 import array
 
-from panda3d.core import Point3
+from panda3d.core import Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 from .cylinder import BasicCylinder
@@ -104,6 +104,12 @@ class Capsule(BasicCylinder, ProceduralGeometry):
 
         return vertex_cnt
 
+    def calc_bounds(self):
+        r = self.radius
+        bottom = -r if self.bottom_hemisphere else 0
+        top = self.height + (r if self.top_hemisphere else 0)
+        return BoundingBox(Point3(-r, -r, bottom), Point3(r, r, top))
+
     def get_geom_node(self):
         self.define_variables()
 
@@ -0,0 +1,315 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from panda3d.core import NodePath, Point3, BoundingBox
+
+from .plane import Plane
+
+
+# The normal, u and v axes of the cube faces; u x v = normal, so that the faces look outward.
+CUBE_FACES = np.array([
+    [[1, 0, 0], [0, 1, 0], [0, 0, 1]],
+    [[-1, 0, 0], [0, -1, 0], [0, 0, 1]],
+    [[0, 1, 0], [-1, 0, 0], [0, 0, 1]],
+    [[0, -1, 0], [1, 0, 0], [0, 0, 1]],
+    [[0, 0, 1], [1, 0, 0], [0, 1, 0]],
+    [[0, 0, -1], [-1, 0, 0], [0, 1, 0]],
+], dtype=np.float64)
+
+# The index of the cube face from the axis of its normal and whether the normal is positive.
+FACE_INDICES = {(int(np.abs(n).argmax()), bool(n.sum() > 0)): i for i, n in enumerate(CUBE_FACES[:, 0])}
+
+
+def spherify(points):
+    """Map the points on the cube of side 2 onto the unit sphere, spreading
+       the vertices more evenly than normalizing them.
+        Args:
+            points (numpy.ndarray): the points on the cube; shape is (..., 3).
+    """
+    sq = points ** 2
+    x2, y2, z2 = sq[..., 0], sq[..., 1], sq[..., 2]
+
+    scales = np.stack([
+        1 - (y2 + z2) / 2 + y2 * z2 / 3,
+        1 - (z2 + x2) / 2 + z2 * x2 / 3,
+        1 - (x2 + y2) / 2 + x2 * y2 / 3
+    ], axis=-1)
+
+    return points * np.sqrt(scales)
+
+
+class CubespherePatch(Plane):
+    """A class to create a patch of a cube sphere; a cube face is divided into
+       2 ** level x 2 ** level patches, and the patch (ix, iy) is a grid of segs x segs quads.
+       The texture coordinates span the cube face.
+
+        Args:
+            face (int): the index of the cube face; from 0 to 5.
+            level (int): the depth of the patch in the quadtree of the face; cannot be negative.
+            ix (int): the index of the patch along the u axis of the face.
+            iy (int): the index of the patch along the v axis of the face.
+            radius (float): the radius of the sphere; greater than 0; default is 1.
+            segs (int): the number of subdivisions of a patch side; even number; default is 16.
+            stitches (tuple):
+                whether or not the neighbor beyond the u-min, u-max, v-min and v-max edges is coarser;
+                the vertices between the vertices of the neighbor are put on its edges to avoid cracks.
+            tristrips (bool): whether or not the patch is created as triangle strips; default is False.
+            compact (bool): whether or not the color column is left out of the vertex data; default is False.
+    """
+
+    # The normals of the sphere differ from vertex to vertex.
+    constant_columns = ('color',)
+
+    def __init__(self, face, level, ix, iy, radius=1., segs=16, stitches=(False, False, False, False),
+                 tristrips=False, compact=False):
+        self.color = (1, 1, 1, 1)
+        self.face = face
+        self.level = level
+        self.ix = ix
+        self.iy = iy
+        self.radius = radius
+        self.segs_w = segs
+        self.segs_d = segs
+        self.stitches = stitches
+        self.tristrips = tristrips
+        self.compact = compact
+
+    def stitch(self, vertices):
+        """Move the odd vertices on the edges next to the coarser patches
+           to the middle of the even vertices next to them.
+        """
+        edges = [vertices[:, 0], vertices[:, -1], vertices[0], vertices[-1]]
+
+        for edge, stitch in zip(edges, self.stitches):
+            if stitch:
+                edge[1:-1:2] = (edge[:-2:2] + edge[2::2]) / 2
+
+    def get_geom_node(self):
+        normal, u_axis, v_axis = CUBE_FACES[self.face]
+        n = 2 ** self.level
+        s = -1 + 2 * (self.ix + np.arange(self.segs_w + 1) / self.segs_w) / n
+        t = -1 + 2 * (self.iy + np.arange(self.segs_d + 1) / self.segs_d) / n
+
+        # Each row is a line of vertices along the u axis, so that the triangles look outward.
+        points = normal + t[:, None, None] * v_axis + s[:, None] * u_axis
+        vertices = spherify(points) * self.radius
+        self.stitch(vertices)
+
+        normals = vertices / np.linalg.norm(vertices, axis=2, keepdims=True)
+        uvs = np.stack(np.broadcast_arrays((s + 1) / 2, (t[:, None] + 1) / 2), axis=2)
+
+        self.extents = (vertices.min(axis=(0, 1)), vertices.max(axis=(0, 1)))
+        return self.create_grid_geom_node(vertices, normals, uvs)
+
+    def calc_bounds(self):
+        return BoundingBox(Point3(*self.extents[0]), Point3(*self.extents[1]))
+
+
+class ChunkedCubesphere:
+    """A class to create a cube sphere whose faces are quadtrees of CubespherePatch,
+       and to select the patches by the distance from a focus point, so that
+       the patches near the focus point are finer and the others are coarser.
+       Adjacent patches differ by one level at most, and the finer ones are stitched to the coarser ones.
+
+        Args:
+            radius (float): the radius of the sphere; greater than 0; default is 1.
+            segs (int): the number of subdivisions of a patch side; even number; default is 16.
+            max_level (int): the maximum depth of the quadtrees; cannot be negative; default is 8.
+            split_distance (float):
+                a patch is split if the focus point is closer to it than
+                split_distance times the length of its side; default is 2.
+            threaded (bool):
+                whether or not the patches are created in worker threads;
+                if True, the new patches replace the old ones when all of them are ready; default is False.
+            tristrips (bool): whether or not the patches are created as triangle strips; default is False.
+            compact (bool): whether or not the color column is left out of the vertex data; default is False.
+    """
+
+    def __init__(self, radius=1., segs=16, max_level=8, split_distance=2., threaded=False,
+                 tristrips=False, compact=False):
+        if segs % 2:
+            raise ValueError('segs must be an even number.')
+
+        self.radius = radius
+        self.segs = segs
+        self.max_level = max_level
+        self.split_distance = split_distance
+        self.tristrips = tristrips
+        self.compact = compact
+
+        self.executor = ThreadPoolExecutor() if threaded else None
+        self.root = NodePath('cubesphere')
+        self.patches = {}
+        self.pending = {}
+
+    def get_patch_center(self, face, level, ix, iy):
+        normal, u_axis, v_axis = CUBE_FACES[face]
+        n = 2 ** level
+        s = -1 + 2 * (ix + 0.5) / n
+        t = -1 + 2 * (iy + 0.5) / n
+
+        return spherify(normal + s * u_axis + t * v_axis) * self.radius
+
+    def needs_split(self, face, level, ix, iy, focus):
+        if level >= self.max_level:
+            return False
+
+        size = self.radius * math.pi / 2 / 2 ** level
+        dist = np.linalg.norm(self.get_patch_center(face, level, ix, iy) - focus)
+        return dist < self.split_distance * size
+
+    def find_leaf(self, leaves, face, s, t):
+        """Return the leaf that contains the point (s, t) of the face.
+        """
+        for level in range(self.max_level + 1):
+            n = 2 ** level
+            ix = min(int((s + 1) / 2 * n), n - 1)
+            iy = min(int((t + 1) / 2 * n), n - 1)
+
+            if (key := (face, level, ix, iy)) in leaves:
+                return key
+
+    def get_neighbor(self, leaves, face, level, ix, iy, edge):
+        """Return the leaf beyond the edge; 0, 1, 2 and 3 are the u-min, u-max, v-min and v-max edges.
+        """
+        n = 2 ** level
+        eps = 0.5 ** (self.max_level + 2)
+        s = -1 + 2 * (ix + 0.5) / n
+        t = -1 + 2 * (iy + 0.5) / n
+
+        match edge:
+            case 0:
+                s = -1 + 2 * ix / n - eps
+            case 1:
+                s = -1 + 2 * (ix + 1) / n + eps
+            case 2:
+                t = -1 + 2 * iy / n - eps
+            case 3:
+                t = -1 + 2 * (iy + 1) / n + eps
+
+        normal, u_axis, v_axis = CUBE_FACES[face]
+        point = normal + s * u_axis + t * v_axis
+
+        # Beyond the edge of the cube face, the point is projected onto the adjacent face.
+        axis = np.argmax(np.abs(point))
+        point = point / abs(point[axis])
+        nb_face = FACE_INDICES[int(axis), bool(point[axis] > 0)]
+        _, nb_u, nb_v = CUBE_FACES[nb_face]
+
+        return self.find_leaf(leaves, nb_face, np.dot(point, nb_u), np.dot(point, nb_v))
+
+    def select_leaves(self, focus):
+        """Return the leaves of the quadtrees, restricted so that adjacent leaves differ by one level at most.
+        """
+        leaves = set()
+        stack = [(face, 0, 0, 0) for face in range(6)]
+
+        while stack:
+            face, level, ix, iy = key = stack.pop()
+
+            if self.needs_split(*key, focus):
+                stack.extend((face, level + 1, ix * 2 + i, iy * 2 + j) for i in range(2) for j in range(2))
+            else:
+                leaves.add(key)
+
+        changed = True
+
+        while changed:
+            changed = False
+
+            for key in list(leaves):
+                if key not in leaves:
+                    continue
+
+                for edge in range(4):
+                    face, level, ix, iy = nb = self.get_neighbor(leaves, *key, edge)
+
+                    if level < key[1] - 1:
+                        leaves.remove(nb)
+                        leaves.update((face, level + 1, ix * 2 + i, iy * 2 + j) for i in range(2) for j in range(2))
+                        changed = True
+
+        return leaves
+
+    def select_patches(self, focus):
+        """Return the keys of the patches to be shown; (face, level, ix, iy, stitches).
+        """
+        leaves = self.select_leaves(np.array(focus, dtype=np.float64))
+
+        return {
+            (*key, tuple(self.get_neighbor(leaves, *key, edge)[1] < key[1] for edge in range(4)))
+            for key in leaves
+        }
+
+    def create_patch(self, face, level, ix, iy, stitches):
+        maker = CubespherePatch(
+            face,
+            level,
+            ix,
+            iy,
+            radius=self.radius,
+            segs=self.segs,
+            stitches=stitches,
+            tristrips=self.tristrips,
+            compact=self.compact
+        )
+
+        return maker.create()
+
+    def update(self, focus):
+        """Select the patches by the distance from the focus point, create the new ones
+           and remove the ones no longer needed. Return the keys of the loaded and unloaded patches.
+           If threaded, the patches are replaced only when all of the new ones are ready,
+           so call this method every frame.
+            Args:
+                focus (Point3): the focus point, like the position of the camera.
+        """
+        needed = self.select_patches(focus)
+        loaded = [key for key in needed if key not in self.patches]
+
+        if self.executor is None:
+            models = {key: self.create_patch(*key) for key in loaded}
+        else:
+            for key in [key for key in self.pending if key not in needed]:
+                self.pending.pop(key).cancel()
+
+            for key in loaded:
+                if key not in self.pending:
+                    self.pending[key] = self.executor.submit(self.create_patch, *key)
+
+            if not all(self.pending[key].done() for key in loaded):
+                return [], []
+
+            models = {key: self.pending.pop(key).result() for key in loaded}
+
+        unloaded = [key for key in self.patches if key not in needed]
+
+        for key in unloaded:
+            self.patches.pop(key).remove_node()
+
+        for key, model in models.items():
+            model.reparent_to(self.root)
+            self.patches[key] = model
+
+        return loaded, unloaded
+
+    def clear(self):
+        """Remove all of the patches.
+        """
+        for future in self.pending.values():
+            future.cancel()
+
+        for model in self.patches.values():
+            model.remove_node()
+
+        self.pending.clear()
+        self.patches.clear()
+
+    def close(self):
+        """Remove all of the patches and shut down the worker threads.
+        """
+        self.clear()
+
+        if self.executor is not None:
+            self.executor.shutdown()
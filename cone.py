@@ -1,7 +1,9 @@
 import array
 import math
+from types import SimpleNamespace
 
-from panda3d.core import Vec3, Point3, Vec2
+import numpy as np
+from panda3d.core import Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 
@@ -51,195 +53,40 @@ class Cone(ProceduralGeometry):
         self.segs_sc_a = slice_caps_axial
         self.invert = invert
 
-    def create_bottom_cap_triangles(self, vdata_values, prim_indices):
-        vertex_cnt = 0
-
-        if not self.bottom_inner_radius:
-            # the bottom cap triangle vertices
-            normal = Vec3(0., 0., 1.) if self.invert else Vec3(0., 0., -1.)
-            direction = -1. if self.invert else 1.
-
-            uv = Vec2(.5, .5)
-            vertex = Point3(0, 0, 0)
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-            vertex_cnt += 1
-
-            radius = self.bottom_radius / self.segs_bc
-
-            for i in range(self.segs_c + 1):
-                angle = self.delta_rad * i + (0. if self.invert else self.slice_rad)
-                c = math.cos(angle)
-                s = math.sin(angle) * direction
-                vertex = Point3(radius * c, radius * s, 0)
-
-                u = .5 + .5 * c / self.segs_bc
-                v = .5 + .5 * s * -direction / self.segs_bc
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            # the vertex order of the bottom cap triangles
-            for i in range(1, self.segs_c + 1):
-                prim_indices.extend((0, i + 1, i))
+    def get_outline(self, radius):
+        return np.column_stack([radius * self.cos_c, radius * self.sin_c])
 
-        return vertex_cnt
+    def create_cap(self, index_offset, vdata_values, prim_indices, bottom=True):
+        if bottom:
+            radius, inner_radius, segs_cap, height = self.bottom_radius, self.bottom_inner_radius, self.segs_bc, 0
+        else:
+            radius, inner_radius, segs_cap, height = self.top_radius, self.top_inner_radius, self.segs_tc, self.height
 
-    def create_bottom_cap_quads(self, vdata_values, prim_indices):
-        vertex_cnt = 0
+        if radius == inner_radius:
+            return 0
 
-        if self.bottom_thickness:
-            # the bottom cap quad vertices
-            normal = Vec3(0., 0., 1.) if self.invert else Vec3(0., 0., -1.)
-            direction = -1 if self.invert else 1
-            n = 0 if self.bottom_inner_radius else 1
-
-            for i in range(n, self.segs_bc + 1 - n):
-                radius = self.bottom_inner_radius + self.bottom_thickness * (i + n) / self.segs_bc
-
-                for j in range(self.segs_c + 1):
-                    angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                    c = math.cos(angle)
-                    s = math.sin(angle) * direction
-                    vertex = Point3(radius * c, radius * s, 0)
-
-                    r = radius / self.bottom_radius
-                    u = .5 + .5 * c * r
-                    v = .5 + .5 * s * -direction * r
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-            # the vertex order of the bottom cap quads
-            index_offset = (self.segs_c + 1) if self.bottom_inner_radius else 1
-            n = 0 if self.bottom_inner_radius else 1
-
-            for i in range(n, self.segs_bc):
-                for j in range(self.segs_c):
-                    vi1 = index_offset + i * (self.segs_c + 1) + j
-                    vi2 = vi1 - self.segs_c - 1
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-                    prim_indices.extend([*(vi1, vi2, vi3), *(vi1, vi3, vi4)])
+        hole = self.get_outline(inner_radius) if inner_radius else None
 
-        return vertex_cnt
+        return self.create_outline_cap(
+            index_offset, vdata_values, prim_indices, self.get_outline(radius), hole, segs_cap, height, radius, bottom)
 
     def create_mantle_quads(self, index_offset, vdata_values, prim_indices):
-        direction = -1. if self.invert else 1.
+        # the profile is the slant line from the bottom to the top circle.
+        i = np.arange(self.segs_a + 1)
         delta_radius = self.top_radius - self.bottom_radius
-        vertex_cnt = 0
-
-        # the mantle quad vertices
-        for i in range(self.segs_a + 1):
-            radius = self.bottom_radius + delta_radius * i / self.segs_a
-            z = self.height * i / self.segs_a
-            v = i / self.segs_a
-
-            for j in range(self.segs_c + 1):
-                angle = self.delta_rad * j + (0. if self.invert else self.slice_rad)
-                x = radius * math.cos(angle)
-                y = radius * math.sin(angle) * direction
-                vertex = Point3(x, y, z)
-
-                # to prevent the normal from being (0, 0, 0)
-                _radius = self.bottom_radius + delta_radius * i / (self.segs_a + 1)
-                normal = Vec3(x, y, -_radius * delta_radius / self.height).normalized()
-                normal *= direction
-
-                u = j / self.segs_c
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-        # the vertex order of the mantle quads
-        n = self.segs_c + 1
-
-        for i in range(1, self.segs_a + 1):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * n + j
-                vi2 = vi1 - n
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-                prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
-
-        return vertex_cnt
-
-    def create_top_cap_triangles(self, index_offset, vdata_values, prim_indices):
-        vertex_cnt = 0
-
-        if not self.top_inner_radius:
-            # the top cap triangle vertices
-            normal = Vec3(0., 0., -1.) if self.invert else Vec3(0., 0., 1.)
-            direction = -1. if self.invert else 1.
-
-            uv = Vec2(.5, .5)
-            vertex = Point3(0, 0, self.height)
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-            vertex_cnt += 1
-
-            radius = self.top_radius / self.segs_tc
-
-            for i in range(self.segs_c + 1):
-                angle = self.delta_rad * i + (0. if self.invert else self.slice_rad)
-                c = math.cos(angle)
-                s = math.sin(angle) * direction
-                vertex = Point3(radius * c, radius * s, self.height)
-
-                u = .5 + .5 * c / self.segs_tc
-                v = .5 + .5 * s * direction / self.segs_tc
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            # the vertex order of the top cap triangles
-            for i in range(index_offset + 1, index_offset + self.segs_c + 1):
-                prim_indices.extend((index_offset, i, i + 1))
+        radius = self.bottom_radius + delta_radius * i / self.segs_a
 
-        return vertex_cnt
-
-    def create_top_cap_quads(self, index_offset, vdata_values, prim_indices):
-        vertex_cnt = 0
+        # to prevent the normal from being (0, 0, 0)
+        _radius = self.bottom_radius + delta_radius * i / (self.segs_a + 1)
 
-        if self.top_thickness:
-            normal = Vec3(0., 0., -1.) if self.invert else Vec3(0., 0., 1.)
-            direction = -1 if self.invert else 1
-            n = 0 if self.top_inner_radius else 1
-
-            # the top cap quad vertices
-            for i in range(n, self.segs_tc + 1 - n):
-                radius = self.top_inner_radius + self.top_thickness * (i + n) / self.segs_tc
-
-                for j in range(self.segs_c + 1):
-                    angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                    c = math.cos(angle)
-                    s = math.sin(angle) * direction
-                    vertex = Point3(radius * c, radius * s, self.height)
-
-                    r = radius / self.top_radius
-                    u = .5 + .5 * c * r
-                    v = .5 + .5 * s * direction * r
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-            # the vertex order of the top cap quads
-            index_offset += (self.segs_c + 1) if self.top_inner_radius else 1
-            n = 0 if self.top_inner_radius else 1
-
-            for i in range(n, self.segs_tc):
-                for j in range(self.segs_c):
-                    vi1 = index_offset + i * (self.segs_c + 1) + j
-                    vi2 = vi1 - self.segs_c - 1
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-                    prim_indices.extend([*(vi1, vi3, vi2), *(vi1, vi4, vi3)])
-
-        return vertex_cnt
+        profile = SimpleNamespace(
+            r=radius,
+            z=self.height * i / self.segs_a,
+            nr=radius,
+            nz=-_radius * delta_radius / self.height,
+            v=i / self.segs_a
+        )
+        return self.create_lathe(index_offset, vdata_values, prim_indices, profile, self.segs_c, self.slice_deg)
 
     def create_slice_cap(self, index_offset, vdata_values, prim_indices):
         max_radius = max(self.bottom_radius, self.top_radius)
@@ -247,48 +94,32 @@ class Cone(ProceduralGeometry):
         direction = -1. if self.invert else 1.
         vertex_cnt = 0
 
+        # Each row of the slice cap goes from the inner to the outer slant line at its height.
+        f = np.arange(self.segs_sc_a + 1) / self.segs_sc_a
+        radius = self.bottom_radius + self.delta_radius * f
+        inner_radius = self.bottom_inner_radius + delta_inner_radius * f
+        j = np.arange(self.segs_sc_r + 1) / self.segs_sc_r
+        r = inner_radius[:, None] + (radius - inner_radius)[:, None] * j
+        z = np.broadcast_to(self.height * f[:, None], r.shape)
+
         for is_start in (True, False):
             if is_start:
-                normal = Vec3(0, direction, 0)
+                c, s = 1., 0.
+                normal = (0, direction, 0)
             else:
                 angle = self.delta_rad * self.segs_c
                 c = math.cos(angle)
                 s = -math.sin(angle)
-                normal = Vec3(s, -c, 0.) * direction
-
-            for i in range(self.segs_sc_a + 1):
-                f = i / self.segs_sc_a
-                radius = self.bottom_radius + self.delta_radius * f
-                inner_radius = self.bottom_inner_radius + delta_inner_radius * f
-                z = self.height * f
-
-                for j in range(self.segs_sc_r + 1):
-                    r = inner_radius + (radius - inner_radius) * j / self.segs_sc_r
-                    vertex = Point3(r, 0., z) if is_start else Point3(r * c, r * s, z)
-
-                    coef = .5 if is_start else -.5
-                    u = .5 + coef * r / max_radius * -1 * direction
-                    uv = Vec2(u, f)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-            for i in range(self.segs_sc_a):
-                for j in range(self.segs_sc_r):
-                    vi1 = index_offset + j
-                    vi2 = vi1 + self.segs_sc_r + 1
-                    vi3 = vi1 + 1
-                    vi4 = vi2 + 1
-
-                    if is_start:
-                        prim_indices.extend((vi1, vi3, vi2) if self.invert else (vi1, vi2, vi3))
-                        prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi2, vi4, vi3))
-                    else:
-                        prim_indices.extend((vi1, vi2, vi3) if self.invert else (vi1, vi3, vi2))
-                        prim_indices.extend((vi2, vi4, vi3) if self.invert else (vi2, vi3, vi4))
-
-                index_offset += self.segs_sc_r + 1
-            index_offset += self.segs_sc_r + 1
+                normal = (s * direction, -c * direction, 0.)
+
+            coef = .5 if is_start else -.5
+            u = .5 + coef * r / max_radius * -1 * direction
+            vertices = np.stack([r * c, r * s, z], axis=2).reshape(-1, 3)
+            uvs = np.stack(np.broadcast_arrays(u, f[:, None]), axis=2).reshape(-1, 2)
+
+            self.extend_prim(prim_indices, self.create_slice_cap_indices(
+                index_offset + vertex_cnt, self.segs_sc_a, self.segs_sc_r, is_start))
+            vertex_cnt += self.extend_vdata(vdata_values, vertices, normal, uvs)
 
         return vertex_cnt
 
@@ -298,6 +129,11 @@ class Cone(ProceduralGeometry):
         self.delta_radius = self.top_radius - self.bottom_radius
         self.slice_rad = math.pi * self.slice_deg / 180
         self.delta_rad = math.pi * ((360. - self.slice_deg) / 180.) / self.segs_c
+        self.cos_c, self.sin_c = self.get_sweep_angles(self.segs_c, self.slice_deg)
+
+    def calc_bounds(self):
+        r = max(self.bottom_radius, self.top_radius)
+        return BoundingBox(Point3(-r, -r, 0), Point3(r, r, self.height))
 
     def get_geom_node(self):
         self.define_variables()
@@ -307,16 +143,13 @@ class Cone(ProceduralGeometry):
         vertex_cnt = 0
 
         # Create an outer cone.
-        if self.segs_bc:
-            vertex_cnt += self.create_bottom_cap_triangles(vdata_values, prim_indices)
-            vertex_cnt += self.create_bottom_cap_quads(vdata_values, prim_indices)
+        if self.bottom_radius and self.segs_bc:
+            vertex_cnt += self.create_cap(vertex_cnt, vdata_values, prim_indices)
 
         vertex_cnt += self.create_mantle_quads(vertex_cnt, vdata_values, prim_indices)
 
         if self.top_radius and self.segs_tc:
-            sub_total = vertex_cnt
-            vertex_cnt += self.create_top_cap_triangles(sub_total, vdata_values, prim_indices)
-            vertex_cnt += self.create_top_cap_quads(sub_total, vdata_values, prim_indices)
+            vertex_cnt += self.create_cap(vertex_cnt, vdata_values, prim_indices, bottom=False)
 
         if self.segs_sc_r and self.segs_sc_a and self.slice_deg \
                 and (self.bottom_thickness or self.top_thickness):
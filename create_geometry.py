@@ -1,9 +1,16 @@
+import array
+import functools
+import hashlib
+import math
 from abc import ABC, abstractmethod
 
+import numpy as np
 from panda3d.core import NodePath
-from panda3d.core import Geom, GeomNode, GeomTriangles
+from panda3d.core import Geom, GeomNode, GeomTriangles, GeomTristrips
 from panda3d.core import GeomEnums, GeomPoints
 from panda3d.core import Mat4, Vec3
+from panda3d.core import BoundingBox, BoundingVolume
+from panda3d.core import PTA_int
 from panda3d.core import GeomVertexData
 from panda3d.core import GeomVertexFormat, GeomVertexArrayFormat
 
@@ -23,14 +30,619 @@ class AbstractGeometry(ABC):
         pass
 
 
-class ProceduralGeometry(AbstractGeometry):
+class SpatialChunks:
+    """A mixin class that splits the primitives of a geom node into sub geoms
+       along a grid or an octree, so that each of them gets its own tight bounds
+       and the parts outside the view frustum are culled separately.
+    """
 
-    def create(self):
+    def get_vertex_positions(self, vdata):
+        """Return the vertex positions of the vertex data as a numpy.ndarray of shape (n, 3).
+        """
+        arr_format = vdata.get_format().get_array(0)
+        stride = arr_format.get_stride() // 4
+        start = arr_format.get_column('vertex').get_start() // 4
+        values = np.frombuffer(memoryview(vdata.get_array(0)).cast('B'), dtype=np.float32)
+        return values.reshape(-1, stride)[:, start:start + 3]
+
+    def get_prim_vertices(self, prim):
+        """Return the vertex indices of the primitive as a numpy.ndarray.
+        """
+        if not prim.is_indexed():
+            start = prim.get_first_vertex()
+            return np.arange(start, start + prim.get_num_vertices())
+
+        match prim.get_index_type():
+            case Geom.NT_uint8:
+                dtype = np.uint8
+            case Geom.NT_uint16:
+                dtype = np.uint16
+            case _:
+                dtype = np.uint32
+
+        return np.frombuffer(memoryview(prim.get_vertices()).cast('B'), dtype=dtype)
+
+    def calc_grid_cells(self, centers, divisions):
+        """Return the grid cell id of each center.
+            Args:
+                centers (numpy.ndarray): the centers of primitives; shape is (n, 3).
+                divisions (tuple): the number of cells along the x, y and z axes.
+        """
+        divisions = np.array(divisions)
+        lower = centers.min(axis=0)
+        size = centers.max(axis=0) - lower
+        size[size == 0] = 1
+
+        cells = ((centers - lower) / size * divisions).astype(np.int64)
+        cells = np.minimum(cells, divisions - 1)
+        return np.ravel_multi_index(cells.T, divisions)
+
+    def calc_octree_cells(self, centers, leaf_size, max_depth=8):
+        """Return the octree leaf id of each center.
+            Args:
+                centers (numpy.ndarray): the centers of primitives; shape is (n, 3).
+                leaf_size (int): the maximum number of primitives in a leaf.
+                max_depth (int): the maximum depth of the octree.
+        """
+        cells = np.zeros(len(centers), dtype=np.int64)
+        nodes = [(np.arange(len(centers)), 0)]
+        leaf_cnt = 0
+
+        while nodes:
+            members, depth = nodes.pop()
+
+            if len(members) <= leaf_size or depth == max_depth:
+                cells[members] = leaf_cnt
+                leaf_cnt += 1
+                continue
+
+            pts = centers[members]
+            mid = (pts.min(axis=0) + pts.max(axis=0)) * 0.5
+            octants = (pts > mid) @ np.array([1, 2, 4])
+
+            for octant in np.unique(octants):
+                nodes.append((members[octants == octant], depth + 1))
+
+        return cells
+
+    def create_chunk_prim(self, prim_type, indices):
+        """Create a primitive of the indicated type from vertex indices.
+        """
+        prim = prim_type(Geom.UHStatic)
+
+        if (type_code := 'H' if indices.max() <= 65535 else 'I') == 'I':
+            prim.set_index_type(Geom.NT_uint32)
+        else:
+            prim.set_index_type(Geom.NT_uint16)
+
+        prim_array = prim.modify_vertices()
+        prim_array.unclean_set_num_rows(len(indices))
+        prim_mem = memoryview(prim_array).cast('B').cast(type_code)
+        prim_mem[:] = indices.astype(np.uint32 if type_code == 'I' else np.uint16)
+        return prim
+
+    def get_divisions(self, chunks):
+        """Return the number of grid cells along the x, y and z axes as a tuple of 3 ints.
+            Args:
+                chunks (int or tuple): the number of cells along every axis, or along the x, y and z axes.
+        """
+        if isinstance(chunks, (int, np.integer)):
+            divisions = (chunks,) * 3
+        else:
+            try:
+                divisions = tuple(chunks)
+            except TypeError:
+                divisions = ()
+
+        if len(divisions) != 3 or not all(isinstance(n, (int, np.integer)) and n > 0 for n in divisions):
+            raise ValueError(f'chunks must be a positive int or a tuple of 3 positive ints, not {chunks!r}.')
+
+        return divisions
+
+    def split_geom_node(self, geom_node, chunks=None, octree_leaf=None):
+        """Split the primitives of each geom into sub geoms sharing the original vertex data.
+           The primitives of a geom are split together, so that each cell gets one sub geom
+           even if the geom has, for example, both triangles and triangle strips.
+            Args:
+                geom_node (GeomNode): the geom node to be split.
+                chunks (int or tuple): the number of grid cells along every axis, or along the x, y and z axes.
+                octree_leaf (int): the maximum number of primitives in an octree leaf.
+        """
+        if chunks:
+            chunks = self.get_divisions(chunks)
+
+        chunked_node = GeomNode(geom_node.get_name())
+
+        for i, geom in enumerate(geom_node.get_geoms()):
+            vdata = geom.get_vertex_data()
+            positions = self.get_vertex_positions(vdata)
+            groups = {}
+
+            # The composite primitives are decomposed, so triangle strips join the triangles.
+            for prim in geom.get_primitives():
+                if prim.is_composite():
+                    prim = prim.decompose()
+
+                vertices_per_prim = prim.get_num_vertices_per_primitive()
+                indices = self.get_prim_vertices(prim).reshape(-1, vertices_per_prim)
+
+                if len(indices):
+                    groups.setdefault(type(prim), []).append(indices)
+
+            if not groups:
+                continue
+
+            prim_types = list(groups)
+            prim_indices = [np.concatenate(groups[prim_type]) for prim_type in prim_types]
+            sizes = np.array([len(indices) for indices in prim_indices])
+            type_ids = np.repeat(np.arange(len(prim_types)), sizes)
+            firsts = np.cumsum(sizes) - sizes
+
+            centers = np.concatenate([positions[indices].mean(axis=1) for indices in prim_indices])
+
+            if chunks:
+                cells = self.calc_grid_cells(centers, chunks)
+            else:
+                cells = self.calc_octree_cells(centers, octree_leaf)
+
+            order = np.argsort(cells, kind='stable')
+            _, starts = np.unique(cells[order], return_index=True)
+
+            for chunk in np.split(order, starts[1:]):
+                chunk_geom = Geom(vdata)
+
+                for t in np.unique(type_ids[chunk]):
+                    members = chunk[type_ids[chunk] == t] - firsts[t]
+                    chunk_geom.add_primitive(self.create_chunk_prim(prim_types[t], prim_indices[t][members].ravel()))
+
+                chunked_node.add_geom(chunk_geom, geom_node.get_geom_state(i))
+
+        return chunked_node
+
+
+class TriangleStrips:
+    """A mixin class that outputs the quads of grid-like surfaces as triangle strips,
+       one strip per grid row, which needs about a third of the indices of triangle lists.
+    """
+
+    # If True, the shapes supporting it create their grid surfaces as triangle strips.
+    tristrips = False
+
+    def create_strips(self, index_offset, rows, cols):
+        """Return the vertex orders of the strips along the rows of a grid, as a numpy.ndarray
+           of shape (rows, 2 * (cols + 1)). Each strip zigzags between the vertices of a row
+           and the row below it, so its triangles face the same way as the ones created by
+           (vi1, vi2, vi3) and (vi1, vi3, vi4) in the triangle lists.
+            Args:
+                index_offset (int): the index of the first vertex of the bottom row.
+                rows (int): the number of quad rows; the grid has rows + 1 vertex rows.
+                cols (int): the number of quads in a row; each vertex row has cols + 1 vertices.
+        """
+        n = cols + 1
+        upper = index_offset + n * np.arange(1, rows + 1)[:, None] + np.arange(n)
+        return np.stack([upper, upper - n], axis=2).reshape(rows, -1)
+
+    def create_strip_prim(self, strips):
+        """Create a GeomTristrips from the vertex orders of the strips.
+           Panda3D joins strips by repeating the last vertex of a strip and the first one
+           of the next strip, which creates degenerate triangles that are not rasterized;
+           because every strip has an even length, the winding is kept across the joins.
+            Args:
+                strips (list): the vertex orders of the strips; numpy.ndarray.
+        """
+        lengths = np.array([len(strip) for strip in strips])
+        indices = [strips[0]]
+
+        for prev, strip in zip(strips, strips[1:]):
+            indices.extend([prev[-1:], strip[:1], strip])
+
+        ends = PTA_int()
+
+        for end in np.cumsum(lengths) + 2 * np.arange(len(strips)):
+            ends.push_back(int(end))
+
+        prim = self.create_chunk_prim(GeomTristrips, np.concatenate(indices))
+        prim.set_ends(ends)
+        return prim
+
+    def get_prim_strips(self, prim):
+        """Return the vertex orders of the strips of a GeomTristrips.
+        """
+        vertices = self.get_prim_vertices(prim)
+        ends = prim.get_ends()
+        return [vertices[(ends[i - 1] + 2 if i else 0):end] for i, end in enumerate(ends)]
+
+
+class ArrayGeometry:
+    """A mixin class that provides functionality for creating vertex data and their order
+       from numpy.ndarrays instead of per-vertex Python loops.
+    """
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def get_angle_table(delta, segs, start=0.):
+        """Return the angles start + delta * i (0 <= i <= segs) and their cosines and sines
+           as read-only numpy.ndarrays. The tables are cached, so shapes with the same
+           subdivisions and slice angles compute them only once.
+            Args:
+                delta (float): the angle between two adjacent segments, in radians.
+                segs (int): the number of segments.
+                start (float): the angle of the first segment, in radians.
+        """
+        angles = delta * np.arange(segs + 1) + start
+        tables = (angles, np.cos(angles), np.sin(angles))
+
+        for table in tables:
+            table.flags.writeable = False
+
+        return tables
+
+    def extend_vdata(self, vdata_values, vertices, normals, uvs):
+        """Append vertex data rows, created from numpy.ndarrays, to vdata_values
+           and return the number of the rows.
+            Args:
+                vdata_values (array.array): vertex information.
+                vertices (numpy.ndarray): the vertices; shape is (n, 3).
+                normals (numpy.ndarray): the normals; broadcastable to (n, 3).
+                uvs (numpy.ndarray): the texture coordinates; broadcastable to (n, 2).
+        """
+        rows = np.empty((len(vertices), 12), dtype=np.float32)
+        rows[:, :3] = vertices
+        rows[:, 3:7] = self.color
+        rows[:, 7:10] = normals
+        rows[:, 10:] = uvs
+
+        vdata_values.frombytes(rows.tobytes())
+        return len(rows)
+
+    def extend_prim(self, prim_indices, indices):
+        """Append the vertex order, numpy.ndarray, to prim_indices.
+        """
+        if len(indices) and indices.max() >> (8 * prim_indices.itemsize):
+            raise OverflowError(f'vertex index is too large for typecode {prim_indices.typecode}')
+
+        prim_indices.frombytes(np.asarray(indices, dtype=prim_indices.typecode).tobytes())
+
+    def create_grid_indices(self, index_offset, rows, cols, invert=False):
+        """Return the vertex order of the quads of a grid as a numpy.ndarray.
+           vi1 is on row i (1 <= i <= rows) and column j (0 <= j < cols), vi2 is below vi1,
+           vi3 and vi4 are next to vi2 and vi1, and each quad is split into
+           (vi1, vi2, vi3) and (vi1, vi3, vi4), or (vi1, vi2, vi4) and (vi2, vi3, vi4) if invert.
+            Args:
+                index_offset (int): the index of the first vertex of the bottom row.
+                rows (int): the number of quad rows; the grid has rows + 1 vertex rows.
+                cols (int): the number of quads in a row; each vertex row has cols + 1 vertices.
+                invert (bool): whether or not the quads are split along the other diagonal.
+        """
+        n = cols + 1
+        vi1 = (index_offset + n * np.arange(1, rows + 1)[:, None] + np.arange(cols)).ravel()
+        vi2 = vi1 - n
+        vi3 = vi2 + 1
+        vi4 = vi1 + 1
+
+        if invert:
+            return np.column_stack([vi1, vi2, vi4, vi2, vi3, vi4]).ravel()
+
+        return np.column_stack([vi1, vi2, vi3, vi1, vi3, vi4]).ravel()
+
+
+class LatheGeometry(ArrayGeometry):
+    """A mixin class that sweeps a profile in the rz-plane around the z-axis
+       to create the vertices and their order of a surface of revolution.
+    """
+
+    def get_sweep_angles(self, segs, slice_deg=0):
+        """Return the cosines and the sines of the segs + 1 sweep angles.
+           The sweep starts at the end of the pie slice and goes counterclockwise;
+           if inverted, it starts at the x-axis and goes clockwise, which the sines are multiplied by -1 for.
+            Args:
+                segs (int): the number of segments around the z-axis.
+                slice_deg (float): the angle of the pie slice removed, in degrees.
+        """
+        slice_rad = math.pi * slice_deg / 180
+        delta_rad = math.pi * ((360 - slice_deg) / 180) / segs
+        _, cos, sin = self.get_angle_table(delta_rad, segs, 0. if self.invert else slice_rad)
+        return cos, (-sin if self.invert else sin)
+
+    def sweep_profile(self, vdata_values, profile, segs, slice_deg=0, angle_major=False):
+        """Append the vertices of the swept profile to vdata_values and return the number of them.
+           u increases along the sweep from 0 to 1, and v is given by the profile.
+            Args:
+                vdata_values (array.array): vertex information.
+                profile (SimpleNamespace):
+                    r, z: the points of the profile.
+                    nr, nz: the normals of the profile, which are normalized here.
+                    v: the texture coordinates along the profile.
+                    Each of them is a numpy.ndarray or a float; they are broadcast to the same length.
+                segs (int): the number of segments around the z-axis.
+                slice_deg (float): the angle of the pie slice removed, in degrees.
+                angle_major (bool):
+                    if True, each row of the vertices is the profile at a sweep angle;
+                    otherwise, each row is the circle of a profile point.
+        """
+        direction = -1 if self.invert else 1
+        cos, sin = self.get_sweep_angles(segs, slice_deg)
+        r, z, nr, nz, v = (a[:, None] for a in np.broadcast_arrays(
+            *np.atleast_1d(profile.r, profile.z, profile.nr, profile.nz, profile.v)))
+
+        # Zero normals, like the ones at the apex of a cone, are left as they are.
+        length = np.hypot(nr, nz)
+        length[length == 0] = 1
+        nr = nr / length * direction
+        nz = nz / length * direction
+
+        vertices = np.stack(np.broadcast_arrays(r * cos, r * sin, z), axis=2)
+        normals = np.stack(np.broadcast_arrays(nr * cos, nr * sin, nz), axis=2)
+        uvs = np.stack(np.broadcast_arrays(np.arange(segs + 1) / segs, v), axis=2)
+
+        if angle_major:
+            vertices, normals, uvs = (a.transpose(1, 0, 2) for a in (vertices, normals, uvs))
+
+        return self.extend_vdata(
+            vdata_values, vertices.reshape(-1, 3), normals.reshape(-1, 3), uvs.reshape(-1, 2))
+
+    def create_lathe(self, index_offset, vdata_values, prim_indices, profile, segs, slice_deg=0,
+                     angle_major=False, join_prev=False):
+        """Sweep the profile, and append the vertices and their order of the swept grid
+           to vdata_values and prim_indices, or self.strips if the tristrips attribute is True.
+           Return the number of the vertices. See sweep_profile for the other args.
+            Args:
+                index_offset (int): the index of the first vertex of the grid.
+                join_prev (bool):
+                    if True, the first circle is also connected to the circle of vertices created before,
+                    and index_offset is the index of its first vertex; angle_major must be False.
+        """
+        vertex_cnt = self.sweep_profile(vdata_values, profile, segs, slice_deg, angle_major)
+        rows, cols = segs, vertex_cnt // (segs + 1) - 1
+
+        if not angle_major:
+            rows, cols = cols + join_prev, rows
+
+        if self.tristrips:
+            self.strips.extend(self.create_strips(index_offset, rows, cols))
+        else:
+            self.extend_prim(prim_indices, self.create_grid_indices(index_offset, rows, cols, self.invert))
+
+        return vertex_cnt
+
+
+class ExtrusionGeometry(ArrayGeometry):
+    """A mixin class that extrudes an outline in the xy-plane along the z-axis to create
+       the vertices and their order of the mantle, the caps and the slice caps of a prism.
+       An outline is a numpy.ndarray of shape (n, 2); the first and the last points of
+       a closed outline are the same, so that the texture coordinates have a seam.
+    """
+
+    def extrude_outline(self, vdata_values, outline, normals, u, height, segs_a):
+        """Append the vertices of the extruded outline to vdata_values and return the number of them.
+           Each row of the vertices is the outline at z = height * i / segs_a (0 <= i <= segs_a).
+            Args:
+                vdata_values (array.array): vertex information.
+                outline (numpy.ndarray): the points of the outline; shape is (n, 2).
+                normals (numpy.ndarray): the normals of the points, which are normalized here; shape is (n, 2).
+                u (numpy.ndarray): the texture coordinates along the outline; shape is (n,).
+                height (float): the height of the extrusion.
+                segs_a (int): subdivisions along the z-axis.
+        """
+        direction = -1 if self.invert else 1
+        v = np.arange(segs_a + 1) / segs_a
+        n = len(outline)
+
+        length = np.hypot(normals[:, 0], normals[:, 1])
+        length[length == 0] = 1
+        normals = np.column_stack([normals / length[:, None] * direction, np.zeros(n)])
+
+        vertices = np.empty((segs_a + 1, n, 3))
+        vertices[..., :2] = outline
+        vertices[..., 2] = height * v[:, None]
+        uvs = np.stack(np.broadcast_arrays(u, v[:, None]), axis=2)
+
+        return self.extend_vdata(
+            vdata_values, vertices.reshape(-1, 3), np.tile(normals, (segs_a + 1, 1)), uvs.reshape(-1, 2))
+
+    def create_extrusion(self, index_offset, vdata_values, prim_indices, outline, normals, u, height, segs_a):
+        """Extrude the outline, and append the vertices and their order of the mantle
+           to vdata_values and prim_indices, or self.strips if the tristrips attribute is True.
+           Return the number of the vertices. See extrude_outline for the other args.
+            Args:
+                index_offset (int): the index of the first vertex of the mantle.
+        """
+        vertex_cnt = self.extrude_outline(vdata_values, outline, normals, u, height, segs_a)
+
+        if self.tristrips:
+            self.strips.extend(self.create_strips(index_offset, segs_a, len(outline) - 1))
+        else:
+            self.extend_prim(
+                prim_indices, self.create_grid_indices(index_offset, segs_a, len(outline) - 1, self.invert))
+
+        return vertex_cnt
+
+    def create_cap_vertices(self, vdata_values, outline, hole, fractions, height, extents,
+                            bottom=True, center=False):
+        """Append the vertices of the rings of a bottom or top cap to vdata_values
+           and return the number of them. The texture coordinates are planar.
+            Args:
+                vdata_values (array.array): vertex information.
+                outline (numpy.ndarray): the outer outline of the cap; shape is (n, 2).
+                hole (numpy.ndarray): the inner outline of the cap; if None, the rings shrink to the origin.
+                fractions (numpy.ndarray): where the rings are between the hole (0) and the outline (1).
+                height (float): the z-coordinate of the cap.
+                extents (float or tuple): the half sizes of the cap along the x and y axes.
+                bottom (bool): whether or not the cap is the bottom one.
+                center (bool): whether or not the center of the cap is created before the rings.
+        """
+        direction = -1 if self.invert else 1
+        _direction = -direction if bottom else direction
+
+        if hole is None:
+            hole = np.zeros_like(outline)
+
+        xy = (hole + (outline - hole) * fractions[:, None, None]).reshape(-1, 2)
+
+        if center:
+            xy = np.vstack([(0, 0), xy])
+
+        vertices = np.column_stack([xy, np.full(len(xy), height)])
+        uvs = 0.5 + 0.5 * xy / extents * (1, _direction)
+        return self.extend_vdata(vdata_values, vertices, (0, 0, _direction), uvs)
+
+    def create_fan_indices(self, index_offset, cols, bottom=True):
+        """Return the vertex order of the triangles between the center of a cap,
+           whose index is index_offset, and the ring of cols + 1 vertices following it.
+        """
+        vi = index_offset + 1 + np.arange(cols)
+        center = np.full(cols, index_offset)
+
+        if bottom:
+            return np.column_stack([center, vi + 1, vi]).ravel()
+
+        return np.column_stack([center, vi, vi + 1]).ravel()
+
+    def create_cap_indices(self, index_offset, rows, cols, bottom=True):
+        """Return the vertex order of the quads between the rings of a cap.
+           The triangles of the top cap are the reverse of the bottom ones.
+            Args:
+                index_offset (int): the index of the first vertex of the innermost ring.
+                rows (int): the number of the rings minus 1.
+                cols (int): the number of quads in a ring.
+                bottom (bool): whether or not the cap is the bottom one.
+        """
+        indices = self.create_grid_indices(index_offset, rows, cols)
+
+        if bottom:
+            return indices
+
+        return indices.reshape(-1, 3)[:, [0, 2, 1]].ravel()
+
+    def create_outline_cap(self, index_offset, vdata_values, prim_indices, outline, hole,
+                           segs_cap, height, extents, bottom=True):
+        """Append the vertices and their order of a bottom or top cap, subdivided into segs_cap rings,
+           to vdata_values and prim_indices, and return the number of the vertices.
+           Without a hole, the innermost ring is connected to the center of the cap.
+           See create_cap_vertices for the other args.
+            Args:
+                index_offset (int): the index of the first vertex of the cap.
+                prim_indices (array.array): vertex order.
+                segs_cap (int): the number of the rings.
+        """
+        cols = len(outline) - 1
+
+        if hole is None:
+            fractions = np.arange(1, segs_cap + 1) / segs_cap
+            indices = [self.create_fan_indices(index_offset, cols, bottom),
+                       self.create_cap_indices(index_offset + 1, segs_cap - 1, cols, bottom)]
+        else:
+            fractions = np.arange(segs_cap + 1) / segs_cap
+            indices = [self.create_cap_indices(index_offset, segs_cap, cols, bottom)]
+
+        vertex_cnt = self.create_cap_vertices(
+            vdata_values, outline, hole, fractions, height, extents, bottom, center=hole is None)
+        self.extend_prim(prim_indices, np.concatenate(indices))
+        return vertex_cnt
+
+    def create_slice_cap_vertices(self, vdata_values, start, end, normal, u, height, segs_r, segs_a):
+        """Append the vertices of a slice cap, a vertical rectangle from start to end,
+           to vdata_values and return the number of them.
+            Args:
+                vdata_values (array.array): vertex information.
+                start (tuple): the inner bottom corner of the slice cap in the xy-plane.
+                end (tuple): the outer bottom corner of the slice cap in the xy-plane.
+                normal (tuple): the normal of the slice cap.
+                u (numpy.ndarray): the texture coordinates from start to end; shape is (segs_r + 1,).
+                height (float): the height of the slice cap.
+                segs_r (int): subdivisions from start to end.
+                segs_a (int): subdivisions along the z-axis.
+        """
+        start = np.asarray(start, dtype=float)
+        xy = start + (np.asarray(end) - start) * (np.arange(segs_r + 1) / segs_r)[:, None]
+        v = np.arange(segs_a + 1) / segs_a
+
+        vertices = np.empty((segs_a + 1, segs_r + 1, 3))
+        vertices[..., :2] = xy
+        vertices[..., 2] = height * v[:, None]
+        uvs = np.stack(np.broadcast_arrays(u, v[:, None]), axis=2)
+
+        return self.extend_vdata(vdata_values, vertices.reshape(-1, 3), normal, uvs.reshape(-1, 2))
+
+    def create_slice_cap_indices(self, index_offset, rows, cols, is_start=True):
+        """Return the vertex order of the quads of a slice cap.
+           The triangles of the end slice cap are the reverse of the start ones.
+            Args:
+                index_offset (int): the index of the first vertex of the slice cap.
+                rows (int): the number of quad rows.
+                cols (int): the number of quads in a row.
+                is_start (bool): whether or not the slice cap is on the slice start side.
+        """
+        n = cols + 1
+        vi1 = (index_offset + n * np.arange(rows)[:, None] + np.arange(cols)).ravel()
+        vi2 = vi1 + n
+        vi3 = vi1 + 1
+        vi4 = vi2 + 1
+
+        if is_start != self.invert:
+            return np.column_stack([vi1, vi2, vi3, vi2, vi4, vi3]).ravel()
+
+        return np.column_stack([vi1, vi3, vi2, vi2, vi3, vi4]).ravel()
+
+    def create_outline_slice_cap(self, index_offset, vdata_values, prim_indices, start, end, normal, u,
+                                 height, segs_r, segs_a, is_start=True):
+        """Append the vertices and their order of a slice cap to vdata_values and prim_indices,
+           and return the number of the vertices. See create_slice_cap_vertices for the other args.
+            Args:
+                index_offset (int): the index of the first vertex of the slice cap.
+                prim_indices (array.array): vertex order.
+                is_start (bool): whether or not the slice cap is on the slice start side.
+        """
+        vertex_cnt = self.create_slice_cap_vertices(
+            vdata_values, start, end, normal, u, height, segs_r, segs_a)
+        self.extend_prim(prim_indices, self.create_slice_cap_indices(index_offset, segs_a, segs_r, is_start))
+        return vertex_cnt
+
+
+class ProceduralGeometry(SpatialChunks, TriangleStrips, ExtrusionGeometry, LatheGeometry, AbstractGeometry):
+
+    # If True, create_geom_node shares primitives between geoms with identical topology.
+    share_prim = False
+    shared_prims = {}
+
+    def create(self, chunks=None, octree_leaf=None):
+        """Args:
+            chunks (int or tuple):
+                the number of grid cells along the x, y and z axes, like (8, 8, 1), or along every axis;
+                if specified, the geometry is split into one geom per cell.
+            octree_leaf (int):
+                the maximum number of triangles in an octree leaf;
+                if specified (and chunks is not), the geometry is split into one geom per leaf.
+        """
         geom_node = self.get_geom_node()
+
+        if chunks or octree_leaf:
+            geom_node = self.split_geom_node(geom_node, chunks, octree_leaf)
+        elif (bounds := self.calc_bounds()) is not None:
+            self.set_geom_bounds(geom_node, bounds)
+
         model = NodePath(geom_node)
         model.set_two_sided(True)
         return model
 
+    def calc_bounds(self):
+        """Return the bounding volume calculated from the dimensions of the shape.
+           If None is returned, Panda3D computes the bounds from the vertex data.
+        """
+        return None
+
+    def set_geom_bounds(self, geom_node, bounds):
+        """Set the precomputed bounds to the geom node and its geoms
+           so that Panda3D does not scan the vertex data to compute them.
+        """
+        for i in range(geom_node.get_num_geoms()):
+            geom_node.modify_geom(i).set_bounds(bounds)
+
+        if isinstance(bounds, BoundingBox):
+            geom_node.set_bounds_type(BoundingVolume.BT_box)
+
+        geom_node.set_bounds(bounds)
+
     def create_format(self):
         """Return physical layout of the vertex data stored within a Geom
            and the number of floats on each vertex data row.
@@ -49,12 +661,18 @@ class ProceduralGeometry(AbstractGeometry):
         stride = sum(col.get_num_components() for col in cols)
         return stride
 
-    def create_geom_node(self, vertex_count, vdata_values, prim_indices, name='vertex'):
+    def create_geom_node(self, vertex_count, vdata_values, prim_indices, name='vertex', share_prim=None,
+                         strips=None):
         """Args:
             vertex_count (int): the number of vertices.
             vdata_values (array.array): vertex information.
             prim_indices (array.array): vertex order.
             name (str): the name of data.
+            share_prim (bool):
+                if True, the primitive is shared with the other geoms having the same vertex order,
+                so that the index buffer is uploaded to the GPU only once;
+                if None, the share_prim attribute is used.
+            strips (list): the vertex orders of triangle strips; numpy.ndarray.
         """
         fmt = self.create_format()
         vdata = GeomVertexData(name, fmt, Geom.UHStatic)
@@ -62,6 +680,31 @@ class ProceduralGeometry(AbstractGeometry):
         vdata_mem = memoryview(vdata.modify_array(0)).cast('B').cast('f')
         vdata_mem[:] = vdata_values
 
+        if share_prim is None:
+            share_prim = self.share_prim
+
+        geom_node = GeomNode('geomnode')
+        geom = Geom(vdata)
+
+        # When the whole shape is made of strips, no empty GeomTriangles is added.
+        if prim_indices or not strips:
+            if share_prim:
+                prim = self.get_shared_prim(prim_indices)
+            else:
+                prim = self.create_prim(prim_indices)
+
+            geom.add_primitive(prim)
+
+        if strips:
+            geom.add_primitive(self.create_strip_prim(strips))
+
+        geom_node.add_geom(geom)
+        return geom_node
+
+    def create_prim(self, prim_indices):
+        """Args:
+            prim_indices (array.array): vertex order.
+        """
         prim = GeomTriangles(Geom.UHStatic)
 
         # force the index type of the primitive to NT_uint32 if indices higher
@@ -73,11 +716,28 @@ class ProceduralGeometry(AbstractGeometry):
         prim_array.unclean_set_num_rows(len(prim_indices))
         prim_mem = memoryview(prim_array).cast('B').cast(type_code)
         prim_mem[:] = prim_indices
-        geom_node = GeomNode('geomnode')
-        geom = Geom(vdata)
-        geom.add_primitive(prim)
-        geom_node.add_geom(geom)
-        return geom_node
+        return prim
+
+    def get_shared_prim(self, prim_indices):
+        """Return the primitive created from the same vertex order before, if any.
+           Shapes with identical topology, like every Cylinder(segs_c=40, segs_a=2)
+           regardless of radius, reference the same primitive and its index array.
+            Args:
+                prim_indices (array.array): vertex order.
+        """
+        key = (prim_indices.typecode, len(prim_indices), hashlib.blake2b(prim_indices, digest_size=16).digest())
+
+        if (prim := ProceduralGeometry.shared_prims.get(key)) is None:
+            prim = self.create_prim(prim_indices)
+            ProceduralGeometry.shared_prims[key] = prim
+
+        return prim
+
+    @staticmethod
+    def clear_shared_prims():
+        """Release the primitives cached by get_shared_prim.
+        """
+        ProceduralGeometry.shared_prims.clear()
 
     def tranform_vertices(self, vdata, axis_vec, bottom_center, rotation_deg):
         mat = Mat4(Mat4.ident_mat())
@@ -98,13 +758,14 @@ class ProceduralGeometry(AbstractGeometry):
 
         vdata.transform_vertices(mat)
 
-    def add(self, geom_node, add_vdata, add_vert_cnt, add_prim):
+    def add(self, geom_node, add_vdata, add_vert_cnt, add_prim, add_strips=None):
         """Add geometry data to geom node.
             Args:
                 geom_node (GeomNode): geom node to which geometry data are added.
                 add_vdata (array.array or memoryview): vertices that will be added to the geom node.
                 add_vert_cnt (int): the number of vertex data rows that will be added to the geom node.
                 add_prim (array.array or memoryview): vertex order that will be added to the geom node.
+                add_strips (list): the vertex orders of triangle strips that will be added to the geom node.
         """
         geom = geom_node.modify_geom(0)
         vdata = geom.modify_vertex_data()
@@ -115,15 +776,47 @@ class ProceduralGeometry(AbstractGeometry):
         vdata_mem = memoryview(vdata.modify_array(0)).cast('B').cast('f')
         vdata_mem[old_vert_size:] = add_vdata
 
-        prim = geom.modify_primitive(0)
+        prims = {type(prim): i for i, prim in enumerate(geom.get_primitives())}
+
+        if add_strips:
+            strips = [strip + old_vert_cnt for strip in add_strips]
+
+            if (i := prims.get(GeomTristrips)) is not None:
+                strips = self.get_prim_strips(geom.get_primitive(i)) + strips
+                geom.set_primitive(i, self.create_strip_prim(strips))
+            else:
+                geom.add_primitive(self.create_strip_prim(strips))
+
+        if (i := prims.get(GeomTriangles)) is None:
+            if not len(add_prim):
+                return
+
+            i = geom.get_num_primitives()
+            geom.add_primitive(GeomTriangles(Geom.UHStatic))
+
+        prim = geom.modify_primitive(i)
+        add_type_code = add_prim.typecode if isinstance(add_prim, array.array) else add_prim.format
+
+        if add_type_code == 'I' and prim.get_index_type() == Geom.NT_uint16:
+            prim.set_index_type(Geom.NT_uint32)
+
+        if (type_code := 'H' if prim.get_index_type() == Geom.NT_uint16 else 'I') != add_type_code:
+            add_prim = array.array(type_code, add_prim)
+
         old_prim_cnt = prim.get_num_vertices()
         new_prim_cnt = old_prim_cnt + len(add_prim)
         prim_array = prim.modify_vertices()
         prim_array.set_num_rows(new_prim_cnt)
-        prim_mem = memoryview(prim_array).cast('B').cast('H')
+        prim_mem = memoryview(prim_array).cast('B').cast(type_code)
         prim_mem[old_prim_cnt:] = add_prim
         prim.offset_vertices(old_vert_cnt, old_prim_cnt, new_prim_cnt)
 
+        if self.share_prim:
+            # offset_vertices changes the index type to NT_uint32 if the indices exceed 65535.
+            shared_indices = array.array('H' if prim.get_index_type() == Geom.NT_uint16 else 'I')
+            shared_indices.frombytes(memoryview(prim.get_vertices()).cast('B'))
+            geom.set_primitive(i, self.get_shared_prim(shared_indices))
+
     def merge_geom(self, main_geom_nd, new_geom_nd, axis_vec, bottom_center, rotation_deg=0):
         new_geom = new_geom_nd.modify_geom(0)
         new_vdata = new_geom.modify_vertex_data()
@@ -133,14 +826,27 @@ class ProceduralGeometry(AbstractGeometry):
 
         new_prim = new_geom.modify_primitive(0)
         new_prim_array = new_prim.modify_vertices()
-        new_prim_mem = memoryview(new_prim_array).cast('B').cast('H')
+        type_code = 'H' if new_prim.get_index_type() == Geom.NT_uint16 else 'I'
+        new_prim_mem = memoryview(new_prim_array).cast('B').cast(type_code)
         self.add(main_geom_nd, new_vdata_mem, new_vert_cnt, new_prim_mem)
 
 
-class ProceduralPoints(AbstractGeometry):
+class ProceduralPoints(SpatialChunks, AbstractGeometry):
 
-    def create(self):
+    def create(self, chunks=None, octree_leaf=None):
+        """Args:
+            chunks (int or tuple):
+                the number of grid cells along the x, y and z axes, like (8, 8, 8), or along every axis;
+                if specified, the points are split into one geom per cell.
+            octree_leaf (int):
+                the maximum number of points in an octree leaf;
+                if specified (and chunks is not), the points are split into one geom per leaf.
+        """
         geom_node = self.get_geom_node()
+
+        if chunks or octree_leaf:
+            geom_node = self.split_geom_node(geom_node, chunks, octree_leaf)
+
         model = NodePath(geom_node)
         return model
 
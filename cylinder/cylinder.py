@@ -1,12 +1,37 @@
 import array
 import math
+from types import SimpleNamespace
 
-from panda3d.core import Vec3, Point3, Vec2
+import numpy as np
+from panda3d.core import Point3, BoundingBox
 
-from ..create_geometry import ProceduralGeometry
+from ..create_geometry import ProceduralGeometry, ExtrusionGeometry, LatheGeometry
 
 
-class CylinderGeometry:
+class CylinderGeometry(ExtrusionGeometry, LatheGeometry):
+
+    # Overridden by Cylinder to create the mantle as triangle strips.
+    tristrips = False
+
+    def create_cap_triangles(self, vdata_values, bottom=True):
+        segs_cap = self.segs_bc if bottom else self.segs_tc
+        height = 0 if bottom else self.height
+
+        # cap center and triangle vertices
+        return self.create_cap_vertices(
+            vdata_values, self.get_outline(self.radius), None, np.array([1 / segs_cap]),
+            height, self.radius, bottom, center=True)
+
+    def create_cap_quad_vertices(self, vdata_values, bottom=True):
+        segs_cap = self.segs_bc if bottom else self.segs_tc
+        height = 0 if bottom else self.height
+        n = 0 if self.inner_radius else 1
+        hole = self.get_outline(self.inner_radius) if self.inner_radius else None
+
+        # cap quad vertices; without a hole, the innermost ring is created by create_cap_triangles.
+        fractions = np.arange(n * 2, segs_cap + 1) / segs_cap
+        return self.create_cap_vertices(
+            vdata_values, self.get_outline(self.radius), hole, fractions, height, self.radius, bottom)
 
     def create_bottom_cap_triangles(self, index_offset, vdata_values, prim_indices):
         vertex_cnt = 0
@@ -16,8 +41,7 @@ class CylinderGeometry:
             vertex_cnt += self.create_cap_triangles(vdata_values)
 
             # the vertex order of the bottom cap triangles
-            for i in range(index_offset + 1, index_offset + self.segs_c + 1):
-                prim_indices.extend((index_offset, i + 1, i))
+            self.extend_prim(prim_indices, self.create_fan_indices(index_offset, self.segs_c))
 
         return vertex_cnt
 
@@ -26,16 +50,9 @@ class CylinderGeometry:
         vertex_cnt = self.create_cap_quad_vertices(vdata_values)
 
         # the vertex order of the bottom cap quads
-        index_offset += (self.segs_c + 1) if self.inner_radius else 1
         n = 0 if self.inner_radius else 1
-
-        for i in range(n, self.segs_bc):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * (self.segs_c + 1) + j
-                vi2 = vi1 - self.segs_c - 1
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-                prim_indices.extend([*(vi1, vi2, vi3), *(vi1, vi3, vi4)])
+        self.extend_prim(
+            prim_indices, self.create_cap_indices(index_offset + n, self.segs_bc - n, self.segs_c))
 
         return vertex_cnt
 
@@ -44,17 +61,10 @@ class CylinderGeometry:
         vertex_cnt = self.create_mantle_quad_vertices(vdata_values)
 
         # the vertex order of the mantle quads
-        n = self.segs_c + 1
-
-        for i in range(1, self.segs_a + 1):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * n + j
-                vi2 = vi1 - n
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-
-                prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
+        if self.tristrips:
+            self.strips.extend(self.create_strips(index_offset, self.segs_a, self.segs_c))
+        else:
+            self.extend_prim(prim_indices, self.create_grid_indices(index_offset, self.segs_a, self.segs_c, self.invert))
 
         return vertex_cnt
 
@@ -66,8 +76,7 @@ class CylinderGeometry:
             vertex_cnt += self.create_cap_triangles(vdata_values, bottom=False)
 
             # the vertex order of the top cap triangles
-            for i in range(index_offset + 1, index_offset + self.segs_c + 1):
-                prim_indices.extend((index_offset, i, i + 1))
+            self.extend_prim(prim_indices, self.create_fan_indices(index_offset, self.segs_c, bottom=False))
 
         return vertex_cnt
 
@@ -76,17 +85,9 @@ class CylinderGeometry:
         vertex_cnt = self.create_cap_quad_vertices(vdata_values, bottom=False)
 
         # the vertex order of the top cap quads
-        index_offset += (self.segs_c + 1) if self.inner_radius else 1
         n = 0 if self.inner_radius else 1
-
-        for i in range(n, self.segs_tc):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * (self.segs_c + 1) + j
-                vi2 = vi1 - self.segs_c - 1
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-
-                prim_indices.extend([*(vi1, vi3, vi2), *(vi1, vi4, vi3)])
+        self.extend_prim(
+            prim_indices, self.create_cap_indices(index_offset + n, self.segs_tc - n, self.segs_c, bottom=False))
 
         return vertex_cnt
 
@@ -113,25 +114,12 @@ class CylinderSliceCapGeometry:
 
         for is_start in self.slice_caps:
             # the vertices of the slice cap quad
-            vertex_cnt += self.create_slice_cap_quad_vertices(vdata_values, is_start)
+            cnt = self.create_slice_cap_quad_vertices(vdata_values, is_start)
 
             # the vertex order of the slice cap quads
-            for i in range(self.segs_sc_a):
-                for j in range(self.segs_sc_r):
-                    vi1 = index_offset + j
-                    vi2 = vi1 + self.segs_sc_r + 1
-                    vi3 = vi1 + 1
-                    vi4 = vi2 + 1
-
-                    if is_start:
-                        prim_indices.extend((vi1, vi3, vi2) if self.invert else (vi1, vi2, vi3))
-                        prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi2, vi4, vi3))
-                    else:
-                        prim_indices.extend((vi1, vi2, vi3) if self.invert else (vi1, vi3, vi2))
-                        prim_indices.extend((vi2, vi4, vi3) if self.invert else (vi2, vi3, vi4))
-
-                index_offset += self.segs_sc_r + 1
-            index_offset += self.segs_sc_r + 1
+            self.extend_prim(prim_indices, self.create_slice_cap_indices(
+                index_offset + vertex_cnt, self.segs_sc_a, self.segs_sc_r, is_start))
+            vertex_cnt += cnt
 
         return vertex_cnt
 
@@ -143,123 +131,35 @@ class BasicCylinder(CylinderGeometry, CylinderSliceCapGeometry):
         self.slice_rad = math.pi * self.ring_slice_deg / 180
         self.delta_rad = math.pi * ((360 - self.ring_slice_deg) / 180) / self.segs_c
 
-    def create_cap_triangles(self, vdata_values, bottom=True):
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
-        segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
-        height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1
-        r = self.radius / segs_cap
-        vertex_cnt = 0
-
-        # cap center and triangle vertices
-        for i in range(self.segs_c + 1):
-            if i == 0:
-                vertex = Point3(0, 0, height)
-                uv = Vec2(0.5, 0.5)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            angle = self.delta_rad * i + (0 if self.invert else self.slice_rad)
-            c = math.cos(angle)
-            s = math.sin(angle) * direction
-            vertex = Point3(r * c, r * s, height)
-
-            u = 0.5 + c * 0.5 / segs_cap
-            _direction = -direction if bottom else direction
-            v = 0.5 + s * 0.5 * _direction / segs_cap
-
-            vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-            vertex_cnt += 1
-
-        return vertex_cnt
-
-    def create_cap_quad_vertices(self, vdata_values, bottom=True):
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
-        segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
-        height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1  # bottom
-        n = 0 if self.inner_radius else 1
-        vertex_cnt = 0
-
-        # cap quad vertices
-        for i in range(n, segs_cap + 1 - n):
-            r = self.inner_radius + self.thickness * (i + n) / segs_cap
-
-            for j in range(self.segs_c + 1):
-                angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                c = math.cos(angle)
-                s = math.sin(angle) * direction
-                vertex = Point3(r * c, r * s, height)
-
-                _r = r / self.radius
-                u = 0.5 + c * 0.5 * _r
-                _direction = -direction if bottom else direction
-                v = 0.5 + s * 0.5 * _direction * _r
-
-                vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                vertex_cnt += 1
-
-        return vertex_cnt
+    def get_outline(self, radius):
+        cos, sin = self.get_sweep_angles(self.segs_c, self.ring_slice_deg)
+        return np.column_stack([radius * cos, radius * sin])
 
     def create_mantle_quad_vertices(self, vdata_values):
-        direction = -1 if self.invert else 1
-        vertex_cnt = 0
-
-        # mantle quad vertices
-        for i in range(self.segs_a + 1):
-            z = self.height * i / self.segs_a
-            v = i / self.segs_a
-
-            for j in range(self.segs_c + 1):
-                angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                x = self.radius * math.cos(angle)
-                y = self.radius * math.sin(angle) * direction
-                vertex = Point3(x, y, z)
-
-                normal = Vec3(x, y, 0.0).normalized() * direction
-                u = j / self.segs_c
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-        return vertex_cnt
+        # the profile is a vertical line at the radius.
+        v = np.arange(self.segs_a + 1) / self.segs_a
+        profile = SimpleNamespace(r=self.radius, z=self.height * v, nr=1., nz=0., v=v)
+        return self.sweep_profile(vdata_values, profile, self.segs_c, self.ring_slice_deg)
 
     def create_slice_cap_quad_vertices(self, vdata_values, is_start):
-        vertex_cnt = 0
         direction = -1 if self.invert else 1
 
         if is_start:
-            normal = Vec3(0, direction, 0)
+            c, s = 1, 0
+            normal = (0, direction, 0)
         else:
             angle = self.delta_rad * self.segs_c
             c = math.cos(angle)
             s = -math.sin(angle)
-            normal = Vec3(s, -c, 0) * direction
+            normal = (s * direction, -c * direction, 0)
 
-        for i in range(self.segs_sc_a + 1):
-            z = self.height * i / self.segs_sc_a
-            v = i / self.segs_sc_a
+        r = self.inner_radius + self.thickness * np.arange(self.segs_sc_r + 1) / self.segs_sc_r
+        coef = 0.5 if is_start else -0.5
+        u = 0.5 + coef * r / self.radius * direction * -1
 
-            for j in range(self.segs_sc_r + 1):
-                r = self.inner_radius + (self.radius - self.inner_radius) * j / self.segs_sc_r
-                vertex = Point3(r, 0, z) if is_start else Point3(r * c, r * s, z)
-                coef = 0.5 if is_start else -0.5
-                u = 0.5 + coef * r / self.radius * direction * -1
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-        return vertex_cnt
+        return self.create_slice_cap_vertices(
+            vdata_values, (self.inner_radius * c, self.inner_radius * s), (self.radius * c, self.radius * s),
+            normal, u, self.height, self.segs_sc_r, self.segs_sc_a)
 
 
 class Cylinder(BasicCylinder, ProceduralGeometry):
@@ -283,10 +183,12 @@ class Cylinder(BasicCylinder, ProceduralGeometry):
             # start_slice_cap (bool): True, a cap is created on the slice start side; default is True.
             # end_slice_cap (bool): True, a cap is created on the opposite side of the slice start side; default is True.
             invert (bool): whether or not the geometry should be rendered inside-out; default is False.
+            tristrips (bool): whether or not the mantles are created as triangle strips; default is False.
     """
 
     def __init__(self, radius=1., inner_radius=0., height=1., segs_c=40, segs_a=2, segs_top_cap=3,
-                 segs_bottom_cap=3, ring_slice_deg=0, slice_caps_radial=3, slice_caps_axial=2, invert=False):
+                 segs_bottom_cap=3, ring_slice_deg=0, slice_caps_radial=3, slice_caps_axial=2, invert=False,
+                 tristrips=False):
         self.color = (1, 1, 1, 1)
         self.slice_caps = [True, False]
 
@@ -303,6 +205,10 @@ class Cylinder(BasicCylinder, ProceduralGeometry):
         self.segs_sc_r = slice_caps_radial
         self.segs_sc_a = slice_caps_axial
         self.invert = invert
+        self.tristrips = tristrips
+
+    def calc_bounds(self):
+        return BoundingBox(Point3(-self.radius, -self.radius, 0), Point3(self.radius, self.radius, self.height))
 
     def get_geom_node(self):
         self.define_variables()
@@ -310,6 +216,7 @@ class Cylinder(BasicCylinder, ProceduralGeometry):
         # Create an outer cylinder.
         vdata_values = array.array('f', [])
         prim_indices = array.array('H', [])
+        self.strips = []
         vertex_cnt = 0
 
         vertex_cnt = self.create_cylinder(vertex_cnt, vdata_values, prim_indices)
@@ -330,14 +237,15 @@ class Cylinder(BasicCylinder, ProceduralGeometry):
                 ring_slice_deg=self.ring_slice_deg,
                 slice_caps_radial=0,
                 slice_caps_axial=0,
-                invert=not self.invert
+                invert=not self.invert,
+                tristrips=self.tristrips
             )
 
             geom_node = cylinder_maker.get_geom_node()
-            self.add(geom_node, vdata_values, vertex_cnt, prim_indices)
+            self.add(geom_node, vdata_values, vertex_cnt, prim_indices, self.strips)
             return geom_node
 
         # Create the geom node.
         geom_node = self.create_geom_node(
-            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
+            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower(), strips=self.strips)
         return geom_node
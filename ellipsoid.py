@@ -3,7 +3,7 @@ import math
 from types import SimpleNamespace
 
 import numpy as np
-from panda3d.core import Vec3, Point3, Vec2
+from panda3d.core import Vec3, Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 from .sphere import BasicSphere
@@ -69,51 +69,33 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
         """Helper method to define the edge vertices of a bottom or top.
         """
         major_h, _ = self.get_cap_axis(cap)
-        direction = -1 if self.invert else 1
-        _delta = 0 if self.invert else self.slice_rad
         v = (math.pi - math.acos(cap.z / self.semi_minor_axis)) / math.pi
+        profile = SimpleNamespace(r=major_h, z=cap.z, nr=major_h, nz=cap.z, v=v)
 
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            x = major_h * math.cos(angle_h)
-            y = major_h * math.sin(angle_h) * direction
-            vertex = Point3(x, y, cap.z)
-
-            normal = Vec3(x, y, cap.z).normalized() * direction
-            uv = Vec2(i / self.segs_h, v)
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-
-        return self.segs_h + 1
+        return self.sweep_profile(vdata_values, profile, self.segs_h, self.slice_deg)
 
     def get_cap_quad_vertices(self, vdata_values, cap):
         """Helper method to define the quad vertices of a bottom or top cap.
         """
+        if cap.segs < 2:
+            return 0
+
         major_h, _ = self.get_cap_axis(cap)
         direction = -1 if self.invert else 1
-        vertex_cnt = 0
         normal = cap.normal * -1 if self.invert else cap.normal
-        _delta = 0 if self.invert else self.slice_rad
-
-        # Define cap quad vertices.
-        for i in range(1, cap.segs):
-            rj = major_h * (i + 1) / cap.segs
+        _direction = direction * -1 if cap.is_bottom else direction
 
-            for j in range(self.segs_h + 1):
-                angle_h = self.delta_angle_h * j + _delta
-                c = math.cos(angle_h)
-                s = math.sin(angle_h) * direction
-                vertex = Point3(rj * c, rj * s, cap.z)
+        # Each row of the arrays is a ring of the cap quad vertices.
+        i = np.arange(2, cap.segs + 1)[:, None]
+        rj = major_h * i / cap.segs
+        _r = i / cap.segs
+        c = self.cos_h
+        s = self.sin_h
 
-                _r = (i + 1) / cap.segs
-                _direction = direction * -1 if cap.is_bottom else direction
-                u = .5 + .5 * c * _r
-                v = .5 + .5 * s * _direction * _r
-                uv = Vec2(u, v)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
+        vertices = np.stack(np.broadcast_arrays(rj * c, rj * s, cap.z), axis=2).reshape(-1, 3)
+        uvs = np.stack([.5 + .5 * c * _r, .5 + .5 * s * _direction * _r], axis=2).reshape(-1, 2)
 
-            vertex_cnt += self.segs_h + 1
-
-        return vertex_cnt
+        return self.extend_vdata(vdata_values, vertices, normal, uvs)
 
     def get_cap_triangle_vertices(self, vdata_values, cap):
         """Helper method to define the triangle vertices of a bottom or top cap.
@@ -121,54 +103,33 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
         major_h, _ = self.get_cap_axis(cap)
         direction = -1 if self.invert else 1
         normal = cap.normal * -1 if self.invert else cap.normal
-
-        vertex = Point3(0., 0., cap.z)
-        uv = Vec2(.5, .5)
-        vdata_values.extend([*vertex, *self.color, *normal, *uv])
+        _direction = -direction if cap.is_bottom else direction
 
         rj = major_h / cap.segs
-        _delta = 0 if self.invert else self.slice_rad
-
-        # Define the cap triangle vertices.
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            c = math.cos(angle_h)
-            s = math.sin(angle_h) * direction
-            vertex = Point3(rj * c, rj * s, cap.z)
+        c = self.cos_h
+        s = self.sin_h
 
-            _direction = -direction if cap.is_bottom else direction
-            u = .5 + .5 * c / cap.segs
-            v = .5 + .5 * s * _direction / cap.segs
-            uv = Vec2(u, v)
+        vertices = np.empty((self.segs_h + 2, 3))
+        vertices[0] = (0., 0., cap.z)
+        vertices[1:, 0] = rj * c
+        vertices[1:, 1] = rj * s
+        vertices[1:, 2] = cap.z
 
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
+        uvs = np.empty((self.segs_h + 2, 2))
+        uvs[0] = (.5, .5)
+        uvs[1:, 0] = .5 + .5 * c / cap.segs
+        uvs[1:, 1] = .5 + .5 * s * _direction / cap.segs
 
-        return self.segs_h + 2
+        return self.extend_vdata(vdata_values, vertices, normal, uvs)
 
     def get_cap_edge_vertices(self, vdata_values):
         """Helper method to define the triangle vertices along a bottom pole.
         """
-        direction = -1 if self.invert else 1
-        angle_v = self.bottom_angle + self.delta_angle_v
-        z = self.semi_minor_axis * -math.cos(angle_v)
-        rj = self.semi_major_axis * math.sin(angle_v)
-
-        _delta = 0 if self.invert else self.slice_rad
-        v = angle_v / math.pi
-
-        # Define the triangle vertices along the bottom pole.
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            x = rj * math.cos(angle_h)
-            y = rj * math.sin(angle_h) * direction
-            vertex = Point3(x, y, z)
+        rj = self.semi_major_axis * self.sin_v[1]
+        z = self.semi_minor_axis * -self.cos_v[1]
+        profile = SimpleNamespace(r=rj, z=z, nr=rj, nz=z, v=self.angles_v[1] / math.pi)
 
-            normal = vertex.normalized() * direction
-            uv = Vec2(i / self.segs_h, v)
-
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-
-        return self.segs_h + 1
+        return self.sweep_profile(vdata_values, profile, self.segs_h, self.slice_deg)
 
     def create_bottom(self, index_offset, vdata_values, prim_indices):
         """Create bottom.
@@ -203,55 +164,34 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
     def create_mantle_quads(self, index_offset, vdata_values, prim_indices):
         """Create mantle.
         """
-        n = self.segs_h + 1
-        direction = -1 if self.invert else 1
-        _delta = 0 if self.invert else self.slice_rad
-        vertex_cnt = 0
-
-        # Define the mantle quad vertices.
-        for i in range(1, self.segs_v - 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * (i + 1)
-            z = self.semi_minor_axis * -math.cos(angle_v)
-            rj = self.semi_major_axis * math.sin(angle_v)
-            v = angle_v / math.pi
-
-            for j in range(self.segs_h + 1):
-                angle_h = self.delta_angle_h * j + _delta
-                x = rj * math.cos(angle_h)
-                y = rj * math.sin(angle_h) * direction
-                vertex = Point3(x, y, z)
+        if self.segs_v < 3:
+            return 0
 
-                normal = vertex.normalized() * direction
-                uv = Vec2(j / self.segs_h, v)
+        # The mantle rows are at the vertical angles from self.angles_v[2] to self.angles_v[-2].
+        rj = self.semi_major_axis * self.sin_v[2:-1]
+        z = self.semi_minor_axis * -self.cos_v[2:-1]
+        profile = SimpleNamespace(r=rj, z=z, nr=rj, nz=z, v=self.angles_v[2:-1] / math.pi)
 
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            if i > 0:
-                for j in range(self.segs_h):
-                    vi1 = i * n + j + index_offset
-                    vi2 = vi1 - n
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-
-                    prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                    prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
-
-        return vertex_cnt
+        return self.create_lathe(
+            index_offset, vdata_values, prim_indices, profile, self.segs_h, self.slice_deg, join_prev=True)
 
     def create_slice_cap(self, index_offset, vdata_values, prim_indices):
         """Create slice caps.
         """
         direction = -1 if self.invert else 1
         total_vertex_cnt = 0
-        _offset = index_offset
 
-        for is_start in [True, False]:
-            vertex_cnt = 0
-            index_offset = _offset + total_vertex_cnt
-            seg_vecs = []
-            inner_verts = []
+        # the number of vertices in a row of a slice cap, from the bottom to the top.
+        n_bottom = 1 if self.bottom_clip > -1. else 0
+        n_top = 1 if self.top_clip < 1. else 0
+        n = self.segs_v + 1 + n_bottom + n_top
+
+        # the vertices on the z-axis have u = 0.5 instead of the one calculated from x and y.
+        on_axis = np.zeros(n, dtype=bool)
+        on_axis[:n_bottom] = on_axis[n - n_top:] = True
+        on_axis = np.concatenate([on_axis if self.has_inner else [True], np.tile(on_axis, self.segs_sc)])
 
+        for is_start in [True, False]:
             if is_start:
                 c_h = s_h = None
                 normal = Vec3(0., -1., 0.) if self.invert else Vec3(0., 1., 0.)
@@ -262,127 +202,66 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
                 normal = Vec3(s_h, -c_h, 0.) * direction
 
             if self.has_inner:
-                self.get_thickness_cap_vertices(seg_vecs, inner_verts, c_h, s_h)
-
-                # Define the lower inner central vertex of the slice cap.
-                if self.bottom_clip > -1.:
-                    vertex = inner_verts[0]
-                    v = .5 + .5 * vertex.z / self.semi_minor_axis
-                    uv = Vec2(.5, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-                # Define the main inner vertices of the slice cap quads.
-                _i = 1 if self.bottom_clip > -1 else 0
-
-                for i in range(self.segs_v + 1):
-                    vertex = inner_verts[i + _i]
-
-                    dividend = .5 + .5 * vertex.x if is_start else .5 - .5 * Vec3(vertex.xy, 0).length()
-                    u = dividend / self.semi_major_axis * -direction
-                    v = .5 + .5 * vertex.z / self.semi_minor_axis
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+                inner_verts, seg_vecs = self.get_thickness_cap_vertices(c_h, s_h)
+            else:
+                inner_verts, seg_vecs = self.get_cap_vertices(c_h, s_h)
 
-                # Define the upper inner central vertex of the slice cap.
-                if self.top_clip < 1.:
-                    vertex = inner_verts[-1]
-                    v = .5 + .5 * vertex.z / self.minor_axis
-                    uv = Vec2(.5, v)
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+            # Define the vertices of the slice cap; the first row is the inner vertices or the center,
+            # and the following ones are moved toward the outer vertices step by step.
+            steps = np.arange(1, self.segs_sc + 1)[:, None, None]
+            vertices = np.vstack([inner_verts, (inner_verts + seg_vecs * steps).reshape(-1, 3)])
 
-                index_offset += vertex_cnt
+            if is_start:
+                dividend = .5 + .5 * vertices[:, 0]
             else:
-                self.get_cap_vertices(seg_vecs, inner_verts, c_h, s_h)
-
-                vertex = inner_verts[0]
-                v = .5 + .5 * vertex.z / self.semi_minor_axis
-                uv = Vec2(.5, v)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            for i in range(self.segs_sc):
-                # will be incremented when self.bottom_clip > -1 and self.top_clip < 1.
-                cnt = 0
-
-                # Define the lower central vertices of the slice cap.
-                if self.bottom_clip > -1.:
-                    vertex = inner_verts[0] + seg_vecs[0] * (i + 1)
-                    v = .5 + .5 * vertex.z / self.semi_minor_axis
-                    uv = Vec2(.5, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-                    cnt += 1
-
-                # Define the main vertices of the slice cap quads.
-                _idx = 1 if self.bottom_clip > -1. else 0
-
-                for j in range(self.segs_v + 1):
-                    idx = j + _idx
-                    i_v = inner_verts[idx] if self.has_inner else inner_verts[0]
-                    vertex = i_v + seg_vecs[idx] * (i + 1)
-
-                    dividend = .5 + .5 * vertex.x if is_start else .5 - .5 * Vec3(vertex.xy, 0).length()
-                    u = dividend / self.semi_major_axis * -direction
-                    v = .5 + .5 * vertex.z / self.semi_minor_axis
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-                # Define the upper central vertices of the slice cap.
-                if self.top_clip < 1.:
-                    i_v = inner_verts[-1]
-                    vertex = i_v + seg_vecs[-1] * (i + 1)
-                    v = .5 + .5 * vertex.z / self.semi_minor_axis
-                    uv = Vec2(.5, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-                    cnt += 1
-
-                # Define the vertex order of the slice cap triangles.
-                if i == 0 and not self.has_inner:
-                    for j in range(self.segs_v + cnt):
-                        vi1 = index_offset
-                        vi2 = vi1 + j + 1
-                        vi3 = vi2 + 1
-
-                        if is_start:
-                            prim_indices.extend((vi1, vi2, vi3) if self.invert else (vi1, vi3, vi2))
-                        else:
-                            prim_indices.extend((vi1, vi3, vi2) if self.invert else (vi1, vi2, vi3))
-                # Define the vertex order of the slice cap quads.
-                else:
-                    n = cnt + (0 if self.has_inner else 1)
-                    start = 0 if self.has_inner else 1
-
-                    for j in range(start, self.segs_v + n):
-                        vi1 = index_offset + j
-                        vi2 = vi1 - self.segs_v - n - (1 if self.has_inner else 0)
-                        vi3 = vi2 + 1
-                        vi4 = vi1 + 1
-
-                        if is_start:
-                            prim_indices.extend((vi1, vi4, vi2) if self.invert else (vi1, vi2, vi4))
-                            prim_indices.extend((vi2, vi4, vi3) if self.invert else (vi2, vi3, vi4))
-                        else:
-                            prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi4, vi2))
-                            prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi2, vi4, vi3))
-
-                index_offset += self.segs_v + cnt + 1
+                dividend = .5 - .5 * np.linalg.norm(vertices[:, :2], axis=1)
+
+            uvs = np.column_stack([
+                dividend / self.semi_major_axis * -direction,
+                .5 + .5 * vertices[:, 2] / self.semi_minor_axis
+            ])
+            uvs[on_axis, 0] = .5
+
+            vertex_cnt = self.extend_vdata(vdata_values, vertices, normal, uvs)
+
+            # Define the vertex order of the slice cap.
+            use_a = is_start != self.invert
+            start = index_offset + total_vertex_cnt
+            rows = self.segs_sc
+
+            if not self.has_inner:
+                # the triangles around the center
+                vi2 = start + 1 + np.arange(n - 1)
+                vi3 = vi2 + 1
+                vi1 = np.full_like(vi2, start)
+                self.extend_prim(
+                    prim_indices, np.column_stack([vi1, vi3, vi2] if use_a else [vi1, vi2, vi3]).ravel())
+                start += 1
+                rows -= 1
+
+            # the quads between two rows
+            vi2 = (start + n * np.arange(rows)[:, None] + np.arange(n - 1)).ravel()
+            vi1 = vi2 + n
+            vi3 = vi2 + 1
+            vi4 = vi1 + 1
+            quads = [vi1, vi2, vi4, vi2, vi3, vi4] if use_a else [vi1, vi4, vi2, vi2, vi4, vi3]
+            self.extend_prim(prim_indices, np.column_stack(quads).ravel())
+
             total_vertex_cnt += vertex_cnt
 
         return total_vertex_cnt
 
-    def get_thickness_cap_vertices(self, seg_vecs, inner_verts, c_h=None, s_h=None):
+    def get_outer_verts(self, c_h=None, s_h=None):
+        """Get the outer vertices of the sliced surface of a ellipsoid, from the bottom to the top.
+        """
+        c_h, s_h = (1., 0.) if c_h is None and s_h is None else (c_h, s_h)
+        rj = self.semi_major_axis * self.sin_v
+        return np.column_stack([rj * c_h, rj * s_h, self.semi_minor_axis * -self.cos_v])
+
+    def get_thickness_cap_vertices(self, c_h=None, s_h=None):
         """Get the vertices of the sliced surface of a ellipsoid with a double structure
            consisting of an inner and outer ellipsoids.
+           Return the inner vertices and the vectors from them to the outer vertices divided by segs_sc.
         """
         inner_bottom_height = self.bottom_height + self.thickness
         inner_bottom_angle = math.pi - math.acos(np.clip(inner_bottom_height / self.semi_inner_minor, -1.0, 1.0))
@@ -390,63 +269,40 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
         inner_top_height = self.top_height - self.thickness
         inner_top_angle = math.acos(np.clip(inner_top_height / self.semi_inner_minor, -1.0, 1.0))
         inner_delta_angle_v = (math.pi - inner_bottom_angle - inner_top_angle) / self.segs_v
+        _, i_cos_v, i_sin_v = self.get_angle_table(inner_delta_angle_v, self.segs_v, inner_bottom_angle)
 
-        if self.bottom_clip > -1.:
-            inner_verts.append(Point3(0., 0., inner_bottom_height))
-            seg_vecs.append(Vec3(0., 0., -self.thickness / self.segs_sc))
-
-        for i in range(self.segs_v + 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * i
-            c = -math.cos(angle_v)
-            rj = self.semi_major_axis * math.sin(angle_v)
-            z = self.semi_minor_axis * c
-
-            i_angle_v = inner_bottom_angle + inner_delta_angle_v * i
-            i_c = -math.cos(i_angle_v)
-            i_rj = self.semi_inner_major * math.sin(i_angle_v)
-            i_z = self.semi_inner_minor * i_c
-
-            if c_h is None and s_h is None:
-                p = Point3(rj, 0., z)
-                i_p = Point3(i_rj, 0., i_z)
-            else:
-                p = Point3(rj * c_h, rj * s_h, z)
-                i_p = Point3(i_rj * c_h, i_rj * s_h, i_z)
+        c_h, s_h = (1., 0.) if c_h is None and s_h is None else (c_h, s_h)
+        i_rj = self.semi_inner_major * i_sin_v
+
+        inner_verts = np.column_stack([i_rj * c_h, i_rj * s_h, self.semi_inner_minor * -i_cos_v])
+        seg_vecs = (self.get_outer_verts(c_h, s_h) - inner_verts) / self.segs_sc
 
-            inner_verts.append(i_p)
-            seg_vecs.append((p - i_p) / self.segs_sc)
+        if self.bottom_clip > -1.:
+            inner_verts = np.vstack([[0., 0., inner_bottom_height], inner_verts])
+            seg_vecs = np.vstack([[0., 0., -self.thickness / self.segs_sc], seg_vecs])
 
         if self.top_clip < 1.:
-            inner_verts.append(Point3(0, 0, inner_top_height))
-            seg_vecs.append(Vec3(0, 0, self.thickness / self.segs_sc))
+            inner_verts = np.vstack([inner_verts, [0., 0., inner_top_height]])
+            seg_vecs = np.vstack([seg_vecs, [0., 0., self.thickness / self.segs_sc]])
 
-    def get_cap_vertices(self, seg_vecs, inner_verts, c_h=None, s_h=None):
+        return inner_verts, seg_vecs
+
+    def get_cap_vertices(self, c_h=None, s_h=None):
         """Get the vertices of the sliced surface of a ellipsoid.
+           Return the center and the vectors from it to the outer vertices divided by segs_sc.
         """
         z = (self.top_height + self.bottom_height) * .5
         h = (self.top_height - self.bottom_height) * .5
-
-        vertex = Point3(0., 0., z)
-        inner_verts.append(vertex)
+        center = np.array([[0., 0., z]])
+        seg_vecs = (self.get_outer_verts(c_h, s_h) - center) / self.segs_sc
 
         if self.bottom_clip > -1.:
-            seg_vecs.append(Vec3(0., 0., -h / self.segs_sc))
-
-        for i in range(self.segs_v + 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * i
-            c = -math.cos(angle_v)
-            rj = self.semi_major_axis * math.sin(angle_v)
-            z = self.semi_minor_axis * c
-
-            if c_h is None and s_h is None:
-                p = Point3(rj, 0., z)
-            else:
-                p = Point3(rj * c_h, rj * s_h, z)
-
-            seg_vecs.append((p - vertex) / self.segs_sc)
+            seg_vecs = np.vstack([[0., 0., -h / self.segs_sc], seg_vecs])
 
         if self.top_clip < 1.:
-            seg_vecs.append(Vec3(0., 0., h / self.segs_sc))
+            seg_vecs = np.vstack([seg_vecs, [0., 0., h / self.segs_sc]])
+
+        return center, seg_vecs
 
     def define_inner_details(self):
         """If an inner ellipsoid can be created, define the necessary variables.
@@ -481,8 +337,18 @@ class Ellipsoid(BasicSphere, ProceduralGeometry):
         self.top_angle = math.acos(np.clip(self.top_height / self.semi_minor_axis, -1.0, 1.0))
         self.delta_angle_v = (math.pi - self.bottom_angle - self.top_angle) / self.segs_v
 
+        # Calculate the angle tables shared by the mantle, caps and slice caps.
+        self.cos_h, self.sin_h = self.get_sweep_angles(self.segs_h, self.slice_deg)
+        self.angles_v, self.cos_v, self.sin_v = self.get_angle_table(
+            self.delta_angle_v, self.segs_v, self.bottom_angle)
+
         self.define_inner_details()
 
+    def calc_bounds(self):
+        a = self.major_axis / 2
+        c = self.minor_axis / 2
+        return BoundingBox(Point3(-a, -a, c * self.bottom_clip), Point3(a, a, c * self.top_clip))
+
     def get_geom_node(self):
         self.define_variables()
 
@@ -1,7 +1,8 @@
 import array
 import math
 
-from panda3d.core import Vec3, Point3, Vec2
+import numpy as np
+from panda3d.core import Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 
@@ -46,230 +47,56 @@ class EllipticalPrism(ProceduralGeometry):
         self.segs_sc_a = slice_caps_axial
         self.invert = invert
 
-    def create_cap_triangles(self, vdata_values, bottom=True):
-        """Helper method to define the triangle vertices of a bottom or top cap.
-        """
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
-        segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
-        height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1
-        rj = self.semi_major_axis / segs_cap
-        rn = self.semi_minor_axis / segs_cap
-        vertex_cnt = 0
-
-        # cap center and triangle vertices
-        for i in range(self.segs_c + 1):
-            if i == 0:
-                vertex = Point3(0, 0, height)
-                uv = Vec2(0.5, 0.5)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            angle = self.delta_rad * i + (0 if self.invert else self.slice_rad)
+    def get_outline(self, semi_major_axis, semi_minor_axis):
+        return np.column_stack([semi_major_axis * self.cos_c, semi_minor_axis * self.sin_c])
 
-            c = math.cos(angle)
-            s = math.sin(angle) * direction
-            vertex = Point3(rj * c, rn * s, height)
-
-            u = 0.5 + c * 0.5 / segs_cap
-            _direction = -direction if bottom else direction
-            v = 0.5 + s * 0.5 * _direction / segs_cap
-
-            vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-            vertex_cnt += 1
-
-        return vertex_cnt
-
-    def create_cap_quad_vertices(self, vdata_values, bottom=True):
-        """Helper method to define the quad vertices of a bottom or top cap.
-        """
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
+    def create_cap(self, index_offset, vdata_values, prim_indices, bottom=True):
         segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
         height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1
-        n = 0 if self.has_inner else 1
-        vertex_cnt = 0
-
-        # cap quad vertices
-        for i in range(n, segs_cap + 1 - n):
-            rj = self.semi_inner_major + self.major_thickness * (i + n) / segs_cap
-            rn = self.semi_inner_minor + self.minor_thickness * (i + n) / segs_cap
-
-            for j in range(self.segs_c + 1):
-                angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                c = math.cos(angle)
-                s = math.sin(angle) * direction
-                vertex = Point3(rj * c, rn * s, height)
-
-                u = 0.5 + c * 0.5 * (rj / self.semi_major_axis)
-                _direction = -direction if bottom else direction
-                v = 0.5 + s * 0.5 * _direction * (rn / self.semi_minor_axis)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                vertex_cnt += 1
-
-        return vertex_cnt
-
-    def create_bottom_cap_triangles(self, vdata_values, prim_indices):
-        vertex_cnt = 0
-
-        if not self.has_inner:
-            # bottom cap center and triangle vertices
-            vertex_cnt += self.create_cap_triangles(vdata_values)
-
-            # the vertex order of the bottom cap triangles
-            for i in range(1, self.segs_c + 1):
-                prim_indices.extend((0, i + 1, i))
-
-        return vertex_cnt
+        a, b = self.semi_major_axis, self.semi_minor_axis
+        hole = self.get_outline(self.semi_inner_major, self.semi_inner_minor) if self.has_inner else None
 
-    def create_bottom_cap_quads(self, vdata_values, prim_indices):
-        # bottom cap quad vertices
-        vertex_cnt = self.create_cap_quad_vertices(vdata_values)
-
-        # the vertex order of the bottom cap quads
-        index_offset = (self.segs_c + 1) if self.has_inner else 1
-        n = 0 if self.has_inner else 1
-
-        for i in range(n, self.segs_bc):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * (self.segs_c + 1) + j
-                vi2 = vi1 - self.segs_c - 1
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-                prim_indices.extend([*(vi1, vi2, vi3), *(vi1, vi3, vi4)])
-
-        return vertex_cnt
+        return self.create_outline_cap(
+            index_offset, vdata_values, prim_indices, self.get_outline(a, b), hole, segs_cap, height, (a, b), bottom)
 
     def create_mantle_quads(self, index_offset, vdata_values, prim_indices):
-        direction = -1 if self.invert else 1
-        vertex_cnt = 0
-
-        # mantle quad vertices
-        for i in range(self.segs_a + 1):
-            z = self.height * i / self.segs_a
-            v = i / self.segs_a
-
-            for j in range(self.segs_c + 1):
-                angle = self.delta_rad * j + (0 if self.invert else self.slice_rad)
-                x = self.semi_major_axis * math.cos(angle)
-                y = self.semi_minor_axis * math.sin(angle) * direction
-                vertex = Point3(x, y, z)
-                normal = Vec3(x, y, 0.0).normalized() * direction
-                u = j / self.segs_c
-                uv = Vec2(u, v)
+        outline = self.get_outline(self.semi_major_axis, self.semi_minor_axis)
+        u = np.arange(self.segs_c + 1) / self.segs_c
 
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-        # the vertex order of the mantle quads
-        n = self.segs_c + 1
-
-        for i in range(1, self.segs_a + 1):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * n + j
-                vi2 = vi1 - n
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-
-                prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
-
-        return vertex_cnt
-
-    def create_top_cap_triangles(self, index_offset, vdata_values, prim_indices):
-        vertex_cnt = 0
-
-        if not self.has_inner:
-            # top cap center and triangle vertices
-            vertex_cnt += self.create_cap_triangles(vdata_values, bottom=False)
-
-            # the vertex order of the top cap triangles
-            for i in range(index_offset + 1, index_offset + self.segs_c + 1):
-                prim_indices.extend((index_offset, i, i + 1))
-
-        return vertex_cnt
-
-    def create_top_cap_quads(self, index_offset, vdata_values, prim_indices):
-        # the top cap quad vertices
-        vertex_cnt = self.create_cap_quad_vertices(vdata_values, bottom=False)
-
-        # the vertex order of the top cap quads
-        index_offset += (self.segs_c + 1) if self.has_inner else 1
-        n = 0 if self.has_inner else 1
-
-        for i in range(n, self.segs_tc):
-            for j in range(self.segs_c):
-                vi1 = index_offset + i * (self.segs_c + 1) + j
-                vi2 = vi1 - self.segs_c - 1
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-
-                prim_indices.extend([*(vi1, vi3, vi2), *(vi1, vi4, vi3)])
-
-        return vertex_cnt
+        return self.create_extrusion(
+            index_offset, vdata_values, prim_indices, outline, outline, u, self.height, self.segs_a)
 
     def create_slice_cap_quads(self, index_offset, vdata_values, prim_indices):
         vertex_cnt = 0
         direction = -1 if self.invert else 1
 
-        # the vertices of the slice cap quad
         for is_start in [True, False]:
             if is_start:
-                normal = Vec3(0, direction, 0)
+                c, s = 1, 0
+                normal = (0, direction, 0)
             else:
                 angle = self.delta_rad * self.segs_c
                 c = math.cos(angle)
                 s = -math.sin(angle)
-                normal = Vec3(s, -c, 0) * direction
-
-            for i in range(self.segs_sc_a + 1):
-                z = self.height * i / self.segs_sc_a
-                v = i / self.segs_sc_a
-
-                for j in range(self.segs_sc_r + 1):
-                    rj = self.semi_inner_major + self.major_thickness * j / self.segs_sc_r
-                    rn = self.semi_inner_minor + self.minor_thickness * j / self.segs_sc_r
-
-                    vertex = Point3(rj, 0, z) if is_start else Point3(rj * c, rn * s, z)
-                    coef = 0.5 if is_start else -0.5
-                    u = 0.5 + coef * rj / self.major_axis * direction * -1
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-            # the vertex order of the slice cap quads
-            for i in range(self.segs_sc_a):
-                for j in range(self.segs_sc_r):
-                    vi1 = index_offset + j
-                    vi2 = vi1 + self.segs_sc_r + 1
-                    vi3 = vi1 + 1
-                    vi4 = vi2 + 1
-
-                    if is_start:
-                        prim_indices.extend((vi1, vi3, vi2) if self.invert else (vi1, vi2, vi3))
-                        prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi2, vi4, vi3))
-                    else:
-                        prim_indices.extend((vi1, vi2, vi3) if self.invert else (vi1, vi3, vi2))
-                        prim_indices.extend((vi2, vi4, vi3) if self.invert else (vi2, vi3, vi4))
-
-                index_offset += self.segs_sc_r + 1
-            index_offset += self.segs_sc_r + 1
+                normal = (s * direction, -c * direction, 0)
+
+            rj = self.semi_inner_major + self.major_thickness * np.arange(self.segs_sc_r + 1) / self.segs_sc_r
+            coef = 0.5 if is_start else -0.5
+            u = 0.5 + coef * rj / self.major_axis * direction * -1
+
+            vertex_cnt += self.create_outline_slice_cap(
+                index_offset + vertex_cnt, vdata_values, prim_indices,
+                (self.semi_inner_major * c, self.semi_inner_minor * s),
+                (self.semi_major_axis * c, self.semi_minor_axis * s),
+                normal, u, self.height, self.segs_sc_r, self.segs_sc_a, is_start
+            )
 
         return vertex_cnt
 
     def define_variables(self):
         self.slice_rad = math.pi * self.ring_slice_deg / 180
         self.delta_rad = math.pi * ((360 - self.ring_slice_deg) / 180) / self.segs_c
+        self.cos_c, self.sin_c = self.get_sweep_angles(self.segs_c, self.ring_slice_deg)
         self.semi_major_axis = self.major_axis / 2
         self.semi_minor_axis = self.minor_axis / 2
         self.has_inner = False
@@ -287,6 +114,10 @@ class EllipticalPrism(ProceduralGeometry):
         if self.inner_major and self.inner_minor:
             self.has_inner = True
 
+    def calc_bounds(self):
+        a, b = self.semi_major_axis, self.semi_minor_axis
+        return BoundingBox(Point3(-a, -b, 0), Point3(a, b, self.height))
+
     def get_geom_node(self):
         self.define_variables()
 
@@ -296,15 +127,12 @@ class EllipticalPrism(ProceduralGeometry):
         vertex_cnt = 0
 
         if self.segs_bc:
-            vertex_cnt += self.create_bottom_cap_triangles(vdata_values, prim_indices)
-            vertex_cnt += self.create_bottom_cap_quads(vdata_values, prim_indices)
+            vertex_cnt += self.create_cap(vertex_cnt, vdata_values, prim_indices)
 
         vertex_cnt += self.create_mantle_quads(vertex_cnt, vdata_values, prim_indices)
 
         if self.segs_tc:
-            sub_total = vertex_cnt
-            vertex_cnt += self.create_top_cap_triangles(sub_total, vdata_values, prim_indices)
-            vertex_cnt += self.create_top_cap_quads(sub_total, vdata_values, prim_indices)
+            vertex_cnt += self.create_cap(vertex_cnt, vdata_values, prim_indices, bottom=False)
 
         if self.ring_slice_deg and self.segs_sc_r and self.segs_sc_a:
             vertex_cnt += self.create_slice_cap_quads(vertex_cnt, vdata_values, prim_indices)
@@ -1,7 +1,10 @@
 import array
 
+import numpy as np
 from panda3d.core import Point3
 from panda3d.core import Vec3
+from panda3d.core import BoundingBox
+from panda3d.core import Geom, GeomVertexArrayFormat, GeomVertexFormat
 
 from .create_geometry import ProceduralGeometry
 
@@ -14,50 +17,103 @@ class Plane(ProceduralGeometry):
             depth (float): dimension along the y-axis; greater than 0; default is 2.
             segs_w (int) the number of subdivisions in width; greater than 0; default is 6.
             segs_d (int) the number of subdivisions in depth; greater than 0; default is 6.
+            tristrips (bool): whether or not the plane is created as triangle strips; default is False.
+            compact (bool):
+                whether or not the color and normal columns, which are the same for all vertices,
+                are left out of the vertex data; use NodePath.set_color for the color; default is False.
     """
 
-    def __init__(self, width=2, depth=2, segs_w=6, segs_d=6):
+    def __init__(self, width=2, depth=2, segs_w=6, segs_d=6, tristrips=False, compact=False):
         self.color = (1, 1, 1, 1)
         self.width = width
         self.depth = depth
         self.segs_w = segs_w
         self.segs_d = segs_d
+        self.tristrips = tristrips
+        self.compact = compact
 
-    def get_geom_node(self):
-        vdata_values = array.array('f', [])
-        prim_indices = array.array('H', [])
+    def calc_bounds(self):
+        w, d = self.width * 0.5, self.depth * 0.5
+        return BoundingBox(Point3(-w, -d, 0), Point3(w, d, 0))
 
-        start_w = self.width * -0.5
-        start_d = self.depth * -0.5
-        offset_u = -start_w
-        offset_v = -start_d
-        normal = Vec3(0, 0, 1)
+    # The vertex columns left out when compact is True, because they are the same for all vertices.
+    constant_columns = ('color', 'normal')
+
+    def create_format(self):
+        if not self.compact:
+            return super().create_format()
+
+        arr_format = GeomVertexArrayFormat()
+        arr_format.add_column('vertex', 3, Geom.NTFloat32, Geom.CPoint)
 
-        for i in range(self.segs_w + 1):
-            x = start_w + i / self.segs_w * self.width
-            u = (x + offset_u) / self.width
+        if 'color' not in self.constant_columns:
+            arr_format.add_column('color', 4, Geom.NTFloat32, Geom.CColor)
 
-            for j in range(self.segs_d + 1):
-                y = start_d + j / self.segs_d * self.depth
-                v = (y + offset_v) / self.depth
+        if 'normal' not in self.constant_columns:
+            arr_format.add_column('normal', 3, Geom.NTFloat32, Geom.CNormal)
 
-                vdata_values.extend(Point3(x, y, 0))
-                vdata_values.extend(self.color)
-                vdata_values.extend(normal)
-                vdata_values.extend((u, v))
+        arr_format.add_column('texcoord', 2, Geom.NTFloat32, Geom.CTexcoord)
 
-            if i > 0:
-                for k in range(self.segs_d):
-                    idx = i * (self.segs_d + 1) + k
-                    prim_indices.extend((idx, idx - self.segs_d - 1, idx - self.segs_d))
-                    prim_indices.extend((idx, idx - self.segs_d, idx + 1))
+        fmt = GeomVertexFormat.register_format(arr_format)
+        return fmt
 
+    def create_grid_geom_node(self, vertices, normals, uvs):
+        """Create a geom node of a grid of segs_w x segs_d quads.
+           The indices are 32-bit if the grid has more than 65535 vertices.
+            Args:
+                vertices (numpy.ndarray):
+                    shape is (segs_w + 1, segs_d + 1, 3);
+                    each row is a line of vertices along the y-axis.
+                normals (numpy.ndarray): broadcastable to the shape of vertices.
+                uvs (numpy.ndarray): broadcastable to (segs_w + 1, segs_d + 1, 2).
+        """
         vertex_cnt = (self.segs_w + 1) * (self.segs_d + 1)
+        type_code = 'H' if vertex_cnt <= 65535 else 'I'
+        vdata_values = array.array('f', [])
+        prim_indices = array.array(type_code, [])
+
+        columns = [vertices, self.color, normals, uvs]
+
+        if self.compact:
+            columns = [vertices, uvs]
+
+            if 'normal' not in self.constant_columns:
+                columns.insert(1, normals)
+
+            if 'color' not in self.constant_columns:
+                columns.insert(1, self.color)
+
+        rows = np.concatenate(
+            [np.broadcast_to(col, (self.segs_w + 1, self.segs_d + 1, np.shape(col)[-1])) for col in columns],
+            axis=2, dtype=np.float32
+        )
+        vdata_values.frombytes(rows.tobytes())
+
+        if self.tristrips:
+            strips = list(self.create_strips(0, self.segs_w, self.segs_d))
+        else:
+            strips = None
+            self.extend_prim(prim_indices, self.create_grid_indices(0, self.segs_w, self.segs_d))
+
         geom_node = self.create_geom_node(
-            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
+            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower(), strips=strips)
 
         return geom_node
 
+    def get_geom_node(self):
+        start_w = self.width * -0.5
+        start_d = self.depth * -0.5
+
+        x = start_w + np.arange(self.segs_w + 1) / self.segs_w * self.width
+        y = start_d + np.arange(self.segs_d + 1) / self.segs_d * self.depth
+        u = (x - start_w) / self.width
+        v = (y - start_d) / self.depth
+
+        vertices = np.stack(np.broadcast_arrays(x[:, None], y, 0.), axis=2)
+        uvs = np.stack(np.broadcast_arrays(u[:, None], v), axis=2)
+
+        return self.create_grid_geom_node(vertices, (0, 0, 1), uvs)
+
 
 class PlaneForTextureAtlas(ProceduralGeometry):
     """A class to create a plane for texture atlas.
@@ -78,6 +134,10 @@ class PlaneForTextureAtlas(ProceduralGeometry):
         self.start_v = 1 - divides_v
         self.size = size
 
+    def calc_bounds(self):
+        half = self.size / 2
+        return BoundingBox(Point3(-half, 0, -half), Point3(half, 0, half))
+
     def get_geom_node(self):
         vdata_values = array.array('f', [])
         prim_indices = array.array('H', [])
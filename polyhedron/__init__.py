@@ -1,8 +1,9 @@
 from .spherical_polyhedron.cubesphere import Cubesphere
 from .spherical_polyhedron.icosphere import Icosphere
 from .spherical_polyhedron.spherical_polyhedron import SphericalPolyhedron
-from .convex_polyhedron.random_polygonal_prism import RandomPolygonalPrism
-from .convex_polyhedron.random_convex_polyhedron import RandomConvexPolyhedron
+from .convex_polyhedron.random_polygonal_prism import RandomPolygonalPrism, RandomPolygonalPrisms
+from .convex_polyhedron.random_convex_polyhedron import RandomConvexPolyhedron, RandomConvexPolyhedra
 from .convex_polyhedron.dodecahedron import Dodecahedron
+from .convex_polyhedron.convex_hull import ConvexHull
 from .polyhedron import Polyhedron, TriangleGenerator
-from .composite_solid.shattered_sphere import ShatteredSphere
\ No newline at end of file
+from .composite_solid.shattered_sphere import ShatteredSphere, ShatteredSphereFragments
\ No newline at end of file
@@ -1,13 +1,12 @@
 import numpy as np
-import math
-
-from functools import lru_cache
 
 from ..polyhedron import Polyhedron
 from ..spherical_polyhedron.spherical_polyhedron import SphericalVertexData
 from ..convex_polyhedron.convex_polyhedron import PolyhedralVertexData
+from ..convex_polyhedron.random_convex_polyhedron import RandomConvexPolyhedra
+from ..convex_polyhedron.convex_hull import ConvexHull
 
-from panda3d.core import Point3
+from panda3d.core import Point3, BoundingBox
 
 
 class ShatteredSphere(SphericalVertexData, PolyhedralVertexData, Polyhedron):
@@ -18,11 +17,15 @@ class ShatteredSphere(SphericalVertexData, PolyhedralVertexData, Polyhedron):
             spherical_idx (int): index indicating where the spherical face is located in the above list.
             max_depth (int): the number of divisions of one triangle; cannot be negative.
             scale (float): the scale of the polyhedron; greater than 0.
+            smooth_angle (float):
+                if not None, the vertices are welded, and the normals are smoothed between the faces
+                meeting at an angle of this many degrees or less; default is None.
     """
 
-    def __init__(self, polygons, spherical_idx, max_depth=4, scale=2.):
+    def __init__(self, polygons, spherical_idx, max_depth=4, scale=2., smooth_angle=None):
         super().__init__(max_depth, scale)
         self.color = (1, 1, 1, 1)
+        self.smooth_angle = smooth_angle
         self.normal = np.zeros(3)
         self.polygons = polygons
         self.spherical_polygon = [] if spherical_idx is None else self.polygons[spherical_idx]
@@ -31,70 +34,87 @@ class ShatteredSphere(SphericalVertexData, PolyhedralVertexData, Polyhedron):
         self.is_spherical = False
         self.define_variables()
 
+    @classmethod
+    def from_points(cls, points, spherical=True, tolerance=1e-9, **kwargs):
+        """Create the instance from the convex hull of points, like the vertices of a Voronoi cell.
+           The face whose center is the farthest from the origin is made the spherical face.
+            Args:
+                points (numpy.ndarray): the points; shape is (n, 3).
+                spherical (bool): whether or not to have the spherical face; default is True.
+                tolerance (float): the tolerance for the points on a face; see ConvexHull.
+        """
+        polygons = ConvexHull(points, tolerance).get_polygons()
+        spherical_idx = None
+
+        if spherical:
+            centers = np.array([np.mean(polygon, axis=0) for polygon in polygons])
+            spherical_idx = int(np.linalg.norm(centers, axis=1).argmax())
+
+        return cls(polygons, spherical_idx, **kwargs)
+
     def define_variables(self):
         self.polyhedron_org_center = np.mean(np.concatenate(self.polygons), axis=0)
 
         # This will be used to determine whether a vertex is included
         # in the polygon to be converted into a spherical face.
         if len(self.spherical_polygon) > 0:
-            face_center = np.mean(self.spherical_polygon, axis=0)
-            length = len(self.spherical_polygon)
-            self.spherical_tri_areas = []
+            polygon = np.asarray(self.spherical_polygon, dtype=np.float64)
+            self.face_center = np.mean(polygon, axis=0)
+            self.face_normal = self.calc_average_normal(polygon)
 
-            for i, p1 in enumerate(self.spherical_polygon):
-                p2 = self.spherical_polygon[(i + 1) % length]
+            # the inward normals of the edges in the plane of the polygon.
+            edge_normals = np.cross(self.face_normal, np.roll(polygon, -1, axis=0) - polygon)
+            edge_normals /= np.linalg.norm(edge_normals, axis=1, keepdims=True)
+            edge_normals[np.einsum('ij,ij->i', self.face_center - polygon, edge_normals) < 0] *= -1
 
-                tri = [face_center, p1, p2]
-                area = self.calc_triangle_area(*tri)
-                self.spherical_tri_areas.append((tri, area))
+            self.edge_normals = edge_normals
+            self.edge_offsets = np.einsum('ij,ij->i', polygon, edge_normals)
 
-    @lru_cache(maxsize=256)
-    def is_inside(self, vert, tolerance=1e-5):
-        """Check whether the vertex lies within the face
+    def is_inside(self, vertices, tolerance=1e-5):
+        """Return whether each vertex lies within the face
            that is being transformed into a spherical face.
+            Args:
+                vertices (numpy.ndarray): shape is (n, 3).
         """
-        for tri, area_master in self.spherical_tri_areas:
-            area_target = sum(self.calc_triangle_area(
-                vert, tri[i], tri[(i + 1) % 3]) for i in range(3))
+        if len(self.spherical_polygon) == 0:
+            return np.zeros(len(vertices), dtype=bool)
 
-            if abs(area_target - area_master) < tolerance:
-                return True
+        on_plane = np.abs((vertices - self.face_center) @ self.face_normal) < tolerance
+        in_edges = vertices @ self.edge_normals.T - self.edge_offsets > -tolerance
 
-    @lru_cache(maxsize=256)
-    def calc_convex_uv(self, vert, normal):
-        return self.project_to_uv(vert, normal)
+        return on_plane & in_edges.all(axis=1)
 
-    def get_uv_coords(self, tri_vertices):
-        uvs = [self.calc_uv(Point3(*self.normalize(vert))) for vert in tri_vertices]
-        self.fix_uv(*uvs)
+    def get_uv_coords(self, tris):
+        """Return the spherical UV coordinates of the triangles; shape is (n, 3, 2).
+        """
+        uvs = self.calc_uv(tris / np.linalg.norm(tris, axis=2, keepdims=True))
+        self.fix_uv(uvs)
 
         return uvs
 
-    def normalize(self, vertex):
-        norm = math.hypot(*vertex)
-        return vertex / norm
-
     def create_polyhedron(self, vdata_values, prim_indices):
-        for i, tri in enumerate(self.generate_divided_tri()):
-            sphere_uv = None
+        vertex_cnt = 0
 
-            for j, vert in enumerate(tri):
-                if len(self.spherical_polygon) > 0 and self.is_inside(tuple(vert)):
-                    vert = self.normalize(vert)
-                    normal = vert if self.is_spherical else self.normal
+        for tris in self.generate_divided_tri():
+            vertices = tris.reshape(-1, 3)
+            inside = self.is_inside(vertices)[:, None]
 
-                    if sphere_uv is None:
-                        sphere_uv = self.get_uv_coords(tri)
-                    uv = sphere_uv[j]
-                else:
-                    normal = self.normal
-                    uv = self.calc_convex_uv(tuple(vert), tuple(self.normal))
+            # The vertices within the spherical face are pushed onto the unit sphere
+            # and have the UV coordinates of the sphere.
+            sphere_vertices = vertices / np.linalg.norm(vertices, axis=1, keepdims=True)
+            sphere_uvs = self.get_uv_coords(tris).reshape(-1, 2)
 
-                vertex = (vert - self.polyhedron_org_center) * self.scale
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
+            tangent, bitangent = self.calc_uv_frames(np.reshape(self.normal, (1, 3)))
+            convex_uvs = vertices @ np.concatenate([tangent, bitangent]).T
 
-            indices = (idx := i * 3, idx + 1, idx + 2)
-            prim_indices.extend(indices)
+            vertices = np.where(inside, sphere_vertices, vertices)
+            normals = np.where(inside & self.is_spherical, sphere_vertices, self.normal)
+            uvs = np.where(inside, sphere_uvs, convex_uvs)
+
+            vertex_cnt += self.extend_vdata(
+                vdata_values, (vertices - self.polyhedron_org_center) * self.scale, normals, uvs)
+
+        self.extend_prim(prim_indices, np.arange(vertex_cnt))
 
     def generate_triangles(self):
         for i, vertices in enumerate(self.polygons):
@@ -111,6 +131,154 @@ class ShatteredSphere(SphericalVertexData, PolyhedralVertexData, Polyhedron):
 
             self.is_spherical = False
 
+    def calc_bounds(self):
+        vertices = np.concatenate(self.polygons)
+        min_pt = vertices.min(axis=0)
+        max_pt = vertices.max(axis=0)
+
+        # The vertices pushed onto the unit sphere move away from the spherical face
+        # by at most 1 - (the distance between the face and the sphere center).
+        if len(self.spherical_polygon) > 0:
+            normal = self.calc_average_normal(self.spherical_polygon)
+            sagitta = 1 - abs(np.dot(normal, self.spherical_polygon[0]))
+            min_pt = min_pt - sagitta
+            max_pt = max_pt + sagitta
+
+        min_pt = (min_pt - self.polyhedron_org_center) * self.scale
+        max_pt = (max_pt - self.polyhedron_org_center) * self.scale
+        return BoundingBox(Point3(*min_pt), Point3(*max_pt))
+
     def get_geom_node(self):
         faces = sum(len(face) for face in self.polygons)
         return self.create_polyhedron_geom_node(faces)
+
+
+class ShatteredSphereFragments(SphericalVertexData, RandomConvexPolyhedra):
+    """A class to create all fragments of a shattered sphere, like the Voronoi cells clipped by a sphere,
+       as one geom. The spherical face of each fragment is made the same way as ShatteredSphere,
+       and the fragments stay in place; cell_ranges and the methods of RandomConvexPolyhedra
+       can hide, show or detach each fragment.
+       The UV coordinates of the flat faces are projected in the same way on both sides of a crack,
+       so that the fragments match each other.
+
+        Args:
+            vertices (numpy.ndarray): the vertices of all polygons of all fragments in order; shape is (n, 3).
+            face_sizes (numpy.ndarray): the number of vertices of each polygon.
+            cell_sizes (numpy.ndarray): the number of polygons of each fragment.
+            spherical_indices (list):
+                the index of the spherical face of each fragment in its polygons; None if not having it.
+            max_depth (int): the number of divisions of one triangle; cannot be negative.
+            scale (float): the scale of the sphere; greater than 0.
+    """
+
+    def __init__(self, vertices, face_sizes, cell_sizes, spherical_indices=None, max_depth=4, scale=2.):
+        super().__init__(vertices, face_sizes, cell_sizes, max_depth, scale)
+
+        if spherical_indices is None:
+            spherical_indices = [None] * len(self.cell_sizes)
+
+        # the index of the spherical face of each fragment in all polygons; -1 if not having it.
+        cell_starts = np.cumsum(self.cell_sizes) - self.cell_sizes
+        self.spherical_faces = np.array(
+            [-1 if idx is None else start + idx for start, idx in zip(cell_starts.tolist(), spherical_indices)],
+            dtype=np.int64
+        )
+
+    def calc_spherical_planes(self, normals):
+        """Return the center, the normal, and the inward normals and offsets of the edges
+           of the spherical face of each fragment; the edges are padded so that
+           the padding edges contain everything.
+            Args:
+                normals (numpy.ndarray): the normals of all polygons; shape is (faces, 3).
+        """
+        faces = np.maximum(self.spherical_faces, 0)
+        starts = (np.cumsum(self.face_sizes) - self.face_sizes)[faces]
+        sizes = self.face_sizes[faces]
+
+        cols = np.arange(sizes.max())
+        valid = cols < sizes[:, None]
+        points = self.vertices[starts[:, None] + np.minimum(cols, sizes[:, None] - 1)]
+        next_points = self.vertices[starts[:, None] + (cols + 1) % sizes[:, None]]
+
+        centers = np.add.reduceat(self.vertices, np.cumsum(self.face_sizes) - self.face_sizes)[faces]
+        centers /= sizes[:, None]
+        face_normals = normals[faces]
+
+        edge_normals = np.cross(face_normals[:, None], next_points - points)
+        norms = np.linalg.norm(edge_normals, axis=2, keepdims=True)
+        edge_normals = np.divide(edge_normals, norms, out=np.zeros_like(edge_normals), where=norms > 0)
+
+        flip = np.einsum('ijk,ijk->ij', centers[:, None] - points, edge_normals) < 0
+        edge_normals[flip] *= -1
+
+        edge_offsets = np.einsum('ijk,ijk->ij', points, edge_normals)
+        edge_offsets[~valid] = -np.inf
+
+        return centers, face_normals, edge_normals, edge_offsets
+
+    def is_inside(self, vertices, vertex_cells, normals, tolerance=1e-5):
+        """Return whether each vertex lies within the spherical face of its fragment.
+            Args:
+                vertices (numpy.ndarray): shape is (n, 3).
+                vertex_cells (numpy.ndarray): the fragment of each vertex.
+                normals (numpy.ndarray): the normals of all polygons; shape is (faces, 3).
+        """
+        centers, face_normals, edge_normals, edge_offsets = self.calc_spherical_planes(normals)
+
+        on_plane = np.abs(np.einsum(
+            'ij,ij->i', vertices - centers[vertex_cells], face_normals[vertex_cells])) < tolerance
+        in_edges = np.einsum('ij,ikj->ik', vertices, edge_normals[vertex_cells]) \
+            - edge_offsets[vertex_cells] > -tolerance
+
+        return (self.spherical_faces[vertex_cells] >= 0) & on_plane & in_edges.all(axis=1)
+
+    def calc_canonical_normals(self, normals):
+        """Return the normals flipped so that the first non-zero component is positive;
+           the faces of the adjacent fragments on the same plane get the same normal.
+        """
+        lead = np.argmax(np.abs(normals) > 1e-6, axis=1)
+        signs = np.where(normals[np.arange(len(normals)), lead] < 0, -1., 1.)
+
+        return normals * signs[:, None]
+
+    def generate_triangles(self):
+        yield self.get_fan_triangles(self.vertices)
+
+    def create_polyhedron(self, vdata_values, prim_indices):
+        normals = self.calc_face_normals(self.vertices, self.face_sizes, self.cell_centers[self.face_cells])
+        tangents, bitangents = self.calc_uv_frames(self.calc_canonical_normals(normals))
+
+        tri_faces = np.repeat(np.arange(len(self.face_sizes)), self.face_sizes * 4 ** self.max_depth)
+        vertex_faces = np.repeat(tri_faces, 3)
+        vertex_cells = self.face_cells[vertex_faces]
+
+        for tris in self.generate_divided_tri():
+            vertices = tris.reshape(-1, 3)
+            inside = self.is_inside(vertices, vertex_cells, normals)[:, None]
+            on_sphere = inside & (vertex_faces == self.spherical_faces[vertex_cells])[:, None]
+
+            # The UV coordinates of the sphere are calculated from the triangles pushed onto it.
+            sphere_tris = tris / np.linalg.norm(tris, axis=2, keepdims=True)
+            sphere_vertices = sphere_tris.reshape(-1, 3)
+            sphere_uvs = self.calc_uv(sphere_tris)
+            self.fix_uv(sphere_uvs)
+
+            convex_uvs = np.stack([
+                np.einsum('ij,ij->i', vertices, tangents[vertex_faces]),
+                np.einsum('ij,ij->i', vertices, bitangents[vertex_faces])
+            ], axis=1)
+
+            vertices = np.where(inside, sphere_vertices, vertices) * self.scale
+            self.extents = (vertices.min(axis=0), vertices.max(axis=0))
+
+            vertex_cnt = self.extend_vdata(
+                vdata_values,
+                vertices,
+                np.where(on_sphere, sphere_vertices, normals[vertex_faces]),
+                np.where(inside, sphere_uvs.reshape(-1, 2), convex_uvs)
+            )
+
+        self.extend_prim(prim_indices, np.arange(vertex_cnt))
+
+    def calc_bounds(self):
+        return BoundingBox(Point3(*self.extents[0]), Point3(*self.extents[1]))
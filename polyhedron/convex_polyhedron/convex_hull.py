@@ -0,0 +1,212 @@
+import numpy as np
+
+
+class ConvexHull:
+    """A class to build the convex hull of points as the polygons of its faces,
+       which can be passed to RandomConvexPolyhedron, RandomConvexPolyhedra and ShatteredSphere.
+       The faces are found one by one by rotating a plane about the edges of the faces found already
+       (gift wrapping), so the cost is proportional to the number of points times the number of faces.
+       The points closer than the tolerance are merged first; then the coplanar points are merged
+       into one polygon, and the vertices of each polygon are ordered counterclockwise seen from the outside,
+       leaving out the points inside the faces and on the edges.
+
+        Args:
+            points (numpy.ndarray): the points; shape is (n, 3); at least 4 points not on one plane.
+            tolerance (float): the tolerance for the points on a face, relative to the size of the points; default is 1e-9.
+    """
+
+    def __init__(self, points, tolerance=1e-9):
+        points = np.asarray(points, dtype=np.float64)
+        extent = np.ptp(points, axis=0).max() if len(points) else 0
+        self.eps = tolerance * max(extent, 1e-300)
+        self.points = self.merge_points(points)
+
+    def merge_points(self, points):
+        """Return the points without the ones closer than the tolerance to another point.
+            Args:
+                points (numpy.ndarray): the points; shape is (n, 3).
+        """
+        order = np.argsort(points[:, 0], kind='stable')
+        xs = points[order, 0]
+
+        # Only the points within the tolerance along the x-axis are compared.
+        ends = np.searchsorted(xs, xs + self.eps, side='right')
+        keep = np.ones(len(points), dtype=bool)
+
+        for i in np.nonzero(ends - np.arange(len(points)) > 1)[0].tolist():
+            if keep[order[i]]:
+                near = order[i + 1:ends[i]]
+                close = np.linalg.norm(points[near] - points[order[i]], axis=1) < self.eps
+                keep[near[close]] = False
+
+        return points[keep]
+
+    def order_polygon(self, indices, normal):
+        """Return the indices of the points of a face in counterclockwise order around the normal,
+           dropping the points inside the polygon or on its edges (gift wrapping on the plane).
+            Args:
+                indices (list): the indices of the points on the face.
+                normal (tuple): the outward unit normal of the face.
+        """
+        nx, ny, nz = normal
+
+        # tangent = normal x (1, 0, 0) or normal x (0, 1, 0), bitangent = normal x tangent
+        tx, ty, tz = (0., nz, -ny) if abs(nx) < 0.9 else (-nz, 0., nx)
+        bx, by, bz = ny * tz - nz * ty, nz * tx - nx * tz, nx * ty - ny * tx
+
+        xy = [(x * tx + y * ty + z * tz, x * bx + y * by + z * bz) for x, y, z in self.points[indices].tolist()]
+        cx, cy = sum(x for x, _ in xy) / len(xy), sum(y for _, y in xy) / len(xy)
+
+        # Wrap the points from the farthest one from their center, which is always a vertex;
+        # the next vertex is the point having no other points on its right, the farthest of collinear ones.
+        chain = [max(range(len(xy)), key=lambda i: (xy[i][0] - cx) ** 2 + (xy[i][1] - cy) ** 2)]
+
+        while len(chain) <= len(xy):
+            vx, vy = xy[chain[-1]]
+            nxt = None
+
+            for i, (x, y) in enumerate(xy):
+                dx, dy = x - vx, y - vy
+                dist = (dx * dx + dy * dy) ** 0.5
+
+                if dist <= self.eps:
+                    continue
+
+                if nxt is None:
+                    nxt, qx, qy, q_dist = i, dx, dy, dist
+                    continue
+
+                cross = qx * dy - qy * dx
+
+                if cross < -self.eps * q_dist or (cross <= self.eps * q_dist and dist > q_dist):
+                    nxt, qx, qy, q_dist = i, dx, dy, dist
+
+            if nxt == chain[0]:
+                break
+
+            chain.append(nxt)
+
+        return [indices[i] for i in chain]
+
+    def create_face(self, normal, origin):
+        """Return the indices of the vertices of the face on the plane in counterclockwise order.
+            Args:
+                normal (tuple): the outward unit normal of the plane.
+                origin (int): the index of a point on the plane.
+        """
+        dists = self.points @ normal
+        on_plane = np.flatnonzero(np.abs(dists - dists[origin]) <= self.eps).tolist()
+        return self.order_polygon(on_plane, normal)
+
+    def pivot(self, origins, edges, normals):
+        """Rotate the planes touching the points about a line on each of them until the planes
+           touch other points, and return the outward unit normals of the new planes
+           and the indices of the points touched; numpy.ndarrays of shape (m, 3) and (m,).
+            Args:
+                origins (numpy.ndarray): the indices of a point on each line; shape is (m,).
+                edges (numpy.ndarray): the directions of the lines; shape is (m, 3);
+                                       the points on the planes must be on their left.
+                normals (numpy.ndarray): the outward unit normals of the planes; shape is (m, 3).
+        """
+        inward = normals[:, [1, 2, 0]] * edges[:, [2, 0, 1]] - normals[:, [2, 0, 1]] * edges[:, [1, 2, 0]]
+        inward /= np.sqrt((inward ** 2).sum(axis=1))[:, None]
+
+        # Project the points onto the planes perpendicular to the lines; y <= 0 for all of them.
+        m = len(origins)
+        proj = self.points @ np.concatenate([inward, normals]).T
+        proj -= proj[np.concatenate([origins, origins]), np.arange(m * 2)]
+        x, y = proj[:, :m], proj[:, m:]
+
+        # The new planes touch the points farthest clockwise from the old planes;
+        # the points slightly above the planes by rounding errors are put on them.
+        angles = np.arctan2(np.abs(np.minimum(y, 0)), x)
+        angles[x * x + y * y <= self.eps * self.eps] = -1
+        tips = np.argmax(angles, axis=0)
+        cols = np.arange(m)
+
+        if (angles[tips, cols] < 0).any():
+            raise ValueError('The points must not be coplanar.')
+
+        new_normals = y[tips, cols, None] * inward - x[tips, cols, None] * normals
+        return new_normals / np.sqrt((new_normals ** 2).sum(axis=1))[:, None], tips
+
+    def find_first_face(self):
+        """Return the outward unit normal and the vertex indices of a face having the lowest point.
+        """
+        a = int(np.lexsort(self.points.T[::-1])[0])
+
+        # The plane x = const touching the lowest point is rotated about the line along the z-axis,
+        # which leaves the points on the plane on its left; if the plane then touches only an edge,
+        # it is rotated once more about the edge.
+        normals, _ = self.pivot(np.array([a]), np.array([[0., 0., 1.]]), np.array([[-1., 0., 0.]]))
+        face = self.create_face(tuple(normals[0]), a)
+
+        if len(face) < 3:
+            normals, _ = self.pivot(np.array([a]), self.points[face[1]] - self.points[face[:1]], normals)
+            face = self.create_face(tuple(normals[0]), a)
+
+        if np.abs((self.points - self.points[a]) @ normals[0]).max() <= self.eps:
+            raise ValueError('The points must not be coplanar.')
+
+        return normals[0], face
+
+    def find_faces(self):
+        """Return the vertex indices of each face in counterclockwise order.
+           The faces across the edges of the faces found last are found at once.
+        """
+        normal, face = self.find_first_face()
+        faces = [face]
+        edges = set(zip(face, face[1:] + face[:1]))
+        found = {frozenset(face)}
+        pending = [(a, b, normal) for a, b in zip(face, face[1:] + face[:1])]
+
+        while pending:
+            starts, ends, normals = zip(*pending)
+            starts, ends = np.array(starts), np.array(ends)
+            normals, tips = self.pivot(starts, self.points[ends] - self.points[starts], np.array(normals))
+
+            dists = self.points @ normals.T
+            on_plane = np.abs(dists - dists[starts, np.arange(len(starts))]) <= self.eps
+            counts = on_plane.sum(axis=0).tolist()
+            pending = []
+
+            for i, (a, b, c) in enumerate(zip(starts.tolist(), ends.tolist(), tips.tolist())):
+                # The face on the other side of an edge has the edge in the opposite direction.
+                if (b, a) in edges:
+                    continue
+
+                if counts[i] == 3:
+                    face = [b, a, c]
+                else:
+                    face = self.order_polygon(np.flatnonzero(on_plane[:, i]).tolist(), tuple(normals[i]))
+
+                key = frozenset(face)
+
+                if key in found:
+                    continue
+
+                found.add(key)
+                faces.append(face)
+                new_edges = list(zip(face, face[1:] + face[:1]))
+                edges.update(new_edges)
+                pending.extend((c, d, normals[i]) for c, d in new_edges)
+
+            pending = [(a, b, normal) for a, b, normal in pending if (b, a) not in edges]
+
+        return faces
+
+    def get_faces(self):
+        """Return the vertices of all faces in order and the number of vertices of each face;
+           numpy.ndarrays of shape (n, 3) and (faces,).
+        """
+        if len(self.points) < 4:
+            raise ValueError('At least 4 points are needed.')
+
+        faces = self.find_faces()
+        return self.points[sum(faces, [])], np.array([len(face) for face in faces])
+
+    def get_polygons(self):
+        """Return the polygons of the faces; a list of numpy.ndarray.
+        """
+        vertices, face_sizes = self.get_faces()
+        return np.split(vertices, np.cumsum(face_sizes)[:-1])
@@ -1,3 +1,4 @@
+import array
 import math
 
 import numpy as np
@@ -10,6 +11,10 @@ class PolyhedralVertexData:
        and the normal of a convex polyhedron
     """
 
+    # If not None, the vertices at the same position are welded, and the normals of the faces
+    # meeting at an angle of this many degrees or less are smoothed across their edges.
+    smooth_angle = None
+
     def calc_normal_newell(self, vertices):
         """Calculating the average normal using the Newell method.
             Args:
@@ -127,20 +132,154 @@ class PolyhedralVertexData:
 
         return u, v
 
+    def calc_uv_frames(self, normals):
+        """Return the tangents and bitangents used by project_to_uv for each normal;
+           numpy.ndarrays of the same shape as normals.
+            Args:
+                normals (numpy.ndarray): unit normals; shape is (n, 3).
+        """
+        vecs = np.where(np.abs(normals[:, :1]) < 0.9, [1., 0., 0.], [0., 1., 0.])
+
+        tangents = np.cross(normals, vecs)
+        tangents /= np.linalg.norm(tangents, axis=1, keepdims=True)
+
+        bitangents = np.cross(normals, tangents)
+        bitangents /= np.linalg.norm(bitangents, axis=1, keepdims=True)
+
+        return tangents, bitangents
+
+    def calc_face_normals(self, vertices, face_sizes, centers):
+        """Return the normals of polygons, calculated in the same way as calc_average_normal,
+           with the polygons packed into one array.
+            Args:
+                vertices (numpy.ndarray): the vertices of all polygons in order; shape is (n, 3).
+                face_sizes (numpy.ndarray): the number of vertices of each polygon.
+                centers (numpy.ndarray):
+                    the point each normal is flipped away from, for each polygon; shape is (faces, 3).
+        """
+        starts = np.cumsum(face_sizes) - face_sizes
+        face_indices = np.repeat(np.arange(len(face_sizes)), face_sizes)
+        local_indices = np.arange(len(vertices)) - starts[face_indices]
+
+        # The fan triangles (v0, vi, vi+1) for 1 <= i <= n - 2 of each polygon.
+        v0 = vertices[starts[face_indices]]
+        next_v = vertices[np.minimum(np.arange(len(vertices)) + 1, len(vertices) - 1)]
+        crosses = np.cross(vertices - v0, next_v - v0)
+        crosses[(local_indices == 0) | (local_indices == face_sizes[face_indices] - 1)] = 0
+
+        normals = np.add.reduceat(crosses, starts)
+        flip = np.einsum('ij,ij->i', normals, vertices[starts] - centers) < 0
+        normals[flip] *= -1
+
+        norms = np.linalg.norm(normals, axis=1, keepdims=True)
+        return np.divide(normals, norms, out=np.zeros_like(normals), where=norms > 0)
+
+    def calc_smooth_normals(self, vertex_ids, normals, weights, smooth_angle):
+        """Return the normals of the triangle corners averaged with the normals of the other corners
+           at the same vertex, if the angle between them is not greater than smooth_angle.
+            Args:
+                vertex_ids (numpy.ndarray): the welded vertex of each corner; shape is (n,).
+                normals (numpy.ndarray): the unit normal of each corner; shape is (n, 3).
+                weights (numpy.ndarray): the area of the triangle of each corner; shape is (n,).
+                smooth_angle (float): the maximum angle in degrees between the smoothed normals.
+        """
+        # all pairs of the corners at the same vertex, including the pairs of a corner and itself.
+        order = np.argsort(vertex_ids, kind='stable')
+        counts = np.bincount(vertex_ids)
+        sizes = counts[vertex_ids[order]]
+
+        pair_starts = np.cumsum(sizes) - sizes
+        rep = np.repeat(np.arange(len(order)), sizes)
+        group_starts = (np.cumsum(counts) - counts)[vertex_ids[order]]
+
+        corners = order[rep]
+        partners = order[np.repeat(group_starts, sizes) + np.arange(len(rep)) - pair_starts[rep]]
+
+        cos = np.cos(np.radians(smooth_angle)) - 1e-6
+        near = np.einsum('ij,ij->i', normals[corners], normals[partners]) >= cos
+        corners, partners = corners[near], partners[near]
+
+        # area-weighted sum of the normals, scattered onto the corners.
+        smooth = np.zeros((len(normals), 3))
+        np.add.at(smooth, corners, normals[partners] * weights[partners, None])
+
+        norms = np.linalg.norm(smooth, axis=1, keepdims=True)
+        return np.divide(smooth, norms, out=np.array(normals, dtype=np.float64), where=norms > 0)
+
+    def calc_vertex_ids(self, tolerance=1e-6):
+        """Return the welded vertex of each corner of the subdivided triangles, in the same order
+           as the vertex data. Only the corners of the triangles from generate_triangles are welded
+           by their positions; subdivide_indexed shares the midpoints between the adjacent triangles.
+            Args:
+                tolerance (float): the distance between the welded positions, relative to the size.
+        """
+        corners = np.concatenate([np.reshape(tri, (-1, 3)) for tri in self.generate_triangles()])
+        extent = max(np.ptp(corners, axis=0).max(), 1e-300)
+        keys = np.round(corners / (extent * tolerance)).astype(np.int64)
+        _, first, inverse = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+
+        _, faces = self.subdivide_indexed(corners[first], inverse.reshape(-1, 3), self.max_depth)
+        return faces.reshape(-1)
+
+    def weld_vertex_rows(self, rows, vertex_ids):
+        """Weld the rows of the triangle soup at the same vertex with the same normal
+           and UV coordinates after smoothing, and return the welded rows and the vertex order.
+            Args:
+                rows (numpy.ndarray): the vertex data of the triangles in order; shape is (n, 12).
+                vertex_ids (numpy.ndarray): the welded vertex of each row; shape is (n,).
+        """
+        positions = rows[:, :3].astype(np.float64)
+        tris = positions.reshape(-1, 3, 3)
+        areas = np.linalg.norm(np.cross(tris[:, 1] - tris[:, 0], tris[:, 2] - tris[:, 0]), axis=1) / 2
+        normals = self.calc_smooth_normals(
+            vertex_ids, rows[:, 7:10].astype(np.float64), np.repeat(areas, 3), self.smooth_angle)
+
+        # The corners of the faces on both sides of a hard edge keep their own normals.
+        keys = np.column_stack([
+            vertex_ids,
+            np.round(normals * 1e5).astype(np.int64),
+            np.round(rows[:, 10:] * 1e5).astype(np.int64)
+        ])
+        _, first, indices = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+
+        welded = rows[first]
+        welded[:, 7:10] = normals[first]
+        return welded, indices.reshape(-1)
+
+    def create_polyhedron_vdata(self, faces):
+        vdata_values, prim_indices = super().create_polyhedron_vdata(faces)
+
+        if self.smooth_angle is None:
+            return vdata_values, prim_indices
+
+        rows = np.frombuffer(vdata_values, dtype=np.float32).reshape(-1, 12)
+        rows, indices = self.weld_vertex_rows(rows, self.calc_vertex_ids())
+
+        vdata_values = array.array('f', rows.tobytes())
+        prim_indices = array.array('H' if len(rows) <= 65535 else 'I', [])
+        self.extend_prim(prim_indices, indices)
+
+        return vdata_values, prim_indices
+
 
 class ConvexPolyhedron(PolyhedralVertexData, Polyhedron):
     """A class that provides common methods for generating 3D convex polyhedron.
     """
 
     def create_polyhedron(self, vdata_values, prim_indices):
-        for i, tri in enumerate(self.generate_divided_tri()):
-            for vert in tri:
-                uv = self.project_to_uv(vert, self.normal)
-
-                vdata_values.extend(vert * self.scale)    # vertex
-                vdata_values.extend(self.color)           # color
-                vdata_values.extend(self.normal)          # normal
-                vdata_values.extend(uv)                   # uv
-
-            indices = (idx := i * 3, idx + 1, idx + 2)
-            prim_indices.extend(indices)
\ No newline at end of file
+        vertex_cnt = 0
+        normal = None
+
+        for tris in self.generate_divided_tri():
+            # generate_triangles sets a new normal for each face, so the tangent and bitangent
+            # are calculated once per face and projected onto by one matrix product.
+            # The normal is compared by value, because it may be updated in place.
+            if (key := tuple(np.ravel(self.normal).tolist())) != normal:
+                normal = key
+                frame = np.concatenate(self.calc_uv_frames(np.reshape(key, (1, 3))))
+
+            vertices = tris.reshape(-1, 3)
+            vertex_cnt += self.extend_vdata(
+                vdata_values, vertices * self.scale, normal, vertices @ frame.T)
+
+        self.extend_prim(prim_indices, np.arange(vertex_cnt))
\ No newline at end of file
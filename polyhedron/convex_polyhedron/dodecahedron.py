@@ -1,4 +1,5 @@
 import numpy as np
+from panda3d.core import Point3, BoundingSphere
 
 from .convex_polyhedron import ConvexPolyhedron
 
@@ -9,11 +10,17 @@ class Dodecahedron(ConvexPolyhedron):
         Args:
             max_depth (int): the number of divisions of one triangle; cannot be negative.
             scale (float): the size of sphere; greater than 0.
+            smooth_angle (float):
+                if not None, the vertices are welded, and the normals are smoothed between the faces
+                meeting at an angle of this many degrees or less; default is None.
     """
 
-    def __init__(self, max_depth=4, scale=2):
+    use_template = True
+
+    def __init__(self, max_depth=4, scale=2, smooth_angle=None):
         super().__init__(max_depth, scale)
         self.color = (1, 1, 1, 1)
+        self.smooth_angle = smooth_angle
 
     def generate_triangles(self):
         pts = [
@@ -64,6 +71,10 @@ class Dodecahedron(ConvexPolyhedron):
                 tri = [center, v, next_v]
                 yield tri
 
+    def calc_bounds(self):
+        # All vertices of the dodecahedron are on the unit sphere.
+        return BoundingSphere(Point3(0, 0, 0), self.scale)
+
     def get_geom_node(self):
         faces = 12 * 5
         return self.create_polyhedron_geom_node(faces)
\ No newline at end of file
@@ -1,5 +1,9 @@
+import array
+
 import numpy as np
+from panda3d.core import NodePath, Point3, BoundingBox, Geom
 
+from .convex_hull import ConvexHull
 from .convex_polyhedron import ConvexPolyhedron
 
 
@@ -10,15 +14,28 @@ class RandomConvexPolyhedron(ConvexPolyhedron):
             polygons (list): A list of numpy.ndarray; vertex coordinates of a polyhedron.
             max_depth (int): the number of divisions of one triangle; cannot be negative.
             scale (float): the scale of the polyhedron; greater than 0.
+            smooth_angle (float):
+                if not None, the vertices are welded, and the normals are smoothed between the faces
+                meeting at an angle of this many degrees or less; default is None.
     """
 
-    def __init__(self, polygons, max_depth=4, scale=2.):
+    def __init__(self, polygons, max_depth=4, scale=2., smooth_angle=None):
         super().__init__(max_depth, scale)
         self.color = (1, 1, 1, 1)
         self.polygons = polygons
+        self.smooth_angle = smooth_angle
         self.normal = np.zeros(3)
         self.polyhedron_org_center = np.mean(np.concatenate(self.polygons), axis=0)
 
+    @classmethod
+    def from_points(cls, points, tolerance=1e-9, **kwargs):
+        """Create the instance from the convex hull of points.
+            Args:
+                points (numpy.ndarray): the points; shape is (n, 3).
+                tolerance (float): the tolerance for the points on a face; see ConvexHull.
+        """
+        return cls(ConvexHull(points, tolerance).get_polygons(), **kwargs)
+
     def generate_triangles(self):
         for vertices in self.polygons:
             shifted_vertices = vertices - self.polyhedron_org_center
@@ -30,6 +47,181 @@ class RandomConvexPolyhedron(ConvexPolyhedron):
                 tri = [center, v, next_v]
                 yield tri
 
+    def calc_bounds(self):
+        vertices = (np.concatenate(self.polygons) - self.polyhedron_org_center) * self.scale
+        return BoundingBox(Point3(*vertices.min(axis=0)), Point3(*vertices.max(axis=0)))
+
     def get_geom_node(self):
         faces = sum(len(face) for face in self.polygons)
         return self.create_polyhedron_geom_node(faces)
+
+
+class RandomConvexPolyhedra(ConvexPolyhedron):
+    """A class to create many random convex polyhedra, like the cells of a Voronoi diagram,
+       as one geom. Each cell is the same as RandomConvexPolyhedron, but is placed
+       at the scaled position of its center instead of the origin.
+
+        Args:
+            vertices (numpy.ndarray): the vertices of all polygons of all cells in order; shape is (n, 3).
+            face_sizes (numpy.ndarray): the number of vertices of each polygon.
+            cell_sizes (numpy.ndarray): the number of polygons of each cell.
+            max_depth (int): the number of divisions of one triangle; cannot be negative.
+            scale (float): the scale of the polyhedra; greater than 0.
+    """
+
+    def __init__(self, vertices, face_sizes, cell_sizes, max_depth=4, scale=2.):
+        super().__init__(max_depth, scale)
+        self.color = (1, 1, 1, 1)
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.face_sizes = np.asarray(face_sizes, dtype=np.int64)
+        self.cell_sizes = np.asarray(cell_sizes, dtype=np.int64)
+        self.define_variables()
+
+    @classmethod
+    def from_cells(cls, cells, **kwargs):
+        """Create the instance from a list of cells.
+            Args:
+                cells (list): the lists of numpy.ndarray; the polygons of each cell,
+                              which are passed to RandomConvexPolyhedron.
+        """
+        polygons = [polygon for cell in cells for polygon in cell]
+        vertices = np.concatenate(polygons)
+        face_sizes = [len(polygon) for polygon in polygons]
+        cell_sizes = [len(cell) for cell in cells]
+
+        return cls(vertices, face_sizes, cell_sizes, **kwargs)
+
+    @classmethod
+    def from_point_sets(cls, point_sets, tolerance=1e-9, **kwargs):
+        """Create the instance from the convex hulls of point sets, like the vertices of Voronoi cells.
+            Args:
+                point_sets (list): numpy.ndarrays of shape (n, 3); the points of each cell.
+                tolerance (float): the tolerance for the points on a face; see ConvexHull.
+        """
+        hulls = [ConvexHull(points, tolerance).get_faces() for points in point_sets]
+        vertices = np.concatenate([vertices for vertices, _ in hulls])
+        face_sizes = np.concatenate([face_sizes for _, face_sizes in hulls])
+        cell_sizes = [len(face_sizes) for _, face_sizes in hulls]
+
+        return cls(vertices, face_sizes, cell_sizes, **kwargs)
+
+    def define_variables(self):
+        # the number of vertices of each cell.
+        cell_starts = np.cumsum(self.cell_sizes) - self.cell_sizes
+        self.cell_vertex_cnts = np.add.reduceat(self.face_sizes, cell_starts)
+
+        vertex_cells = np.repeat(np.arange(len(self.cell_sizes)), self.cell_vertex_cnts)
+        starts = np.cumsum(self.cell_vertex_cnts) - self.cell_vertex_cnts
+        self.cell_centers = np.add.reduceat(self.vertices, starts) / self.cell_vertex_cnts[:, None]
+        self.shifted_vertices = self.vertices - self.cell_centers[vertex_cells]
+
+        # the cells that the polygons belong to.
+        self.face_cells = np.repeat(np.arange(len(self.cell_sizes)), self.cell_sizes)
+
+        # Each cell starts at this vertex in the geom and has this many vertices.
+        cnts = self.cell_vertex_cnts * 3 * 4 ** self.max_depth
+        self.cell_ranges = np.stack([np.cumsum(cnts) - cnts, cnts], axis=1).tolist()
+
+    def get_fan_triangles(self, vertices):
+        """Return the fan triangles (center, vi, vi+1) of all polygons as a numpy.ndarray of shape (n, 3, 3).
+            Args:
+                vertices (numpy.ndarray): the vertices of all polygons in order; shape is (n, 3).
+        """
+        starts = np.cumsum(self.face_sizes) - self.face_sizes
+        face_indices = np.repeat(np.arange(len(self.face_sizes)), self.face_sizes)
+        indices = np.arange(len(vertices))
+
+        next_indices = indices + 1
+        last = indices - starts[face_indices] == self.face_sizes[face_indices] - 1
+        next_indices[last] = starts[face_indices[last]]
+
+        centers = np.add.reduceat(vertices, starts) / self.face_sizes[:, None]
+        return np.stack([centers[face_indices], vertices, vertices[next_indices]], axis=1)
+
+    def generate_triangles(self):
+        yield self.get_fan_triangles(self.shifted_vertices)
+
+    def create_polyhedron(self, vdata_values, prim_indices):
+        normals = self.calc_face_normals(
+            self.shifted_vertices, self.face_sizes, np.zeros((len(self.face_sizes), 3)))
+        tangents, bitangents = self.calc_uv_frames(normals)
+
+        # The triangles of a polygon, which has as many fan triangles as its vertices, are consecutive.
+        tri_faces = np.repeat(np.arange(len(self.face_sizes)), self.face_sizes * 4 ** self.max_depth)
+        vertex_faces = np.repeat(tri_faces, 3)
+
+        for tris in self.generate_divided_tri():
+            vertices = tris.reshape(-1, 3)
+            uvs = np.stack([
+                np.einsum('ij,ij->i', vertices, tangents[vertex_faces]),
+                np.einsum('ij,ij->i', vertices, bitangents[vertex_faces])
+            ], axis=1)
+
+            vertices = (vertices + self.cell_centers[self.face_cells[vertex_faces]]) * self.scale
+            vertex_cnt = self.extend_vdata(vdata_values, vertices, normals[vertex_faces], uvs)
+
+        self.extend_prim(prim_indices, np.arange(vertex_cnt))
+
+    def calc_bounds(self):
+        vertices = self.vertices * self.scale
+        return BoundingBox(Point3(*vertices.min(axis=0)), Point3(*vertices.max(axis=0)))
+
+    def get_geom_node(self):
+        faces = len(self.vertices)
+        return self.create_polyhedron_geom_node(faces)
+
+    def get_cell_indices(self, model):
+        """Return the vertex order of the model, created by this instance, as a writable numpy.ndarray.
+           The model must not be split by create(chunks=...) or create(octree_leaf=...),
+           because the cells are located by their offsets in the single vertex order.
+        """
+        if model.node().get_num_geoms() != 1:
+            raise ValueError('Cannot locate a cell in a model split into chunks; create it without chunks or octree_leaf.')
+
+        prim = model.node().modify_geom(0).modify_primitive(0)
+        type_code = 'H' if prim.get_index_type() == Geom.NT_uint16 else 'I'
+        return np.asarray(memoryview(prim.modify_vertices()).cast('B').cast(type_code))
+
+    def hide_cell(self, model, cell):
+        """Hide the cell by collapsing its triangles to a point.
+            Args:
+                model (NodePath): the model created by this instance.
+                cell (int): the index of the cell.
+        """
+        start, cnt = self.cell_ranges[cell]
+        self.get_cell_indices(model)[start:start + cnt] = start
+
+    def show_cell(self, model, cell):
+        """Show the cell hidden by hide_cell.
+            Args:
+                model (NodePath): the model created by this instance.
+                cell (int): the index of the cell.
+        """
+        start, cnt = self.cell_ranges[cell]
+        self.get_cell_indices(model)[start:start + cnt] = np.arange(start, start + cnt)
+
+    def detach_cell(self, model, cell):
+        """Hide the cell and return a new model of the cell alone, at the same position.
+            Args:
+                model (NodePath): the model created by this instance.
+                cell (int): the index of the cell.
+        """
+        # Hiding it first raises the error of a chunked model before anything is created.
+        self.hide_cell(model, cell)
+
+        start, cnt = self.cell_ranges[cell]
+        vdata = model.node().get_geom(0).get_vertex_data()
+        stride = self.get_stride(vdata.get_format())
+
+        vdata_values = array.array('f', [])
+        vdata_mem = memoryview(vdata.get_array(0)).cast('B').cast('f')
+        vdata_values.frombytes(vdata_mem[start * stride:(start + cnt) * stride].tobytes())
+
+        prim_indices = array.array('H' if cnt <= 65535 else 'I', [])
+        self.extend_prim(prim_indices, np.arange(cnt))
+
+        geom_node = self.create_geom_node(cnt, vdata_values, prim_indices, 'cell')
+
+        cell_model = NodePath(geom_node)
+        cell_model.set_two_sided(True)
+        return cell_model
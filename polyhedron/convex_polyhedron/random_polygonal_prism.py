@@ -2,7 +2,7 @@ import array
 import math
 
 import numpy as np
-from panda3d.core import Vec3, Point3, Vec2
+from panda3d.core import NodePath, Point3, BoundingBox, Geom
 
 from ...create_geometry import ProceduralGeometry
 from ...cylinder import CylinderGeometry
@@ -44,88 +44,15 @@ class RandomPolygonalPrism(CylinderGeometry, ProceduralGeometry):
         self.shifted_vertices = [v - self.center for v in self.vertices + self.vertices[:1]]
         self.edge_length, self.edge_lengths = self.calc_perimeter()
 
-    def create_cap_triangles(self, vdata_values, bottom=True):
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
-        segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
-        height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1
-        r = self.radius / segs_cap
-        vertex_cnt = 0
-
-        # cap center and triangle vertices
-        for i, shifted_vert in enumerate(self.shifted_vertices):
-            if i == 0:
-                vertex = Point3(0, 0, height)
-                uv = Vec2(0.5, 0.5)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            vertex = Point3(*shifted_vert[:2] / segs_cap, height)
-            u = 0.5 + vertex.x / r * 0.5 / segs_cap
-            _direction = -direction if bottom else direction
-            v = 0.5 + vertex.y / r * 0.5 * _direction / segs_cap
-
-            vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-            vertex_cnt += 1
-
-        return vertex_cnt
-
-    def create_cap_quad_vertices(self, vdata_values, bottom=True):
-        normal = Vec3(0, 0, 1) if self.invert else Vec3(0, 0, -1)
-        segs_cap = self.segs_bc if bottom else self.segs_tc
-
-        if not bottom:
-            normal *= -1
-
-        height = 0 if bottom else self.height
-        direction = -1 if self.invert else 1
-        n = 0 if self.inner_radius else 1
-        vertex_cnt = 0
-
-        # cap quad vertices
-        for i in range(n, segs_cap + 1 - n):
-            r = self.inner_radius + self.thickness * (i + n) / segs_cap
-
-            for shifted_vert in self.shifted_vertices:
-                _r = r / self.radius
-                vertex = Point3(*shifted_vert[:2] * _r, height)
-                u = 0.5 + vertex.x / r * 0.5 * _r
-                _direction = -direction if bottom else direction
-                v = 0.5 + vertex.y / r * 0.5 * _direction * _r
-
-                vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                vertex_cnt += 1
-
-        return vertex_cnt
+    def get_outline(self, radius):
+        xy = np.array([v[:2] for v in self.shifted_vertices])
+        return xy * (radius / self.radius)
 
     def create_mantle_quad_vertices(self, vdata_values):
-        direction = -1 if self.invert else 1
-        vertex_cnt = 0
-
-        # mantle quad vertices
-        for i in range(self.segs_a + 1):
-            z = self.height * i / self.segs_a
-            v = i / self.segs_a
-            total_edge_length = 0
-
-            for j, shifted_vert in enumerate(self.shifted_vertices):
-                vertex = Point3(*shifted_vert[:2], z)
-                normal = Vec3(vertex.x, vertex.y, 0.0).normalized() * direction
-
-                if j > 0:
-                    total_edge_length += self.edge_lengths[j - 1]
-
-                u = total_edge_length / self.edge_length
-                uv = Vec2(u, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-        return vertex_cnt
+        # mantle quad vertices; u is proportional to the length along the outline.
+        outline = self.get_outline(self.radius)
+        u = np.concatenate([[0], np.cumsum(self.edge_lengths)]) / self.edge_length
+        return self.extrude_outline(vdata_values, outline, outline, u, self.height, self.segs_a)
 
     def calc_perimeter(self):
         edges = np.diff(self.vertices, axis=0, append=[self.vertices[0]])
@@ -133,6 +60,12 @@ class RandomPolygonalPrism(CylinderGeometry, ProceduralGeometry):
         edge_length = np.sum(edge_lengths)
         return edge_length, edge_lengths
 
+    def calc_bounds(self):
+        xy = np.array([v[:2] for v in self.shifted_vertices])
+        min_x, min_y = xy.min(axis=0)
+        max_x, max_y = xy.max(axis=0)
+        return BoundingBox(Point3(min_x, min_y, 0), Point3(max_x, max_y, self.height))
+
     def get_geom_node(self):
         # Create an outer cylinder.
         vdata_values = array.array('f', [])
@@ -158,4 +91,297 @@ class RandomPolygonalPrism(CylinderGeometry, ProceduralGeometry):
         # Create the geom node.
         geom_node = self.create_geom_node(
             vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
-        return geom_node
\ No newline at end of file
+        return geom_node
+
+
+class RandomPolygonalPrisms(CylinderGeometry, ProceduralGeometry):
+    """A class to create many RandomPolygonalPrism, like the buildings on the footprints of a city, as one geom.
+       Each prism is the same as RandomPolygonalPrism, but is placed at the center of its footprint.
+       The prisms having the same number of vertices and both solid or hollow are created at once.
+
+        Args:
+            vertices (numpy.ndarray): the vertices of all footprints in order; shape is (n, 3).
+            sizes (numpy.ndarray): the number of vertices of each footprint.
+            heights (float or numpy.ndarray): the height of each prism, greater than 0; default is 1.
+            thickness (float or numpy.ndarray):
+                the thickness of the wall of each prism; 0 means a solid prism; default is 0.0.
+            segs_a (int): subdivisions of the mantles along the z-axis; minimum is 1; default is 2.
+            segs_top_cap (int): subdivisions of the top caps; minimum = 0; default is 3.
+            segs_bottom_cap (int): subdivisions of the bottom caps; minimum = 0; default is 3.
+            invert (bool): whether or not the geometry should be rendered inside-out; default is False.
+    """
+
+    def __init__(self, vertices, sizes, heights=1., thickness=0.0, segs_a=2, segs_top_cap=3, segs_bottom_cap=3,
+                 invert=False):
+        self.color = (1, 1, 1, 1)
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.sizes = np.asarray(sizes, dtype=np.int64)
+        self.heights = np.broadcast_to(np.asarray(heights, dtype=np.float64), self.sizes.shape)
+        self.thickness = np.broadcast_to(np.asarray(thickness, dtype=np.float64), self.sizes.shape)
+        self.segs_a = segs_a
+        self.segs_tc = segs_top_cap
+        self.segs_bc = segs_bottom_cap
+        self.invert = invert
+        self.define_variables()
+
+    @classmethod
+    def from_footprints(cls, footprints, **kwargs):
+        """Create the instance from a list of footprints.
+            Args:
+                footprints (list): a list of numpy.ndarray; the vertices passed to RandomPolygonalPrism.
+        """
+        vertices = np.concatenate(footprints)
+        sizes = [len(footprint) for footprint in footprints]
+
+        return cls(vertices, sizes, **kwargs)
+
+    def define_variables(self):
+        self.starts = np.cumsum(self.sizes) - self.sizes
+        self.centers = np.add.reduceat(self.vertices, self.starts) / self.sizes[:, None]
+        self.radii = np.linalg.norm(self.vertices[self.starts] - self.centers, axis=1)
+
+        thickness = np.where(self.thickness == 0, self.radii, np.clip(self.thickness, 0, self.radii))
+        self.inner_radii = self.radii - thickness
+
+    def get_vertex_cnt(self, n, hollow):
+        """Return the number of vertices of a prism with n footprint vertices.
+        """
+        ring = n + 1
+        mantle = (self.segs_a + 1) * ring
+
+        if hollow:
+            caps = sum((segs + 1) * ring for segs in (self.segs_bc, self.segs_tc) if segs)
+            return mantle * 2 + caps
+
+        caps = sum(1 + segs * ring for segs in (self.segs_bc, self.segs_tc) if segs)
+        return mantle + caps
+
+    def get_index_template(self, n, hollow):
+        """Return the vertex order of a prism with n footprint vertices, in the same order as RandomPolygonalPrism.
+        """
+        ring = n + 1
+        mantle = (self.segs_a + 1) * ring
+        indices = []
+        offset = 0
+
+        if hollow:
+            # The inner mantle is inside-out.
+            indices.append(self.create_grid_indices(offset, self.segs_a, n, not self.invert))
+            offset += mantle
+
+        if self.segs_bc:
+            if hollow:
+                indices.append(self.create_cap_indices(offset, self.segs_bc, n))
+                offset += (self.segs_bc + 1) * ring
+            else:
+                indices.append(self.create_fan_indices(offset, n))
+                indices.append(self.create_cap_indices(offset + 1, self.segs_bc - 1, n))
+                offset += 1 + self.segs_bc * ring
+
+        indices.append(self.create_grid_indices(offset, self.segs_a, n, self.invert))
+        offset += mantle
+
+        if self.segs_tc:
+            if hollow:
+                indices.append(self.create_cap_indices(offset, self.segs_tc, n, bottom=False))
+            else:
+                indices.append(self.create_fan_indices(offset, n, bottom=False))
+                indices.append(self.create_cap_indices(offset + 1, self.segs_tc - 1, n, bottom=False))
+
+        return np.concatenate(indices)
+
+    def extrude_outlines(self, outlines, u, heights, invert):
+        """Return the vertices, normals and uvs of the mantles of the prisms; each shape is (prisms, m, 3 or 2).
+            Args:
+                outlines (numpy.ndarray): the closed outlines of the prisms; shape is (prisms, n + 1, 2).
+                u (numpy.ndarray): the texture coordinates along the outlines; shape is (prisms, n + 1).
+                heights (numpy.ndarray): the heights of the prisms.
+                invert (bool): whether or not the mantles are inside-out.
+        """
+        direction = -1 if invert else 1
+        v = np.arange(self.segs_a + 1) / self.segs_a
+        b, n = outlines.shape[:2]
+
+        length = np.linalg.norm(outlines, axis=2, keepdims=True)
+        length[length == 0] = 1
+        normals = np.zeros((b, 1, n, 3))
+        normals[..., :2] = (outlines / length * direction)[:, None]
+
+        vertices = np.empty((b, self.segs_a + 1, n, 3))
+        vertices[..., :2] = outlines[:, None]
+        vertices[..., 2] = heights[:, None, None] * v[:, None]
+        uvs = np.stack(np.broadcast_arrays(u[:, None], v[:, None]), axis=3)
+
+        normals = np.broadcast_to(normals, vertices.shape)
+        return vertices.reshape(b, -1, 3), normals.reshape(b, -1, 3), uvs.reshape(b, -1, 2)
+
+    def create_cap_rings(self, outlines, holes, segs_cap, heights, radii, bottom):
+        """Return the vertices, normals and uvs of the bottom or top caps of the prisms;
+           each shape is (prisms, m, 3 or 2). Without holes, the caps have their centers.
+            Args:
+                outlines (numpy.ndarray): the closed outlines of the prisms; shape is (prisms, n + 1, 2).
+                holes (numpy.ndarray): the inner outlines of the prisms; None if solid.
+                segs_cap (int): the number of the rings.
+                heights (numpy.ndarray): the z-coordinates of the caps.
+                radii (numpy.ndarray): the radii of the prisms, used for the planar texture coordinates.
+                bottom (bool): whether or not the caps are the bottom ones.
+        """
+        direction = -1 if self.invert else 1
+        _direction = -direction if bottom else direction
+        b, n = outlines.shape[:2]
+
+        if holes is None:
+            fractions = np.arange(1, segs_cap + 1) / segs_cap
+            xy = (outlines[:, None] * fractions[:, None, None]).reshape(b, -1, 2)
+            xy = np.concatenate([np.zeros((b, 1, 2)), xy], axis=1)
+        else:
+            fractions = np.arange(segs_cap + 1) / segs_cap
+            xy = (holes[:, None] + (outlines - holes)[:, None] * fractions[:, None, None]).reshape(b, -1, 2)
+
+        vertices = np.empty(xy.shape[:2] + (3,))
+        vertices[..., :2] = xy
+        vertices[..., 2] = heights[:, None]
+
+        normals = np.broadcast_to((0., 0., _direction), vertices.shape)
+        uvs = 0.5 + 0.5 * xy / radii[:, None, None] * (1, _direction)
+        return vertices, normals, uvs
+
+    def create_group(self, vdata_values, prims, hollow):
+        """Append the vertices of the prisms, all having the same number of footprint vertices
+           and all solid or hollow, to vdata_values and return the number of them.
+            Args:
+                prims (numpy.ndarray): the indices of the prisms.
+                hollow (bool): whether or not the prisms are hollow.
+        """
+        n = self.sizes[prims[0]]
+        indices = self.starts[prims][:, None] + np.arange(n + 1) % n
+        shifted = self.vertices[indices] - self.centers[prims][:, None]
+
+        # u is proportional to the length along the outline.
+        edge_lengths = np.linalg.norm(np.diff(self.vertices[indices], axis=1), axis=2)
+        u = np.concatenate([np.zeros((len(prims), 1)), np.cumsum(edge_lengths, axis=1)], axis=1)
+        u /= u[:, -1:]
+
+        outlines = shifted[..., :2]
+        holes = outlines * (self.inner_radii[prims] / self.radii[prims])[:, None, None] if hollow else None
+        heights = self.heights[prims]
+        radii = self.radii[prims]
+        parts = []
+
+        if hollow:
+            parts.append(self.extrude_outlines(holes, u, heights, not self.invert))
+
+        if self.segs_bc:
+            parts.append(self.create_cap_rings(outlines, holes, self.segs_bc, np.zeros(len(prims)), radii, True))
+
+        parts.append(self.extrude_outlines(outlines, u, heights, self.invert))
+
+        if self.segs_tc:
+            parts.append(self.create_cap_rings(outlines, holes, self.segs_tc, heights, radii, False))
+
+        vertices, normals, uvs = (np.concatenate(columns, axis=1) for columns in zip(*parts))
+        vertices = vertices + self.centers[prims][:, None]
+
+        return self.extend_vdata(
+            vdata_values, vertices.reshape(-1, 3), normals.reshape(-1, 3), uvs.reshape(-1, 2))
+
+    def calc_bounds(self):
+        lower = self.vertices.min(axis=0)
+        upper = self.vertices.max(axis=0)
+        lower[2] = self.centers[:, 2].min()
+        upper[2] = (self.centers[:, 2] + self.heights).max()
+        return BoundingBox(Point3(*lower), Point3(*upper))
+
+    def get_geom_node(self):
+        hollow = self.inner_radii > 0
+        vertex_cnts = np.array([self.get_vertex_cnt(n, h) for n, h in zip(self.sizes.tolist(), hollow.tolist())])
+        vertex_cnt = int(vertex_cnts.sum())
+
+        type_code = 'H' if vertex_cnt <= 65535 else 'I'
+        vdata_values = array.array('f', [])
+        prim_indices = array.array(type_code, [])
+
+        # Each prism starts at these vertex and index, and has these many vertices and indices.
+        ranges = np.zeros((len(self.sizes), 4), dtype=np.int64)
+        index_offset = 0
+        offset = 0
+
+        for n, h in sorted(set(zip(self.sizes.tolist(), hollow.tolist()))):
+            prims = np.flatnonzero((self.sizes == n) & (hollow == h))
+            template = self.get_index_template(n, h)
+            starts = offset + np.arange(len(prims)) * self.get_vertex_cnt(n, h)
+
+            offset += self.create_group(vdata_values, prims, h)
+            self.extend_prim(prim_indices, (template + starts[:, None]).ravel())
+
+            ranges[prims] = np.column_stack([
+                starts,
+                np.full(len(prims), self.get_vertex_cnt(n, h)),
+                index_offset + np.arange(len(prims)) * len(template),
+                np.full(len(prims), len(template))
+            ])
+            index_offset += len(prims) * len(template)
+
+        self.prism_ranges = ranges.tolist()
+        self.indices = np.frombuffer(prim_indices, dtype=type_code).copy()
+
+        geom_node = self.create_geom_node(
+            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
+        return geom_node
+
+    def get_prism_indices(self, model):
+        """Return the vertex order of the model, created by this instance, as a writable numpy.ndarray.
+           The model must not be split by create(chunks=...) or create(octree_leaf=...),
+           because the prisms are located by their offsets in the single vertex order.
+        """
+        if model.node().get_num_geoms() != 1:
+            raise ValueError('Cannot locate a prism in a model split into chunks; create it without chunks or octree_leaf.')
+
+        prim = model.node().modify_geom(0).modify_primitive(0)
+        type_code = 'H' if prim.get_index_type() == Geom.NT_uint16 else 'I'
+        return np.asarray(memoryview(prim.modify_vertices()).cast('B').cast(type_code))
+
+    def hide_prism(self, model, prism):
+        """Hide the prism by collapsing its triangles to a point.
+            Args:
+                model (NodePath): the model created by this instance.
+                prism (int): the index of the prism.
+        """
+        start, _, index_start, index_cnt = self.prism_ranges[prism]
+        self.get_prism_indices(model)[index_start:index_start + index_cnt] = start
+
+    def show_prism(self, model, prism):
+        """Show the prism hidden by hide_prism.
+            Args:
+                model (NodePath): the model created by this instance.
+                prism (int): the index of the prism.
+        """
+        _, _, index_start, index_cnt = self.prism_ranges[prism]
+        end = index_start + index_cnt
+        self.get_prism_indices(model)[index_start:end] = self.indices[index_start:end]
+
+    def detach_prism(self, model, prism):
+        """Hide the prism and return a new model of the prism alone, at the same position.
+            Args:
+                model (NodePath): the model created by this instance.
+                prism (int): the index of the prism.
+        """
+        # Hiding it first raises the error of a chunked model before anything is created.
+        self.hide_prism(model, prism)
+
+        start, cnt, index_start, index_cnt = self.prism_ranges[prism]
+        vdata = model.node().get_geom(0).get_vertex_data()
+        stride = self.get_stride(vdata.get_format())
+
+        vdata_values = array.array('f', [])
+        vdata_mem = memoryview(vdata.get_array(0)).cast('B').cast('f')
+        vdata_values.frombytes(vdata_mem[start * stride:(start + cnt) * stride].tobytes())
+
+        prim_indices = array.array('H' if cnt <= 65535 else 'I', [])
+        self.extend_prim(prim_indices, self.indices[index_start:index_start + index_cnt] - start)
+
+        geom_node = self.create_geom_node(cnt, vdata_values, prim_indices, 'prism')
+
+        prism_model = NodePath(geom_node)
+        prism_model.set_two_sided(True)
+        return prism_model
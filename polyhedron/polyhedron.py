@@ -1,31 +1,66 @@
 import array
+import hashlib
+import inspect
+import os
 from abc import abstractmethod
 
+import numpy as np
+
 from ..create_geometry import ProceduralGeometry
 
 
 class TriangleGenerator:
 
-    def calc_midpoints(self, tri):
-        """Generates the midpoints of the three sides of a triangle.
+    # The vertices and midpoints of a triangle are numbered 0 to 2 and 3 to 5 respectively,
+    # and a triangle is split into these 4 triangles.
+    children = np.array([[0, 3, 5], [1, 4, 3], [2, 5, 4], [3, 4, 5]])
+
+    def calc_midpoints(self, tris):
+        """Return the midpoints of the three sides of the triangles; the midpoint i is
+           between the vertex i and the vertex i + 1.
             Args:
-                tri (list): list of Vec3; having 3 elements.
+                tris (numpy.ndarray): the triangles; shape is (n, 3, 3).
         """
-        for p1, p2 in zip(tri, tri[1:] + tri[:1]):
-            yield (p1 + p2) / 2
+        return (tris + np.roll(tris, -1, axis=1)) / 2
 
-    def subdivide(self, tri, max_depth, depth=0):
-        if depth == max_depth:
-            yield tri
-        else:
-            midpoints = [p for p in self.calc_midpoints(tri)]
+    def subdivide(self, tris, max_depth):
+        """Split all of the triangles into 4 at once, level by level, and return
+           the triangles as a numpy.ndarray of shape (n * 4 ** max_depth, 3, 3).
+           The children of a triangle are consecutive, in the depth-first order.
+            Args:
+                tris (numpy.ndarray): the triangles; shape is (n, 3, 3) or (3, 3).
+                max_depth (int): the number of divisions of one triangle.
+        """
+        tris = np.asarray(tris, dtype=np.float64).reshape(-1, 3, 3)
+
+        for _ in range(max_depth):
+            points = np.concatenate([tris, self.calc_midpoints(tris)], axis=1)
+            tris = points[:, self.children].reshape(-1, 3, 3)
+
+        return tris
+
+    def subdivide_indexed(self, vertices, faces, max_depth):
+        """Split all of the triangles into 4 at once, level by level, sharing the midpoint of an edge
+           between the adjacent triangles, and return the vertices of shape (m, 3) and
+           the faces of shape (n * 4 ** max_depth, 3), in the same order as the subdivide.
+            Args:
+                vertices (numpy.ndarray): the vertices; shape is (m, 3).
+                faces (numpy.ndarray): the vertex indices of the triangles; shape is (n, 3).
+                max_depth (int): the number of divisions of one triangle.
+        """
+        vertices = np.asarray(vertices, dtype=np.float64)
+        faces = np.asarray(faces, dtype=np.int64)
+
+        for _ in range(max_depth):
+            # Each edge, whichever triangle it belongs to, is keyed by its sorted vertex indices.
+            edges = np.stack([faces, np.roll(faces, -1, axis=1)], axis=2).reshape(-1, 2)
+            keys, inverse = np.unique(np.sort(edges, axis=1), axis=0, return_inverse=True)
 
-            for i, vert in enumerate(tri):
-                ii = n if (n := i - 1) >= 0 else len(midpoints) - 1
-                divided = [vert, midpoints[i], midpoints[ii]]
-                yield from self.subdivide(divided, max_depth, depth + 1)
+            mid_indices = len(vertices) + inverse.reshape(-1, 3)
+            vertices = np.concatenate([vertices, vertices[keys].sum(axis=1) / 2])
+            faces = np.concatenate([faces, mid_indices], axis=1)[:, self.children].reshape(-1, 3)
 
-            yield from self.subdivide(midpoints, max_depth, depth + 1)
+        return vertices, faces
 
 
 class Polyhedron(TriangleGenerator, ProceduralGeometry):
@@ -35,6 +70,14 @@ class Polyhedron(TriangleGenerator, ProceduralGeometry):
             scale (float): the scale of the polyhedron; greater than 0.
     """
 
+    # If True, the vertex data of scale 1 is created only once per class and max_depth
+    # and kept as a read-only template, which each instance copies and scales.
+    use_template = False
+    templates = {}
+
+    # If specified, the templates are saved to and loaded from the .npy files in this directory.
+    template_dir = None
+
     def __init__(self, max_depth=4, scale=2):
         self.max_depth = max_depth
         self.scale = scale
@@ -55,20 +98,99 @@ class Polyhedron(TriangleGenerator, ProceduralGeometry):
         pass
 
     def generate_divided_tri(self):
+        """Generate the subdivided triangles of each triangle from generate_triangles
+           as a numpy.ndarray of shape (4 ** max_depth, 3, 3).
+        """
         for tri in self.generate_triangles():
-            for divided_tri in self.subdivide(tri, self.max_depth):
-                yield divided_tri
+            yield self.subdivide(tri, self.max_depth)
 
-    def create_polyhedron_geom_node(self, faces):
+    def create_template(self):
+        """Return the vertex data rows of the polyhedron of scale 1; shape is (n, 12).
+        """
+        unit = self.__class__(self.max_depth, 1)
+        vdata_values = array.array('f', [])
+        unit.create_polyhedron(vdata_values, array.array('I', []))
+
+        return np.frombuffer(vdata_values, dtype=np.float32).reshape(-1, 12)
+
+    def get_template_file_name(self):
+        """Return the name of the .npy file of the template, or None if the source code is not available.
+           The name has a hash of the source code of the classes creating the template and of
+           the vertex data columns, so that the files saved by another version are not loaded.
+        """
+        package = __name__.split('.')[0]
+        fmt = self.create_format()
+        sha = hashlib.sha1()
+
+        for col in fmt.get_columns():
+            sha.update(f'{col.get_name()}:{col.get_num_components()};'.encode())
+
+        try:
+            for klass in self.__class__.__mro__:
+                if klass.__module__.split('.')[0] == package:
+                    sha.update(inspect.getsource(klass).encode())
+        except (OSError, TypeError):
+            return None
+
+        return f'{self.__class__.__name__.lower()}_{self.max_depth}_{sha.hexdigest()[:12]}.npy'
+
+    def get_template(self):
+        """Return the template of the class and max_depth, creating it if it does not exist yet.
+        """
+        key = (self.__class__, self.max_depth)
+
+        if (template := Polyhedron.templates.get(key)) is None:
+            path = None
+
+            if Polyhedron.template_dir is not None and (file_name := self.get_template_file_name()):
+                path = os.path.join(Polyhedron.template_dir, file_name)
+
+            if path is not None and os.path.exists(path):
+                template = np.load(path, mmap_mode='r')
+            else:
+                template = self.create_template()
+
+                if path is not None:
+                    np.save(path, template)
+
+            template.flags.writeable = False
+            Polyhedron.templates[key] = template
+
+        return template
+
+    @staticmethod
+    def clear_templates():
+        """Release the templates cached by get_template.
+        """
+        Polyhedron.templates.clear()
+
+    def create_polyhedron_vdata(self, faces):
+        """Return the vertex data and the vertex order of the polyhedron.
+            Args:
+                faces (int): the number of triangles before subdivision.
+        """
         vertex_cnt = 4 ** self.max_depth * faces * 3
         type_code = 'H' if vertex_cnt <= 65535 else 'I'
         vdata_values = array.array('f', [])
         prim_indices = array.array(type_code, [])
 
-        self.create_polyhedron(vdata_values, prim_indices)
+        if self.use_template:
+            rows = np.array(self.get_template())
+            rows[:, :3] *= self.scale
+            rows[:, 3:7] = self.color
+
+            vdata_values.frombytes(rows.tobytes())
+            self.extend_prim(prim_indices, np.arange(vertex_cnt))
+        else:
+            self.create_polyhedron(vdata_values, prim_indices)
+
+        return vdata_values, prim_indices
+
+    def create_polyhedron_geom_node(self, faces):
+        vdata_values, prim_indices = self.create_polyhedron_vdata(faces)
 
         geom_node = self.create_geom_node(
-            vertex_cnt,
+            len(vdata_values) // 12,
             vdata_values,
             prim_indices,
             self.__class__.__name__.lower()
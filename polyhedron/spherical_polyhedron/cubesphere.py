@@ -13,6 +13,8 @@ class Cubesphere(SphericalPolyhedron):
             scale (float): the size of sphere; greater than 0.
     """
 
+    use_template = True
+
     def __init__(self, max_depth=4, scale=2):
         super().__init__(max_depth, scale)
         self.color = (1, 1, 1, 1)
@@ -1,5 +1,5 @@
 import numpy as np
-from panda3d.core import Point2
+from panda3d.core import Point3, BoundingSphere
 
 from ..polyhedron import Polyhedron
 
@@ -8,65 +8,67 @@ class SphericalVertexData:
     """A mixin class for calculating the UV coordinates of a sphere
     """
 
-    def calc_uv(self, vert):
-        u = np.atan2(vert.y, vert.x) / (2.0 * np.pi) + 0.5
-        v = np.asin(vert.z) / np.pi + 0.5
-
-        return Point2(u, v)
-
-    def fix_uv(self, uv_a, uv_b, uv_c):
-        """recalculate the UV to prevent ziggzagging distortion effects.
+    def calc_uv(self, vertices):
+        """Return the UV coordinates of the unit vectors as a numpy.ndarray of shape (..., 2).
             Args:
-                uv_a, uv_b, uv_c (panda3d.core.Point2):
-                    UV coordinates, calculated by the self.calc_uv, for each vertex of the triangle.
+                vertices (numpy.ndarray): unit vectors; shape is (..., 3).
         """
-        if uv_b.x - uv_a.x >= 0.5 and uv_a.y != 1:
-            uv_b.x -= 1
-
-        if uv_c.x - uv_b.x > 0.5:
-            uv_c.x -= 1
+        uvs = np.empty(vertices.shape[:-1] + (2,))
+        uvs[..., 0] = np.arctan2(vertices[..., 1], vertices[..., 0]) / (2.0 * np.pi) + 0.5
+        uvs[..., 1] = np.arcsin(np.clip(vertices[..., 2], -1, 1)) / np.pi + 0.5
 
-        if (uv_a.x > 0.5 and uv_a.x - uv_c.x > 0.5) or \
-                (uv_a.x == 1 and uv_c.y == 0):
-            uv_a.x -= 1
-
-        if uv_b.x > 0.5 and uv_b.x - uv_a.x > 0.5:
-            uv_b.x -= 1
+        return uvs
 
-        if uv_a.y == 0 or uv_a.y == 1:
-            uv_a.x = (uv_b.x + uv_c.x) / 2
+    def fix_uv(self, uvs):
+        """recalculate the UV in place to prevent ziggzagging distortion effects.
+            Args:
+                uvs (numpy.ndarray):
+                    UV coordinates, calculated by the self.calc_uv, for each vertex of the triangles;
+                    shape is (n, 3, 2).
+        """
+        a_x, b_x, c_x = uvs[:, 0, 0], uvs[:, 1, 0], uvs[:, 2, 0]
+        a_y, b_y, c_y = uvs[:, 0, 1], uvs[:, 1, 1], uvs[:, 2, 1]
 
-        if uv_b.y == 0 or uv_b.y == 1:
-            uv_b.x = (uv_a.x + uv_c.x) / 2
+        b_x[(b_x - a_x >= 0.5) & (a_y != 1)] -= 1
+        c_x[c_x - b_x > 0.5] -= 1
+        a_x[((a_x > 0.5) & (a_x - c_x > 0.5)) | ((a_x == 1) & (c_y == 0))] -= 1
+        b_x[(b_x > 0.5) & (b_x - a_x > 0.5)] -= 1
 
-        if uv_c.y == 0 or uv_c.y == 1:
-            uv_c.x = (uv_a.x + uv_b.x) / 2
+        # The u of a pole is in the middle of the others.
+        for x, y, x1, x2 in [(a_x, a_y, b_x, c_x), (b_x, b_y, a_x, c_x), (c_x, c_y, a_x, b_x)]:
+            pole = (y == 0) | (y == 1)
+            x[pole] = (x1[pole] + x2[pole]) / 2
 
 
 class SphericalPolyhedron(SphericalVertexData, Polyhedron):
     """A class that provides common methods for creating spheres from 3D polyhedrons
     """
 
-    def get_uv_coords(self, tri_vertices):
-        uvs = [self.calc_uv(vert.normalized()) for vert in tri_vertices]
-        self.fix_uv(*uvs)
+    def calc_bounds(self):
+        return BoundingSphere(Point3(0, 0, 0), self.scale)
+
+    def get_uv_coords(self, tris):
+        """Return the UV coordinates of the triangles of the unit vectors; shape is (n, 3, 2).
+        """
+        uvs = self.calc_uv(tris)
+        self.fix_uv(uvs)
 
         return uvs
 
     def create_polyhedron(self, vdata_values, prim_indices):
         """Subdivide a triangle and normalize the vertex position vectors.
         """
-        for i, tri in enumerate(self.generate_divided_tri()):
-            uvs = self.get_uv_coords(tri)
+        vertex_cnt = 0
 
-            for vert, uv in zip(tri, uvs):
-                normal = vert.normalized()
-                vertex = normal * self.scale
+        for tris in self.generate_divided_tri():
+            normals = tris / np.linalg.norm(tris, axis=2, keepdims=True)
+            uvs = self.get_uv_coords(normals)
 
-                vdata_values.extend(vertex)               # vertex
-                vdata_values.extend(self.color)           # color
-                vdata_values.extend(normal)               # normal
-                vdata_values.extend(uv)                   # uv
+            vertex_cnt += self.extend_vdata(
+                vdata_values,
+                normals.reshape(-1, 3) * self.scale,
+                normals.reshape(-1, 3),
+                uvs.reshape(-1, 2)
+            )
 
-            indices = (idx := i * 3, idx + 1, idx + 2)
-            prim_indices.extend(indices)
\ No newline at end of file
+        self.extend_prim(prim_indices, np.arange(vertex_cnt))
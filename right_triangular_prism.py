@@ -1,7 +1,7 @@
 import array
 import math
 
-from panda3d.core import Vec3, Point3, Vec2
+from panda3d.core import Vec3, Point3, Vec2, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 
@@ -278,6 +278,13 @@ class RightTriangularPrism(ProceduralGeometry):
         theta = math.atan(self.opposite / self.adjacent)
         self.angles = [0, theta * 2, math.pi, -math.pi]
 
+    def calc_bounds(self):
+        direction = -1 if self.invert else 1
+        angles = [angle + (0 if self.invert else self.slice_rad) for angle in self.angles[:self.segs_c]]
+        xs = [self.radius * math.cos(angle) for angle in angles]
+        ys = [self.radius * math.sin(angle) * direction for angle in angles]
+        return BoundingBox(Point3(min(xs), min(ys), 0), Point3(max(xs), max(ys), self.height))
+
     def get_geom_node(self):
         self.define_variables()
 
@@ -1,6 +1,6 @@
 import array
 
-from panda3d.core import Point3
+from panda3d.core import Point3, BoundingBox
 
 from ..create_geometry import ProceduralGeometry
 from .rounded_box import Sides, BasicRoundedBox
@@ -93,6 +93,14 @@ class CapsulePrism(BasicRoundedBox, ProceduralGeometry):
         self.c_segs_tc = 0 if self.thickness <= 0 and self.open_top else self.segs_d
         self.c_segs_bc = 0 if self.thickness <= 0 and self.open_bottom else self.segs_d
 
+    def calc_bounds(self):
+        r = self.depth / 2
+        left = self.width * 0.5 + (r if self.rounded_left else 0)
+        right = self.width * 0.5 + (r if self.rounded_right else 0)
+        min_pt = Point3(-left, -r, -self.height * 0.5)
+        max_pt = Point3(right, r, self.height * 0.5)
+        return BoundingBox(min_pt + self.center, max_pt + self.center)
+
     def get_geom_node(self):
         self.define_variables()
 
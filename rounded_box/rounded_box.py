@@ -1,5 +1,8 @@
+import array
+import math
 from enum import Flag, auto
 
+import numpy as np
 from panda3d.core import Vec3, Point3
 
 from ..box import BasicBox
@@ -24,6 +27,16 @@ class Sides(Flag):
 
 class BasicRoundedBox(BasicBox):
 
+    # The cyclic permutation of the axes, (x, y, z) -> (z, x, y), which turns a vertical edge
+    # into an edge along the x-axis, and applied twice, into an edge along the y-axis.
+    axis_cycle = np.array([[0., 0., 1.], [1., 0., 0.], [0., 1., 0.]])
+
+    def define_variables(self):
+        super().define_variables()
+
+        # The corners and edges created once and copied by place_component.
+        self.component_templates = {}
+
     def create_sides(self, vertex_cnt, vdata_values, prim_indices):
         for plane in ('xyz', 'zxy', 'yzx'):
             plane_id = plane[:2]
@@ -52,69 +65,171 @@ class BasicRoundedBox(BasicBox):
 
         return vertex_cnt
 
+    def get_component_template(self, key, create):
+        """Return the vertex data rows and the triangles of a corner or an edge created by create
+           at the origin with the start angle of 0; they are created only once per key.
+            Args:
+                key (tuple): the parameters of the corner or the edge other than its placement.
+                create (callable): the function to create it, taking vdata_values and prim_indices.
+        """
+        if (template := self.component_templates.get(key)) is None:
+            vdata_values = array.array('f', [])
+            prim_indices = array.array('I', [])
+            create(vdata_values, prim_indices)
+
+            rows = np.frombuffer(vdata_values, dtype=np.float32).reshape(-1, 12)
+            tris = np.frombuffer(prim_indices, dtype=np.uint32).reshape(-1, 3).astype(np.int64)
+            template = self.component_templates[key] = (rows, tris)
+
+        return template
+
+    def get_rotation(self, start_angle):
+        """Return the rotation about the z-axis that turns a component created with the start angle of 0
+           into the one created with start_angle; a multiple of 90 degrees.
+        """
+        # If inverted, the components are created clockwise.
+        angle = math.radians(start_angle * (-1 if self.invert else 1))
+        c, s = round(math.cos(angle)), round(math.sin(angle))
+        return np.array([[c, -s, 0.], [s, c, 0.], [0., 0., 1.]])
+
+    def place_component(self, vertex_cnt, vdata_values, prim_indices, template, matrix, center, uvs=None):
+        """Add a copy of the template rotated or mirrored by the matrix and moved to the center,
+           and return the total number of vertices. If the matrix mirrors the template,
+           the winding of the triangles is reversed so that they keep facing outward.
+            Args:
+                template (tuple): the rows and the triangles returned by get_component_template.
+                matrix (numpy.ndarray): an orthogonal matrix; shape is (3, 3).
+                center (Point3): the position of the copy.
+                uvs (numpy.ndarray): the UV coordinates of the copy, if not the same as the template.
+        """
+        rows, tris = template
+        copy = np.array(rows)
+        copy[:, :3] = rows[:, :3] @ matrix.T + center
+        copy[:, 7:10] = rows[:, 7:10] @ matrix.T
+
+        if uvs is not None:
+            copy[:, 10:] = uvs
+
+        if np.linalg.det(matrix) < 0:
+            tris = tris[:, ::-1]
+
+        vdata_values.frombytes(copy.tobytes())
+        self.extend_prim(prim_indices, (tris + vertex_cnt).ravel())
+
+        return vertex_cnt + len(rows)
+
+    def create_edge_cylinder(self, vertex_cnt, vdata_values, prim_indices,
+                             height, center, start_angle, slice_deg, segs_a, axis_turns=0):
+        """Add a copy of the vertical edge of the height, turned by axis_turns cyclic permutations
+           of the axes to lie along the x-axis (1) or the y-axis (2).
+        """
+        def create(vdata_values, prim_indices):
+            edge = VerticalRoundedEdge(
+                center=Point3(0, 0, 0),
+                start_angle_deg=0,
+                radius=self.c_radius,
+                inner_radius=self.c_inner_radius,
+                height=height,
+                segs_c=20,
+                segs_a=segs_a,
+                segs_top_cap=self.c_segs_tc,
+                segs_bottom_cap=self.c_segs_bc,
+                ring_slice_deg=slice_deg,
+                invert=self.invert
+            )
+            edge.create_cylinder(0, vdata_values, prim_indices)
+
+        template = self.get_component_template(('edge', height, segs_a, slice_deg), create)
+        rows = template[0]
+        matrix = np.linalg.matrix_power(self.axis_cycle, axis_turns) @ self.get_rotation(start_angle)
+        uvs = None
+
+        # The UV coordinates of the caps turn with the start angle, the bottom cap in the opposite direction.
+        if self.c_segs_tc or self.c_segs_bc:
+            cap = np.abs(rows[:, 9]) > 0.5
+            sign = np.where(rows[:, 2] > height / 2, 1, -1)[cap]
+            angle = np.radians(start_angle) * sign
+            c, s = np.cos(angle), np.sin(angle)
+            u, v = rows[cap, 10] - 0.5, rows[cap, 11] - 0.5
+
+            uvs = np.array(rows[:, 10:])
+            uvs[cap] = np.stack([0.5 + u * c - v * s, 0.5 + u * s + v * c], axis=1)
+
+        return self.place_component(vertex_cnt, vdata_values, prim_indices, template, matrix, center, uvs)
+
     def create_vertical_edge_cylinder(self, vertex_cnt, vdata_values, prim_indices,
                                       height, center, start_angle, slice_deg):
-        corner = VerticalRoundedEdge(
-            center=center + self.center,
-            start_angle_deg=start_angle,
-            radius=self.c_radius,
-            inner_radius=self.c_inner_radius,
-            height=height,
-            segs_c=20,
-            segs_a=self.segs_z,
-            segs_top_cap=self.c_segs_tc,
-            segs_bottom_cap=self.c_segs_bc,
-            ring_slice_deg=slice_deg,
-            invert=self.invert
+        vertex_cnt = self.create_edge_cylinder(
+            vertex_cnt, vdata_values, prim_indices, height,
+            center + self.center, start_angle, slice_deg, self.segs_z
         )
 
-        vertex_cnt = corner.create_cylinder(vertex_cnt, vdata_values, prim_indices)
         return vertex_cnt
 
     def create_horizontal_edge_cylinder(self, vertex_cnt, vdata_values, prim_indices,
                                         height, center, start_angle, slice_deg, x_axis,
                                         start_slice_cap, end_slice_cap, is_open):
-        edge = HorizontalRoundedEdge(
-            center=center + self.center,
-            start_angle_deg=start_angle,
-            radius=self.c_radius,
-            inner_radius=self.c_inner_radius,
-            height=height,
-            segs_c=20,
-            segs_a=self.segs_w if x_axis else self.segs_d,
-            segs_top_cap=self.c_segs_tc,
-            segs_bottom_cap=self.c_segs_bc,
-            ring_slice_deg=slice_deg,
-            start_slice_cap=start_slice_cap,
-            end_slice_cap=end_slice_cap,
-            invert=self.invert,
-            x_axis=x_axis
+        vertex_cnt = self.create_edge_cylinder(
+            vertex_cnt, vdata_values, prim_indices, height, center + self.center, start_angle, slice_deg,
+            self.segs_w if x_axis else self.segs_d, 1 if x_axis else 2
         )
 
-        vertex_cnt = edge.create_cylinder(vertex_cnt, vdata_values, prim_indices)
-
         if self.thickness and is_open:
+            edge = HorizontalRoundedEdge(
+                center=center + self.center,
+                start_angle_deg=start_angle,
+                radius=self.c_radius,
+                inner_radius=self.c_inner_radius,
+                height=height,
+                segs_c=20,
+                segs_a=self.segs_w if x_axis else self.segs_d,
+                segs_top_cap=self.c_segs_tc,
+                segs_bottom_cap=self.c_segs_bc,
+                ring_slice_deg=slice_deg,
+                start_slice_cap=start_slice_cap,
+                end_slice_cap=end_slice_cap,
+                invert=self.invert,
+                x_axis=x_axis
+            )
             vertex_cnt += edge.create_slice_cap_quads(vertex_cnt, vdata_values, prim_indices)
 
         return vertex_cnt
 
     def create_corner_sphere(self, vertex_cnt, vdata_values, prim_indices, center,
                              start_angle, slice_deg, bottom_clip=-1., top_clip=1.):
-        corner = QuarteredHemisphereCorner(
-            center=center,
-            start_angle_deg=start_angle,
-            radius=self.c_radius,
-            inner_radius=self.c_inner_radius,
-            segs_h=20,
-            segs_v=20,
-            segs_slice_caps=0,
-            slice_deg=slice_deg,
-            bottom_clip=bottom_clip,
-            top_clip=top_clip,
-            invert=self.invert
-        )
-
-        vertex_cnt = corner.create_quartered_hemisphere(
-            vertex_cnt, vdata_values, prim_indices)
-
-        return vertex_cnt
\ No newline at end of file
+        # A corner clipped more at the bottom than at the top is the mirror image
+        # of the one clipped the other way round, like the top and bottom corners.
+        mirror = bottom_clip > -top_clip
+
+        if mirror:
+            bottom_clip, top_clip = -top_clip, -bottom_clip
+
+        def create(vdata_values, prim_indices):
+            corner = QuarteredHemisphereCorner(
+                center=Point3(0, 0, 0),
+                start_angle_deg=0,
+                radius=self.c_radius,
+                inner_radius=self.c_inner_radius,
+                segs_h=20,
+                segs_v=20,
+                segs_slice_caps=0,
+                slice_deg=slice_deg,
+                bottom_clip=bottom_clip,
+                top_clip=top_clip,
+                invert=self.invert
+            )
+            corner.create_quartered_hemisphere(0, vdata_values, prim_indices)
+
+        template = self.get_component_template(('corner', slice_deg, bottom_clip, top_clip), create)
+        matrix = self.get_rotation(start_angle)
+        uvs = None
+
+        # The v coordinate runs from the bottom pole to the top pole.
+        if mirror:
+            matrix = matrix @ np.diag([1., 1., -1.])
+            uvs = np.array(template[0][:, 10:])
+            uvs[:, 1] = 1 - uvs[:, 1]
+
+        # Unlike the edges, the number of the vertices added is returned.
+        return self.place_component(
+            vertex_cnt, vdata_values, prim_indices, template, matrix, center, uvs) - vertex_cnt
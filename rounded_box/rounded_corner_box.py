@@ -1,6 +1,6 @@
 import array
 
-from panda3d.core import Point3, Point2
+from panda3d.core import Point3, Point2, Vec3, BoundingBox
 
 from ..create_geometry import ProceduralGeometry
 from .rounded_box import Sides, BasicRoundedBox
@@ -215,6 +215,15 @@ class RoundedCornerBox(BasicRoundedBox, ProceduralGeometry):
         self.c_segs_tc = 0 if self.thickness <= 0 and self.open_top else self.segs_d
         self.c_segs_bc = 0 if self.thickness <= 0 and self.open_bottom else self.segs_d
 
+    def calc_bounds(self):
+        # If c_radius is 0, the cube created by Box.get_geom_node is not always within width x depth,
+        # so let Panda3D compute the bounds.
+        if self.c_radius == 0:
+            return None
+
+        half = Vec3(self.width, self.depth, self.height) * 0.5
+        return BoundingBox(self.center - half, self.center + half)
+
     def get_geom_node(self):
         # If c_radius is 0, call Box.get_geom_node, creating a cube.
         if self.c_radius == 0:
@@ -1,6 +1,6 @@
 import array
 
-from panda3d.core import Point3, Point2
+from panda3d.core import Point3, Point2, Vec3, BoundingBox
 
 from ..create_geometry import ProceduralGeometry
 from .rounded_box import Sides, BasicRoundedBox
@@ -319,6 +319,10 @@ class RoundedEdgeBox(BasicRoundedBox, ProceduralGeometry):
         self.c_segs_tc = 0
         self.c_segs_bc = 0
 
+    def calc_bounds(self):
+        half = Vec3(self.width, self.depth, self.height) * 0.5
+        return BoundingBox(self.center - half, self.center + half)
+
     def get_geom_node(self):
         # If c_radius is 0, Box.get_geom_node is called, creating a cube.
         if self.c_radius == 0:
@@ -3,7 +3,7 @@ import math
 from types import SimpleNamespace
 
 import numpy as np
-from panda3d.core import Vec3, Point3, Vec2
+from panda3d.core import Vec3, Point3, Vec2, BoundingBox
 
 from ..create_geometry import ProceduralGeometry
 
@@ -220,11 +220,12 @@ class Sphere(BasicSphere, ProceduralGeometry):
                 bottom_clip <= top_clip <= 1.0; default is 1.
                 1.0 (no clipping);
             invert (bool): whether or not the geometry should be rendered inside-out; default is False.
+            tristrips (bool): whether or not the mantles are created as triangle strips; default is False.
     """
 
     def __init__(self, radius=1., inner_radius=0, segs_h=40, segs_v=40,
                  segs_bottom_cap=2, segs_top_cap=2, segs_slice_caps=2,
-                 slice_deg=0, bottom_clip=-1., top_clip=1., invert=False):
+                 slice_deg=0, bottom_clip=-1., top_clip=1., invert=False, tristrips=False):
         self.color = (1, 1, 1, 1)
         self.radius = radius
         self.inner_radius = inner_radius
@@ -237,6 +238,7 @@ class Sphere(BasicSphere, ProceduralGeometry):
         self.bottom_clip = bottom_clip
         self.slice_deg = slice_deg
         self.invert = invert
+        self.tristrips = tristrips
 
     def define_variables(self):
         super().define_variables()
@@ -254,111 +256,79 @@ class Sphere(BasicSphere, ProceduralGeometry):
         self.top_angle = math.acos(np.clip(self.top_height / self.radius, -1.0, 1.0))
         self.delta_angle_v = (math.pi - self.bottom_angle - self.top_angle) / self.segs_v
 
+        # Calculate the angle tables shared by the mantle and caps.
+        self.cos_h, self.sin_h = self.get_sweep_angles(self.segs_h, self.slice_deg)
+        self.angles_v, self.cos_v, self.sin_v = self.get_angle_table(
+            self.delta_angle_v, self.segs_v, self.bottom_angle)
+
     def get_cap_triangle_vertices(self, vdata_values, cap):
         """Helper method to define the triangle vertices of a bottom or top cap.
         """
         radius_h = math.sqrt(self.radius ** 2 - cap.z ** 2)
         direction = -1 if self.invert else 1
         normal = cap.normal * -1 if self.invert else cap.normal
-
-        vertex = Point3(0., 0., cap.z)
-        uv = Vec2(.5, .5)
-        vdata_values.extend([*vertex, *self.color, *normal, *uv])
+        _direction = -direction if cap.is_bottom else direction
 
         r = radius_h / cap.segs
-        _delta = 0 if self.invert else self.slice_rad
+        c = self.cos_h
+        s = self.sin_h
 
-        # Define the cap triangle vertices.
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            c = math.cos(angle_h)
-            s = math.sin(angle_h) * direction
-            vertex = Point3(r * c, r * s, cap.z)
+        vertices = np.empty((self.segs_h + 2, 3))
+        vertices[0] = (0., 0., cap.z)
+        vertices[1:, 0] = r * c
+        vertices[1:, 1] = r * s
+        vertices[1:, 2] = cap.z
 
-            _direction = -direction if cap.is_bottom else direction
-            u = .5 + .5 * c / cap.segs
-            v = .5 + .5 * s * _direction / cap.segs
-            uv = Vec2(u, v)
+        uvs = np.empty((self.segs_h + 2, 2))
+        uvs[0] = (.5, .5)
+        uvs[1:, 0] = .5 + .5 * c / cap.segs
+        uvs[1:, 1] = .5 + .5 * s * _direction / cap.segs
 
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-
-        return self.segs_h + 2
+        return self.extend_vdata(vdata_values, vertices, normal, uvs)
 
     def get_cap_quad_vertices(self, vdata_values, cap):
         """Helper method to define the quad vertices of a bottom or top cap.
         """
+        if cap.segs < 2:
+            return 0
+
         radius_h = math.sqrt(self.radius ** 2 - cap.z ** 2)
         direction = -1 if self.invert else 1
-        vertex_cnt = 0
-
         normal = cap.normal * -1 if self.invert else cap.normal
-        _delta = 0 if self.invert else self.slice_rad
-
-        # Define cap quad vertices.
-        for i in range(1, cap.segs):
-            r = radius_h * (i + 1) / cap.segs
-
-            for j in range(self.segs_h + 1):
-                angle_h = self.delta_angle_h * j + _delta
-                c = math.cos(angle_h)
-                s = math.sin(angle_h) * direction
-                vertex = Point3(r * c, r * s, cap.z)
+        _direction = direction * -1 if cap.is_bottom else direction
 
-                _r = (i + 1) / cap.segs
-                _direction = direction * -1 if cap.is_bottom else direction
-                u = .5 + .5 * c * _r
-                v = .5 + .5 * s * _direction * _r
-                uv = Vec2(u, v)
+        # Each row of the arrays is a ring of the cap quad vertices.
+        i = np.arange(2, cap.segs + 1)[:, None]
+        r = radius_h * i / cap.segs
+        _r = i / cap.segs
+        c = self.cos_h
+        s = self.sin_h
 
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
+        vertices = np.stack(np.broadcast_arrays(r * c, r * s, cap.z), axis=2).reshape(-1, 3)
+        uvs = np.stack([.5 + .5 * c * _r, .5 + .5 * s * _direction * _r], axis=2).reshape(-1, 2)
 
-            vertex_cnt += self.segs_h + 1
-
-        return vertex_cnt
+        return self.extend_vdata(vdata_values, vertices, normal, uvs)
 
     def get_cap_edge_vertices(self, vdata_values):
         """Helper method to define the triangle vertices along a bottom pole.
         """
-        direction = -1 if self.invert else 1
-        angle_v = self.bottom_angle + self.delta_angle_v
-        z = self.radius * -math.cos(angle_v)
-
-        radius_h = self.radius * math.sin(angle_v)
-        _delta = 0 if self.invert else self.slice_rad
-        v = angle_v / math.pi
-
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            x = radius_h * math.cos(angle_h)
-            y = radius_h * math.sin(angle_h) * direction
-            vertex = Point3(x, y, z)
-            normal = Vec3(x, y, z).normalized() * direction
-            uv = Vec2(i / self.segs_h, v)
-
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-
-        return self.segs_h + 1
+        profile = SimpleNamespace(
+            r=self.radius * self.sin_v[1],
+            z=self.radius * -self.cos_v[1],
+            nr=self.sin_v[1],
+            nz=-self.cos_v[1],
+            v=self.angles_v[1] / math.pi
+        )
+        return self.sweep_profile(vdata_values, profile, self.segs_h, self.slice_deg)
 
     def create_cap_edge_vertices(self, vdata_values, cap):
         """Helper method to define the edge vertices of a bottom or top.
         """
         radius_h = math.sqrt(self.radius ** 2 - cap.z ** 2)
-        direction = -1 if self.invert else 1
-        _delta = 0 if self.invert else self.slice_rad
-
         v = (math.pi - math.acos(cap.z / self.radius)) / math.pi
+        profile = SimpleNamespace(r=radius_h, z=cap.z, nr=radius_h, nz=cap.z, v=v)
 
-        for i in range(self.segs_h + 1):
-            angle_h = self.delta_angle_h * i + _delta
-            x = radius_h * math.cos(angle_h)
-            y = radius_h * math.sin(angle_h) * direction
-            vertex = Point3(x, y, cap.z)
-            normal = Vec3(x, y, cap.z).normalized() * direction
-            uv = Vec2(i / self.segs_h, v)
-
-            vdata_values.extend([*vertex, *self.color, *normal, *uv])
-
-        return self.segs_h + 1
+        return self.sweep_profile(vdata_values, profile, self.segs_h, self.slice_deg)
 
     def create_bottom(self, index_offset, vdata_values, prim_indices):
         """Create bottom.
@@ -392,46 +362,24 @@ class Sphere(BasicSphere, ProceduralGeometry):
     def create_mantle_quads(self, index_offset, vdata_values, prim_indices):
         """Create mantle.
         """
-        n = self.segs_h + 1
-        direction = -1 if self.invert else 1
-        _delta = 0 if self.invert else self.slice_rad
-        vertex_cnt = 0
-
-        # Define the mantle quad vertices.
-        for i in range(1, self.segs_v - 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * (i + 1)
-            z = self.radius * -math.cos(angle_v)
-            radius_h = self.radius * math.sin(angle_v)
-            v = angle_v / math.pi
-
-            for j in range(self.segs_h + 1):
-                angle_h = self.delta_angle_h * j + _delta
-                x = radius_h * math.cos(angle_h)
-                y = radius_h * math.sin(angle_h) * direction
-                vertex = Point3(x, y, z)
-
-                normal = vertex.normalized() * direction
-                uv = Vec2(j / self.segs_h, v)
-
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            # Define the vertex order.
-            if i > 0:
-                for j in range(self.segs_h):
-                    vi1 = i * n + j + index_offset
-                    vi2 = vi1 - n
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-
-                    prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                    prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
-
-        return vertex_cnt
+        if self.segs_v < 3:
+            return 0
+
+        # The mantle rows are at the vertical angles from self.angles_v[2] to self.angles_v[-2].
+        profile = SimpleNamespace(
+            r=self.radius * self.sin_v[2:-1],
+            z=self.radius * -self.cos_v[2:-1],
+            nr=self.sin_v[2:-1],
+            nz=-self.cos_v[2:-1],
+            v=self.angles_v[2:-1] / math.pi
+        )
+        return self.create_lathe(
+            index_offset, vdata_values, prim_indices, profile, self.segs_h, self.slice_deg, join_prev=True)
 
-    def get_thickness_cap_vertices(self, seg_vecs, inner_verts, c_h=None, s_h=None):
+    def get_thickness_cap_vertices(self, c_h=None, s_h=None):
         """Get the vertices of the sliced surface of a sphere with a double structure
            consisting of an inner and outer spheres.
+           Return the inner vertices and the vectors from them to the outer vertices divided by segs_sc.
         """
         inner_bottom_height = self.bottom_height + self.thickness
         inner_bottom_angle = math.pi - math.acos(np.clip(inner_bottom_height / self.inner_radius, -1.0, 1.0))
@@ -439,75 +387,65 @@ class Sphere(BasicSphere, ProceduralGeometry):
         inner_top_height = self.top_height - self.thickness
         inner_top_angle = math.acos(np.clip(inner_top_height / self.inner_radius, -1.0, 1.0))
         inner_delta_angle_v = (math.pi - inner_bottom_angle - inner_top_angle) / self.segs_v
+        _, i_cos_v, i_sin_v = self.get_angle_table(inner_delta_angle_v, self.segs_v, inner_bottom_angle)
 
-        if self.bottom_clip > -1.:
-            inner_verts.append(Point3(0., 0., inner_bottom_height))
-            seg_vecs.append(Vec3(0., 0., -self.thickness / self.segs_sc))
-
-        for i in range(self.segs_v + 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * i
-            c = -math.cos(angle_v)
-            r = self.radius * math.sin(angle_v)
-            z = self.radius * c
-            i_angle_v = inner_bottom_angle + inner_delta_angle_v * i
-            i_c = -math.cos(i_angle_v)
-            i_r = self.inner_radius * math.sin(i_angle_v)
-            i_z = self.inner_radius * i_c
-
-            if c_h is None and s_h is None:
-                p = Point3(r, 0., z)
-                i_p = Point3(i_r, 0., i_z)
-            else:
-                p = Point3(r * c_h, r * s_h, z)
-                i_p = Point3(i_r * c_h, i_r * s_h, i_z)
+        c_h, s_h = (1., 0.) if c_h is None and s_h is None else (c_h, s_h)
+        r = self.radius * self.sin_v
+        i_r = self.inner_radius * i_sin_v
 
-            inner_verts.append(i_p)
-            seg_vecs.append((p - i_p) / self.segs_sc)
+        outer_verts = np.column_stack([r * c_h, r * s_h, self.radius * -self.cos_v])
+        inner_verts = np.column_stack([i_r * c_h, i_r * s_h, self.inner_radius * -i_cos_v])
+        seg_vecs = (outer_verts - inner_verts) / self.segs_sc
+
+        if self.bottom_clip > -1.:
+            inner_verts = np.vstack([[0., 0., inner_bottom_height], inner_verts])
+            seg_vecs = np.vstack([[0., 0., -self.thickness / self.segs_sc], seg_vecs])
 
         if self.top_clip < 1.:
-            inner_verts.append(Point3(0, 0, inner_top_height))
-            seg_vecs.append(Vec3(0, 0, self.thickness / self.segs_sc))
+            inner_verts = np.vstack([inner_verts, [0., 0., inner_top_height]])
+            seg_vecs = np.vstack([seg_vecs, [0., 0., self.thickness / self.segs_sc]])
+
+        return inner_verts, seg_vecs
 
-    def get_cap_vertices(self, seg_vecs, inner_verts, c_h=None, s_h=None):
+    def get_cap_vertices(self, c_h=None, s_h=None):
         """Get the vertices of the sliced surface of a sphere.
+           Return the center and the vectors from it to the outer vertices divided by segs_sc.
         """
         z = (self.top_height + self.bottom_height) * .5
         h = (self.top_height - self.bottom_height) * .5
-        vertex = Point3(0., 0., z)
-        inner_verts.append(vertex)
+        center = np.array([[0., 0., z]])
 
-        if self.bottom_clip > -1.:
-            seg_vecs.append(Vec3(0., 0., -h / self.segs_sc))
-
-        for i in range(self.segs_v + 1):
-            angle_v = self.bottom_angle + self.delta_angle_v * i
-            c = -math.cos(angle_v)
-            r = self.radius * math.sin(angle_v)
-            z = self.radius * c
+        c_h, s_h = (1., 0.) if c_h is None and s_h is None else (c_h, s_h)
+        r = self.radius * self.sin_v
 
-            if c_h is None and s_h is None:
-                p = Point3(r, 0., z)
-            else:
-                p = Point3(r * c_h, r * s_h, z)
+        outer_verts = np.column_stack([r * c_h, r * s_h, self.radius * -self.cos_v])
+        seg_vecs = (outer_verts - center) / self.segs_sc
 
-            seg_vecs.append((p - vertex) / self.segs_sc)
+        if self.bottom_clip > -1.:
+            seg_vecs = np.vstack([[0., 0., -h / self.segs_sc], seg_vecs])
 
         if self.top_clip < 1.:
-            seg_vecs.append(Vec3(0., 0., h / self.segs_sc))
+            seg_vecs = np.vstack([seg_vecs, [0., 0., h / self.segs_sc]])
+
+        return center, seg_vecs
 
     def create_slice_cap(self, index_offset, vdata_values, prim_indices):
         """Create slice caps.
         """
         direction = -1 if self.invert else 1
         total_vertex_cnt = 0
-        _offset = index_offset
 
-        for is_start in [True, False]:
-            vertex_cnt = 0
-            index_offset = _offset + total_vertex_cnt
-            seg_vecs = []
-            inner_verts = []
+        # the number of vertices in a row of a slice cap, from the bottom to the top.
+        n_bottom = 1 if self.bottom_clip > -1. else 0
+        n_top = 1 if self.top_clip < 1. else 0
+        n = self.segs_v + 1 + n_bottom + n_top
+
+        # the vertices on the z-axis have u = 0.5 instead of the one calculated from x and y.
+        on_axis = np.zeros(n, dtype=bool)
+        on_axis[:n_bottom] = on_axis[n - n_top:] = True
+        on_axis = np.concatenate([on_axis if self.inner_radius else [True], np.tile(on_axis, self.segs_sc)])
 
+        for is_start in [True, False]:
             if is_start:
                 c_h = s_h = None
                 normal = Vec3(0., -1., 0.) if self.invert else Vec3(0., 1., 0.)
@@ -518,130 +456,63 @@ class Sphere(BasicSphere, ProceduralGeometry):
                 normal = Vec3(s_h, -c_h, 0.) * direction
 
             if self.inner_radius:
-                self.get_thickness_cap_vertices(seg_vecs, inner_verts, c_h, s_h)
-
-                # Define the lower inner central vertex of the slice cap.
-                if self.bottom_clip > -1.:
-                    vertex = inner_verts[0]
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(.5, v)
+                inner_verts, seg_vecs = self.get_thickness_cap_vertices(c_h, s_h)
+            else:
+                inner_verts, seg_vecs = self.get_cap_vertices(c_h, s_h)
 
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+            # Define the vertices of the slice cap; the first row is the inner vertices or the center,
+            # and the following ones are moved toward the outer vertices step by step.
+            steps = np.arange(1, self.segs_sc + 1)[:, None, None]
+            vertices = np.vstack([inner_verts, (inner_verts + seg_vecs * steps).reshape(-1, 3)])
 
-                # Define the main inner vertices of the slice cap quads.
-                _i = 1 if self.bottom_clip > -1 else 0
+            if is_start:
+                dividend = .5 + .5 * vertices[:, 0]
+            else:
+                dividend = .5 - .5 * np.linalg.norm(vertices[:, :2], axis=1)
 
-                for i in range(self.segs_v + 1):
-                    vertex = inner_verts[i + _i]
+            uvs = np.column_stack([dividend / self.radius * -direction, .5 + .5 * vertices[:, 2] / self.radius])
+            uvs[on_axis, 0] = .5
 
-                    dividend = .5 + .5 * vertex.x if is_start else .5 - .5 * Vec3(vertex.xy, 0).length()
-                    u = dividend / self.radius * -direction
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(u, v)
+            vertex_cnt = self.extend_vdata(vdata_values, vertices, normal, uvs)
 
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+            # Define the vertex order of the slice cap.
+            use_a = is_start != self.invert
+            start = index_offset + total_vertex_cnt
+            rows = self.segs_sc
 
-                # Define the upper inner central vertex of the slice cap.
-                if self.top_clip < 1.:
-                    vertex = inner_verts[-1]
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(.5, v)
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+            if not self.inner_radius:
+                # the triangles around the center
+                vi2 = start + 1 + np.arange(n - 1)
+                vi3 = vi2 + 1
+                vi1 = np.full_like(vi2, start)
+                self.extend_prim(
+                    prim_indices, np.column_stack([vi1, vi3, vi2] if use_a else [vi1, vi2, vi3]).ravel())
+                start += 1
+                rows -= 1
+
+            # the quads between two rows
+            vi2 = (start + n * np.arange(rows)[:, None] + np.arange(n - 1)).ravel()
+            vi1 = vi2 + n
+            vi3 = vi2 + 1
+            vi4 = vi1 + 1
+            quads = [vi1, vi2, vi4, vi2, vi3, vi4] if use_a else [vi1, vi4, vi2, vi2, vi4, vi3]
+            self.extend_prim(prim_indices, np.column_stack(quads).ravel())
 
-                index_offset += vertex_cnt
-            else:
-                self.get_cap_vertices(seg_vecs, inner_verts, c_h, s_h)
-
-                vertex = inner_verts[0]
-                v = .5 + .5 * vertex.z / self.radius
-                uv = Vec2(.5, v)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-            for i in range(self.segs_sc):
-                # will be incremented when self.bottom_clip > -1 and self.top_clip < 1.
-                cnt = 0
-
-                # Define the lower central vertices of the slice cap.
-                if self.bottom_clip > -1.:
-                    vertex = inner_verts[0] + seg_vecs[0] * (i + 1)
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(.5, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-                    cnt += 1
-
-                # Define the main vertices of the slice cap quads.
-                _idx = 1 if self.bottom_clip > -1. else 0
-
-                for j in range(self.segs_v + 1):
-                    idx = j + _idx
-                    i_v = inner_verts[idx] if self.inner_radius else inner_verts[0]
-                    vertex = i_v + seg_vecs[idx] * (i + 1)
-
-                    dividend = .5 + .5 * vertex.x if is_start else .5 - .5 * Vec3(vertex.xy, 0).length()
-                    u = dividend / self.radius * -direction
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-
-                # Define the upper central vertices of the slice cap.
-                if self.top_clip < 1.:
-                    i_v = inner_verts[-1]
-                    vertex = i_v + seg_vecs[-1] * (i + 1)
-                    v = .5 + .5 * vertex.z / self.radius
-                    uv = Vec2(.5, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
-                    cnt += 1
-
-                # Define the vertex order of the slice cap triangles.
-                if i == 0 and not self.inner_radius:
-                    for j in range(self.segs_v + cnt):
-                        vi1 = index_offset
-                        vi2 = vi1 + j + 1
-                        vi3 = vi2 + 1
-
-                        if is_start:
-                            prim_indices.extend((vi1, vi2, vi3) if self.invert else (vi1, vi3, vi2))
-                        else:
-                            prim_indices.extend((vi1, vi3, vi2) if self.invert else (vi1, vi2, vi3))
-                # Define the vertex order of the slice cap quads.
-                else:
-                    n = cnt + (0 if self.inner_radius else 1)
-                    start = 0 if self.inner_radius else 1
-
-                    for j in range(start, self.segs_v + n):
-                        vi1 = index_offset + j
-                        vi2 = vi1 - self.segs_v - n - (1 if self.inner_radius else 0)
-                        vi3 = vi2 + 1
-                        vi4 = vi1 + 1
-
-                        if is_start:
-                            prim_indices.extend((vi1, vi4, vi2) if self.invert else (vi1, vi2, vi4))
-                            prim_indices.extend((vi2, vi4, vi3) if self.invert else (vi2, vi3, vi4))
-                        else:
-                            prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi4, vi2))
-                            prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi2, vi4, vi3))
-
-                index_offset += self.segs_v + cnt + 1
             total_vertex_cnt += vertex_cnt
 
         return total_vertex_cnt
 
+    def calc_bounds(self):
+        r = self.radius
+        return BoundingBox(Point3(-r, -r, r * self.bottom_clip), Point3(r, r, r * self.top_clip))
+
     def get_geom_node(self):
         # Calculate required values to define variables.
         self.define_variables()
 
         vdata_values = array.array('f', [])
         prim_indices = array.array('H', [])
+        self.strips = []
 
         # Create an outer sphere.
         vertex_cnt, index_offset = self.create_bottom(0, vdata_values, prim_indices)
@@ -667,14 +538,15 @@ class Sphere(BasicSphere, ProceduralGeometry):
                 slice_deg=self.slice_deg,
                 bottom_clip=bottom_clip,
                 top_clip=top_clip,
-                invert=not self.invert
+                invert=not self.invert,
+                tristrips=self.tristrips
             )
 
             geom_node = sphere_maker.get_geom_node()
-            self.add(geom_node, vdata_values, vertex_cnt, prim_indices)
+            self.add(geom_node, vdata_values, vertex_cnt, prim_indices, self.strips)
             return geom_node
 
         # Create the geom node.
         geom_node = self.create_geom_node(
-            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
+            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower(), strips=self.strips)
         return geom_node
\ No newline at end of file
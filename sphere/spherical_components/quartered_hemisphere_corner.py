@@ -48,10 +48,10 @@ class QuarteredHemisphereCorner(BasicHemisphere):
         self.start_angle_rad = math.pi * self.start_angle_deg / 180
         super().define_variables()
 
-    def create_quartered_hemisphere(self, vertex_cnt, vdata_values, prim_indices):
-        vertex_cnt, offset = self.create_bottom(vertex_cnt, vdata_values, prim_indices)
+    def create_quartered_hemisphere(self, index_offset, vdata_values, prim_indices):
+        vertex_cnt, offset = self.create_bottom(index_offset, vdata_values, prim_indices)
         vertex_cnt += self.create_mantle_quads(offset, vdata_values, prim_indices)
-        vertex_cnt += self.create_top(vertex_cnt, vdata_values, prim_indices)
+        vertex_cnt += self.create_top(index_offset + vertex_cnt, vdata_values, prim_indices)
 
         return vertex_cnt
 
@@ -0,0 +1,193 @@
+import math
+
+import numpy as np
+from panda3d.core import NodePath, Point3, BoundingBox
+
+from .plane import Plane
+
+
+class TerrainTile(Plane):
+    """A class to create a tile of a terrain whose vertices are displaced by a heightmap.
+       The tile (tile_x, tile_y) covers the samples from tile_x * tile_segs to (tile_x + 1) * tile_segs
+       along the x-axis and the same along the y-axis, so neighboring tiles share their edge vertices.
+       The normals are calculated by central differences over the whole heightmap,
+       so they also match along the edges.
+
+        Args:
+            heightmap (numpy.ndarray):
+                2D array of heights indexed by [y, x]; an np.memmap is also acceptable,
+                only the samples of the tile and its one-sample border are read.
+            tile_x (int): the index of the tile along the x-axis; default is 0.
+            tile_y (int): the index of the tile along the y-axis; default is 0.
+            tile_segs (int): the number of subdivisions of a tile side; greater than 0; default is 64.
+            cell_size (float): the distance between two adjacent samples; greater than 0; default is 1.
+            height_scale (float): the height of the vertex of sample value 1; default is 1.
+            tristrips (bool): whether or not the tile is created as triangle strips; default is False.
+            compact (bool): whether or not the color column is left out of the vertex data; default is False.
+    """
+
+    # The normals of the terrain differ from vertex to vertex.
+    constant_columns = ('color',)
+
+    def __init__(self, heightmap, tile_x=0, tile_y=0, tile_segs=64, cell_size=1., height_scale=1.,
+                 tristrips=False, compact=False):
+        self.color = (1, 1, 1, 1)
+        self.heightmap = heightmap
+        self.tile_x = tile_x
+        self.tile_y = tile_y
+        self.tile_segs = tile_segs
+        self.cell_size = cell_size
+        self.height_scale = height_scale
+        self.tristrips = tristrips
+        self.compact = compact
+
+    def define_variables(self):
+        rows, cols = self.heightmap.shape
+        self.start_x = self.tile_x * self.tile_segs
+        self.start_y = self.tile_y * self.tile_segs
+
+        # The last tiles are smaller if the heightmap is not divisible by tile_segs.
+        self.segs_w = min(self.tile_segs, cols - 1 - self.start_x)
+        self.segs_d = min(self.tile_segs, rows - 1 - self.start_y)
+
+        if self.segs_w < 1 or self.segs_d < 1:
+            raise ValueError(f'tile ({self.tile_x}, {self.tile_y}) is outside the heightmap.')
+
+    def read_heights(self):
+        """Return the heights of the tile and its one-sample border, clipped by the heightmap,
+           and the offsets of the tile samples in them.
+        """
+        rows, cols = self.heightmap.shape
+        x0, y0 = max(self.start_x - 1, 0), max(self.start_y - 1, 0)
+        x1 = min(self.start_x + self.segs_w + 2, cols)
+        y1 = min(self.start_y + self.segs_d + 2, rows)
+
+        heights = np.asarray(self.heightmap[y0:y1, x0:x1], dtype=np.float64) * self.height_scale
+        return heights, self.start_x - x0, self.start_y - y0
+
+    def get_geom_node(self):
+        self.define_variables()
+        heights, ox, oy = self.read_heights()
+
+        # central differences inside the heightmap, and one-sided ones along its borders.
+        dz_dy, dz_dx = np.gradient(heights, self.cell_size)
+        window = (slice(oy, oy + self.segs_d + 1), slice(ox, ox + self.segs_w + 1))
+
+        # Transpose the [y, x] arrays so that each row is a line of vertices along the y-axis, like Plane.
+        z = heights[window].T
+        normals = np.stack([-dz_dx[window].T, -dz_dy[window].T, np.ones_like(z)], axis=2)
+        normals /= np.linalg.norm(normals, axis=2, keepdims=True)
+
+        cols = np.arange(self.start_x, self.start_x + self.segs_w + 1)
+        rows = np.arange(self.start_y, self.start_y + self.segs_d + 1)
+        vertices = np.stack(np.broadcast_arrays(
+            cols[:, None] * self.cell_size, rows * self.cell_size, z), axis=2)
+
+        # The texture coordinates span the whole heightmap.
+        n_rows, n_cols = self.heightmap.shape
+        uvs = np.stack(np.broadcast_arrays(cols[:, None] / (n_cols - 1), rows / (n_rows - 1)), axis=2)
+
+        self.z_range = (z.min(), z.max())
+        return self.create_grid_geom_node(vertices, normals, uvs)
+
+    def calc_bounds(self):
+        x0, y0 = self.start_x * self.cell_size, self.start_y * self.cell_size
+        x1, y1 = x0 + self.segs_w * self.cell_size, y0 + self.segs_d * self.cell_size
+        return BoundingBox(Point3(x0, y0, self.z_range[0]), Point3(x1, y1, self.z_range[1]))
+
+
+class TerrainTiles:
+    """A class to stream the TerrainTile models around a focus point in and out,
+       so that a terrain larger than memory can be shown with a memory-mapped heightmap.
+
+        Args:
+            heightmap (numpy.ndarray): 2D array of heights indexed by [y, x], or an np.memmap.
+            tile_segs (int): the number of subdivisions of a tile side; greater than 0; default is 64.
+            cell_size (float): the distance between two adjacent samples; greater than 0; default is 1.
+            height_scale (float): the height of the vertex of sample value 1; default is 1.
+            radius (int): how many tiles around the tile of the focus point are loaded; default is 2.
+            tristrips (bool): whether or not the tiles are created as triangle strips; default is False.
+            compact (bool): whether or not the color column is left out of the vertex data; default is False.
+    """
+
+    def __init__(self, heightmap, tile_segs=64, cell_size=1., height_scale=1., radius=2,
+                 tristrips=False, compact=False):
+        self.heightmap = heightmap
+        self.tile_segs = tile_segs
+        self.cell_size = cell_size
+        self.height_scale = height_scale
+        self.radius = radius
+        self.tristrips = tristrips
+        self.compact = compact
+
+        rows, cols = heightmap.shape
+        self.num_tiles = (math.ceil((cols - 1) / tile_segs), math.ceil((rows - 1) / tile_segs))
+        self.root = NodePath('terrain')
+        self.tiles = {}
+
+    @classmethod
+    def from_raw(cls, path, shape, dtype=np.uint16, **kwargs):
+        """Create the instance with a heightmap memory-mapped over a raw file.
+            Args:
+                path (str): the path to the raw file of heights.
+                shape (tuple): the number of rows and columns of the heightmap.
+                dtype (numpy.dtype): the type of a height sample; default is np.uint16.
+        """
+        heightmap = np.memmap(path, dtype=dtype, mode='r', shape=shape)
+        return cls(heightmap, **kwargs)
+
+    def get_tile_index(self, x, y):
+        """Return the index of the tile that contains the point (x, y).
+        """
+        size = self.tile_segs * self.cell_size
+        return int(x // size), int(y // size)
+
+    def create_tile(self, tile_x, tile_y):
+        maker = TerrainTile(
+            self.heightmap,
+            tile_x=tile_x,
+            tile_y=tile_y,
+            tile_segs=self.tile_segs,
+            cell_size=self.cell_size,
+            height_scale=self.height_scale,
+            tristrips=self.tristrips,
+            compact=self.compact
+        )
+
+        model = maker.create()
+        model.reparent_to(self.root)
+        return model
+
+    def update(self, focus):
+        """Load the tiles within radius from the tile of the focus point and unload the others.
+           Return the indices of the loaded and unloaded tiles.
+            Args:
+                focus (Point3): the focus point, like the position of the camera.
+        """
+        fx, fy = self.get_tile_index(focus[0], focus[1])
+        cols, rows = self.num_tiles
+
+        needed = {
+            (tx, ty)
+            for tx in range(max(fx - self.radius, 0), min(fx + self.radius + 1, cols))
+            for ty in range(max(fy - self.radius, 0), min(fy + self.radius + 1, rows))
+        }
+
+        unloaded = [key for key in self.tiles if key not in needed]
+        loaded = [key for key in sorted(needed) if key not in self.tiles]
+
+        for key in unloaded:
+            self.tiles.pop(key).remove_node()
+
+        for key in loaded:
+            self.tiles[key] = self.create_tile(*key)
+
+        return loaded, unloaded
+
+    def clear(self):
+        """Unload all of the tiles.
+        """
+        for model in self.tiles.values():
+            model.remove_node()
+
+        self.tiles.clear()
@@ -1,7 +1,9 @@
 import array
 import math
+from types import SimpleNamespace
 
-from panda3d.core import Vec3, Point3, Vec2, Quat
+import numpy as np
+from panda3d.core import Vec3, Point3, BoundingBox
 
 from .create_geometry import ProceduralGeometry
 
@@ -30,11 +32,13 @@ class Torus(ProceduralGeometry):
             ring_slice_start_cap (int): radial subdivisions of the cap at the start of the ring slice; 0 (no cap); default is 2.
             ring_slice_end_cap (int): radial subdivisions of the cap at the end of the ring slice; 0 (no cap); default is 2.
             invert (bool): whether or not the geometry should be rendered inside-out; default is False.
+            tristrips (bool): whether or not the mantles are created as triangle strips; default is False.
     """
 
     def __init__(self, segs_r=40, segs_s=20, ring_radius=1., section_radius=.5, section_inner_radius=0.,
                  ring_slice_deg=0, section_slice_deg=0, section_slice_start_cap=2,
-                 section_slice_end_cap=2, ring_slice_start_cap=2, ring_slice_end_cap=2, invert=False):
+                 section_slice_end_cap=2, ring_slice_start_cap=2, ring_slice_end_cap=2, invert=False,
+                 tristrips=False):
         self.color = (1, 1, 1, 1)
         self.segs_r = segs_r
         self.segs_s = segs_s
@@ -52,48 +56,19 @@ class Torus(ProceduralGeometry):
         self.segs_rsec = ring_slice_end_cap
 
         self.invert = invert
+        self.tristrips = tristrips
 
     def create_mantle(self, vdata_values, prim_indices):
-        n = 0 if self.invert else self.ring_slice_rad
-        direction = -1 if self.invert else 1
-        vertex_cnt = 0
-
-        # mantle quad vertices
-        for i in range(self.segs_r + 1):
-            angle_h = self.delta_angle_h * i + n
-            c = math.cos(angle_h)
-            s = math.sin(angle_h) * direction
-            u = i / self.segs_r
-
-            for j in range(self.segs_s + 1):
-                angle_v = self.delta_angle_v * j + self.section_slice_rad
-                r = self.ring_radius - self.section_radius * math.cos(angle_v)
-                x = r * c
-                y = r * s
-                z = self.section_radius * math.sin(angle_v)
-                nx = x - self.ring_radius * c
-                ny = y - self.ring_radius * s
-
-                vertex = Point3(x, y, z)
-                normal = Vec3(nx, ny, z).normalized() * direction
-                v = 1.0 - j / self.segs_s
-
-                vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                vertex_cnt += 1
-
-        # the vertex order of the mantle quads
-        n = self.segs_s + 1
-
-        for i in range(1, self.segs_r + 1):
-            for j in range(self.segs_s):
-                vi1 = i * n + j
-                vi2 = vi1 - n
-                vi3 = vi2 + 1
-                vi4 = vi1 + 1
-                prim_indices.extend((vi1, vi2, vi4) if self.invert else (vi1, vi2, vi3))
-                prim_indices.extend((vi2, vi3, vi4) if self.invert else (vi1, vi3, vi4))
-
-        return vertex_cnt
+        # the profile is the cross-section; each row of the vertices is a cross-section.
+        profile = SimpleNamespace(
+            r=self.ring_radius - self.section_radius * self.cos_v,
+            z=self.section_radius * self.sin_v,
+            nr=-self.section_radius * self.cos_v,
+            nz=self.section_radius * self.sin_v,
+            v=1.0 - np.arange(self.segs_s + 1) / self.segs_s
+        )
+        return self.create_lathe(
+            0, vdata_values, prim_indices, profile, self.segs_r, self.ring_slice_deg, angle_major=True)
 
     def create_ring_cap(self, index_offset, vdata_values, prim_indices):
         direction = -1. if self.invert else 1.
@@ -106,6 +81,7 @@ class Torus(ProceduralGeometry):
             offset = index_offset + vertex_cnt
 
             if is_start:
+                c_h, s_h = 1., 0.
                 normal = Vec3(0, direction, 0)
             else:
                 angle_h = self.delta_angle_h * self.segs_r
@@ -113,80 +89,50 @@ class Torus(ProceduralGeometry):
                 s_h = -math.sin(angle_h)
                 normal = Vec3(s_h, -c_h, 0) * direction
 
+            # the radii of the ring cap circles; without thickness, the innermost circle
+            # is connected to the center by triangles.
+            if self.thickness:
+                radii = self.section_inner_radius + self.thickness * np.arange(segs_sc + 1) / segs_sc
+            else:
+                radii = np.concatenate([
+                    [self.section_radius / segs_sc],
+                    self.section_inner_radius + self.thickness * np.arange(2, segs_sc + 1) / segs_sc
+                ])
+
+            # the ring cap vertices; each row of the arrays is a circle.
+            _r = radii[:, None] * self.cos_v
+            r = self.ring_radius - _r
+            z = radii[:, None] * self.sin_v
+            vertices = np.stack([r * c_h, r * s_h, z], axis=2).reshape(-1, 3)
+
+            coef = .5 if is_start else -.5
+            u = .5 + coef * _r / self.section_radius * direction
+            v = .5 + .5 * z / self.section_radius
+            uvs = np.stack([u, v], axis=2).reshape(-1, 2)
+
             if not self.thickness:
-                # the ring cap triangle vertices
-                if is_start:
-                    vertex = Point3(self.ring_radius, 0, 0)
-                else:
-                    vertex = Point3(self.ring_radius * c_h, self.ring_radius * s_h, 0)
-
-                uv = Vec2(0.5, 0.5)
-                vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                vertex_cnt += 1
-
-                radius = self.section_radius / segs_sc
-
-                for i in range(self.segs_s + 1):
-                    angle_v = self.delta_angle_v * i + self.section_slice_rad
-                    c = math.cos(angle_v)
-                    s = math.sin(angle_v)
-                    _r = radius * c
-                    r = self.ring_radius - _r
-                    z = radius * s
-
-                    vertex = Point3(r, 0.0, z) if is_start else Point3(r * c_h, r * s_h, z)
-                    coef = .5 if is_start else -.5
-                    u = 0.5 + coef * _r / self.section_radius * direction
-                    v = 0.5 + 0.5 * s / segs_sc
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+                center = Point3(self.ring_radius * c_h, self.ring_radius * s_h, 0)
+                vertices = np.vstack([center, vertices])
+                uvs = np.vstack([(.5, .5), uvs])
+
+            vertex_cnt += self.extend_vdata(vdata_values, vertices, normal, uvs)
 
+            if not self.thickness:
                 # the vertex order of the ring cap triangles
-                for i in range(offset + 1, offset + 1 + self.segs_s):
-                    if is_start:
-                        prim_indices.extend((offset, i + 1, i) if self.invert else (offset, i, i + 1))
-                    else:
-                        prim_indices.extend((offset, i, i + 1) if self.invert else (offset, i + 1, i))
-
-            # the ring cap quad vertices
-            offset += (self.segs_s + 1 if self.thickness else 1)
-            n = 0 if self.thickness else 1
-
-            for i in range(n, segs_sc + 1 - n):
-                radius = self.section_inner_radius + self.thickness * (i + n) / segs_sc
-
-                for j in range(self.segs_s + 1):
-                    angle_v = self.delta_angle_v * j + self.section_slice_rad
-                    _r = radius * math.cos(angle_v)
-                    r = self.ring_radius - _r
-                    z = radius * math.sin(angle_v)
-
-                    vertex = Point3(r, 0., z) if is_start else Point3(r * c_h, r * s_h, z)
-                    coef = .5 if is_start else -.5
-                    u = .5 + coef * _r / self.section_radius * direction
-                    v = .5 + .5 * z / self.section_radius
-                    uv = Vec2(u, v)
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *uv])
-                    vertex_cnt += 1
+                vi2 = offset + 1 + np.arange(self.segs_s)
+                vi3 = vi2 + 1
+                vi1 = np.full_like(vi2, offset)
+                fan = [vi1, vi3, vi2] if is_start == self.invert else [vi1, vi2, vi3]
+                self.extend_prim(prim_indices, np.column_stack(fan).ravel())
+                offset += 1
 
             # the vertex order of the ring cap quads
-            n = 0 if self.thickness else 1
-
-            for i in range(n, segs_sc):
-                for j in range(self.segs_s):
-                    vi1 = offset + i * (self.segs_s + 1) + j
-                    vi2 = vi1 - self.segs_s - 1
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-                    if self.invert:
-                        prim_indices.extend((vi1, vi2, vi3) if is_start else (vi1, vi3, vi2))
-                        prim_indices.extend((vi1, vi3, vi4) if is_start else (vi1, vi4, vi3))
-                    else:
-                        prim_indices.extend((vi1, vi3, vi2) if is_start else (vi1, vi2, vi3))
-                        prim_indices.extend((vi1, vi4, vi3) if is_start else (vi1, vi3, vi4))
+            indices = self.create_grid_indices(offset, len(radii) - 1, self.segs_s).reshape(-1, 3)
+
+            if is_start != self.invert:
+                indices = indices[:, [0, 2, 1]]
+
+            self.extend_prim(prim_indices, indices.ravel())
 
         return vertex_cnt
 
@@ -194,12 +140,13 @@ class Torus(ProceduralGeometry):
         vertex_cnt = 0
         direction = -1 if self.invert else 1
 
-        cap_normal = Vec3.down() if self.invert else Vec3.up()
+        # Rotate the down or up vector around the x-axis; the cap normal points up in both cases.
         x = self.delta_angle_h * self.ring_radius * direction
         angle = math.atan2(0, x)
-        quat = Quat()
-        quat.set_from_axis_angle_rad(angle, Vec3.right())
-        cap_normal = quat.xform(cap_normal)
+        cap_normal = np.array([0., -direction * math.sin(angle), direction * math.cos(angle)])
+
+        c_h = self.cos_h[:, None]
+        s_h = self.sin_h[:, None]
 
         for is_start in [True, False]:
             if not (segs_sc := self.segs_sssc if is_start else self.segs_ssec):
@@ -207,57 +154,52 @@ class Torus(ProceduralGeometry):
 
             offset = index_offset + vertex_cnt
             seg = 0 if is_start else self.segs_s
-
-            for i in range(self.segs_r + 1):
-                angle_h = self.delta_angle_h * i + (0. if self.invert else self.ring_slice_rad)
-                c = math.cos(angle_h)
-                s = math.sin(angle_h) * direction
-
-                quat_h = Quat()
-                axis = Vec3.down() if self.invert else Vec3.up()
-                quat_h.set_from_axis_angle_rad(angle_h, axis)
-
-                angle_v = self.delta_angle_v * seg + self.section_slice_rad
-                r = self.ring_radius - self.section_radius * math.cos(angle_v)
-                x = r * c
-                y = r * s
-                z = self.section_radius * math.sin(angle_v)
-                p1 = Point3(x, y, z)
-
-                quat_v = Quat()
-                quat_v.set_from_axis_angle_rad(angle_v, Vec3.forward())
-                n_vec = (quat_v * quat_h).xform(cap_normal)
-
-                x = self.ring_radius * c
-                y = self.ring_radius * s
-                p2 = Point3(x, y, 0)
-
-                v = self.thickness if self.thickness else self.section_inner_radius
-                r_vec = (p2 - p1).normalized() * v
-                normal = n_vec * (-direction if seg == 0 else direction)
-                u = i / self.segs_r
-
-                for j in range(segs_sc + 1):
-                    vertex = p1 + r_vec * j / segs_sc
-                    v = .5 * r_vec.length() / self.section_radius * j / segs_sc
-                    if not is_start:
-                        v = 1.0 - v
-
-                    vdata_values.extend([*vertex, *self.color, *normal, *(u, v)])
-                    vertex_cnt += 1
-
-            for i in range(self.segs_r):
-                for j in range(segs_sc):
-                    vi1 = offset + j
-                    vi2 = vi1 + segs_sc + 1
-                    vi3 = vi2 + 1
-                    vi4 = vi1 + 1
-                    prim_indices.extend((vi1, vi2, vi3) if is_start else (vi1, vi3, vi2))
-                    prim_indices.extend((vi1, vi3, vi4) if is_start else (vi1, vi4, vi3))
-                offset += segs_sc + 1
+            c_v = self.cos_v[seg]
+            s_v = self.sin_v[seg]
+
+            # Rotate cap_normal around the y-axis by the section angle,
+            # and then around the z-axis by the ring angles (clockwise if inverted).
+            nx = cap_normal[0] * c_v + cap_normal[2] * s_v
+            ny = cap_normal[1]
+            nz = -cap_normal[0] * s_v + cap_normal[2] * c_v
+            n_vecs = np.column_stack(np.broadcast_arrays(nx * c_h - ny * s_h, nx * s_h + ny * c_h, nz))
+            normals = n_vecs * (-direction if seg == 0 else direction)
+
+            r = self.ring_radius - self.section_radius * c_v
+            p1 = np.column_stack(np.broadcast_arrays(r * c_h, r * s_h, self.section_radius * s_v))
+            p2 = np.column_stack(np.broadcast_arrays(self.ring_radius * c_h, self.ring_radius * s_h, 0.))
+
+            length = self.thickness if self.thickness else self.section_inner_radius
+            r_vecs = (p2 - p1) / np.linalg.norm(p2 - p1, axis=1, keepdims=True) * length
+
+            # the section cap vertices; each row of the arrays is a line from the outer to the inner surface.
+            t = np.arange(segs_sc + 1) / segs_sc
+            vertices = (p1[:, None] + r_vecs[:, None] * t[:, None]).reshape(-1, 3)
+            normals = np.repeat(normals, segs_sc + 1, axis=0)
+
+            u = np.arange(self.segs_r + 1)[:, None] / self.segs_r
+            v = .5 * np.linalg.norm(r_vecs, axis=1)[:, None] / self.section_radius * t
+            if not is_start:
+                v = 1.0 - v
+
+            uvs = np.stack(np.broadcast_arrays(u, v), axis=2).reshape(-1, 2)
+            vertex_cnt += self.extend_vdata(vdata_values, vertices, normals, uvs)
+
+            # the vertex order of the section cap quads
+            vi1 = (offset + (segs_sc + 1) * np.arange(self.segs_r)[:, None] + np.arange(segs_sc)).ravel()
+            vi2 = vi1 + segs_sc + 1
+            vi3 = vi2 + 1
+            vi4 = vi1 + 1
+            quads = [vi1, vi2, vi3, vi1, vi3, vi4] if is_start else [vi1, vi3, vi2, vi1, vi4, vi3]
+            self.extend_prim(prim_indices, np.column_stack(quads).ravel())
 
         return vertex_cnt
 
+    def calc_bounds(self):
+        r = self.section_radius
+        outer = self.ring_radius + r
+        return BoundingBox(Point3(-outer, -outer, -r), Point3(outer, outer, r))
+
     def get_geom_node(self):
         self.ring_slice_rad = math.pi * self.ring_slice_deg / 180
         self.section_slice_rad = math.pi * self.section_slice_deg / 180
@@ -265,8 +207,14 @@ class Torus(ProceduralGeometry):
         self.delta_angle_v = math.pi * ((360 - self.section_slice_deg) / 180) / self.segs_s
         self.thickness = self.section_radius - self.section_inner_radius
 
+        # Calculate the angle tables shared by the mantle and caps.
+        self.cos_h, self.sin_h = self.get_sweep_angles(self.segs_r, self.ring_slice_deg)
+        _, self.cos_v, self.sin_v = self.get_angle_table(
+            self.delta_angle_v, self.segs_s, self.section_slice_rad)
+
         vdata_values = array.array('f', [])
         prim_indices = array.array('H', [])
+        self.strips = []
         vertex_cnt = 0
 
         # Create an outer torus.
@@ -281,13 +229,14 @@ class Torus(ProceduralGeometry):
         # Create an inner torus mantle to connect it to the outer torus.
         if self.section_inner_radius:
             torus_maker = Torus(self.segs_r, self.segs_s, self.ring_radius, self.section_inner_radius, 0,
-                                self.ring_slice_deg, self.section_slice_deg, 0, 0, 0, 0, not self.invert)
+                                self.ring_slice_deg, self.section_slice_deg, 0, 0, 0, 0, not self.invert,
+                                self.tristrips)
 
             geom_node = torus_maker.get_geom_node()
-            self.add(geom_node, vdata_values, vertex_cnt, prim_indices)
+            self.add(geom_node, vdata_values, vertex_cnt, prim_indices, self.strips)
             return geom_node
 
         # Create the geom node.
         geom_node = self.create_geom_node(
-            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower())
+            vertex_cnt, vdata_values, prim_indices, self.__class__.__name__.lower(), strips=self.strips)
         return geom_node
\ No newline at end of file